@@ -1,8 +1,10 @@
 from django.contrib import admin
-from .models import User, Complaint, ComplaintHistory, Notification, Department
+from .models import User, Complaint, ComplaintHistory, Notification, Department, ClassificationJob, RoutingFeedback
 
 admin.site.register(User)
 admin.site.register(Complaint)
 admin.site.register(ComplaintHistory)
 admin.site.register(Notification)
 admin.site.register(Department)
+admin.site.register(ClassificationJob)
+admin.site.register(RoutingFeedback)
@@ -0,0 +1,143 @@
+"""
+Incrementally maintained complaint analytics.
+
+``AnalyticsSummary`` keeps running counts per status and the sum and count
+of resolution times, for all complaints (the empty scope) and per primary
+department. Every write path that changes a complaint's status or primary
+department takes a ``snapshot`` before and after and calls
+``record_change``; the difference is applied with ``F()`` increments, so
+concurrent writers never lose updates and ``/api/analytics`` reads a handful
+of rows instead of scanning complaints. ``rebuild`` (``manage.py
+rebuild_analytics``) recomputes everything from the complaints table.
+"""
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, NamedTuple, Optional
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import AnalyticsSummary, Complaint
+
+OVERALL = ''
+
+STATUS_COLUMNS = {
+    'Submitted': 'submitted',
+    'Under Review': 'under_review',
+    'In Progress': 'in_progress',
+    'Resolved': 'resolved',
+    'Closed': 'closed',
+}
+
+
+class Snapshot(NamedTuple):
+    department: Optional[str]
+    status: str
+    # Resolution time in seconds while the complaint is Resolved
+    resolution_seconds: Optional[float]
+
+
+def snapshot(complaint: Complaint) -> Snapshot:
+    resolution_seconds = None
+    if complaint.status == 'Resolved' and complaint.date_resolved:
+        resolution_seconds = (complaint.date_resolved - complaint.date_submitted).total_seconds()
+    return Snapshot(complaint.primary_department, complaint.status, resolution_seconds)
+
+
+class SummaryDelta:
+    """Per-scope column deltas, applied in one UPDATE per scope"""
+    
+    def __init__(self):
+        self.deltas: Dict[str, Counter] = defaultdict(Counter)
+    
+    def add(self, state: Snapshot, sign: int = 1):
+        for scope in (OVERALL, state.department) if state.department else (OVERALL,):
+            delta = self.deltas[scope]
+            delta['total'] += sign
+            delta[STATUS_COLUMNS[state.status]] += sign
+            if state.resolution_seconds is not None:
+                delta['resolution_seconds'] += sign * state.resolution_seconds
+                delta['resolution_count'] += sign
+    
+    def change(self, before: Optional[Snapshot], after: Optional[Snapshot]):
+        if before == after:
+            return
+        if before is not None:
+            self.add(before, -1)
+        if after is not None:
+            self.add(after)
+    
+    def apply(self):
+        now = timezone.now()
+        for scope, delta in self.deltas.items():
+            changes = {column: F(column) + value for column, value in delta.items() if value}
+            if not changes:
+                continue
+            AnalyticsSummary.objects.get_or_create(scope=scope)
+            AnalyticsSummary.objects.filter(scope=scope).update(updated_at=now, **changes)
+        self.deltas.clear()
+
+
+def record_change(before: Optional[Snapshot], after: Optional[Snapshot]):
+    """Apply one complaint's change (``before`` None for a new complaint)"""
+    delta = SummaryDelta()
+    delta.change(before, after)
+    delta.apply()
+
+
+def summarize(rows: Iterable[tuple]) -> Dict[str, Counter]:
+    """
+    Summary columns per scope from ``(primary_department, status,
+    date_submitted, date_resolved)`` rows
+    """
+    delta = SummaryDelta()
+    for department, status, date_submitted, date_resolved in rows:
+        resolution_seconds = None
+        if status == 'Resolved' and date_resolved:
+            resolution_seconds = (date_resolved - date_submitted).total_seconds()
+        delta.add(Snapshot(department, status, resolution_seconds))
+    return delta.deltas
+
+
+def rebuild(summary_model=AnalyticsSummary, complaint_model=Complaint) -> int:
+    """Recompute every summary row from the complaints table; returns the complaint count"""
+    rows = (complaint_model.objects
+            .order_by()
+            .values_list('primary_department', 'status', 'date_submitted', 'date_resolved')
+            .iterator(chunk_size=2000))
+    summaries = summarize(rows)
+    summaries.setdefault(OVERALL, Counter())
+    with transaction.atomic():
+        summary_model.objects.all().delete()
+        summary_model.objects.bulk_create(
+            summary_model(scope=scope, **counts) for scope, counts in summaries.items()
+        )
+    return summaries[OVERALL]['total']
+
+
+def report() -> Dict:
+    """The /api/analytics payload, read from the summary rows"""
+    summaries = {summary.scope: summary for summary in AnalyticsSummary.objects.all()}
+    overall = summaries.get(OVERALL) or AnalyticsSummary(scope=OVERALL)
+    
+    def pending(summary: AnalyticsSummary) -> int:
+        return summary.submitted + summary.under_review + summary.in_progress
+    
+    if overall.resolution_count:
+        avg_days = overall.resolution_seconds / overall.resolution_count / 86400
+        avg_resolution_time = f"{avg_days:.1f} Days"
+    else:
+        avg_resolution_time = "N/A"
+    
+    return {
+        'total': overall.total,
+        'pending': pending(overall),
+        'resolved': overall.resolved,
+        'avgResolutionTime': avg_resolution_time,
+        'byStatus': {status: getattr(overall, column) for status, column in STATUS_COLUMNS.items()},
+        'byDepartment': {
+            scope: {'total': summary.total, 'pending': pending(summary), 'resolved': summary.resolved}
+            for scope, summary in summaries.items()
+            if scope != OVERALL and summary.total
+        },
+    }
@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        from django.conf import settings
+        from . import timing
+        timing.configure(settings.STAGE_TIMING_SINKS)
+        from . import nlp_service
+        # Pool workers load the model in their initializer and never start a pool
+        if settings.NLP_WARMUP_ON_START and not nlp_service.in_worker():
+            nlp_service.warm_up(background=True)
@@ -0,0 +1,169 @@
+"""
+Stage-level microbenchmarks for the complaint classifier.
+
+Corpora are built from the ``generate_training_data`` templates, each stage
+of ``classify_multi_department`` is timed on its own with its inputs
+prepared outside the timer, and the report is plain JSON so results from
+different releases can be diffed.
+"""
+import datetime
+import platform
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+STAGES = (
+    'preprocess', 'keywords', 'tfidf', 'predict_proba', 'sentiment',
+    'sentiment_lexicon', 'suggested_steps', 'classify',
+)
+
+# Stage input preparation (untimed) and the timed call
+StageSpec = Tuple[Callable[[List[str]], list], Callable]
+
+
+def generate_corpus(classifier, size: int, words: int, seed: int = 0) -> List[str]:
+    """
+    ``size`` complaint texts of about ``words`` words, made by joining
+    randomly chosen training templates until the length is reached
+    """
+    rng = random.Random(seed)
+    templates = [item['text'] for item in classifier.generate_training_data()]
+    corpus = []
+    for _ in range(size):
+        tokens: List[str] = []
+        while len(tokens) < words:
+            tokens.extend(rng.choice(templates).split())
+        corpus.append(' '.join(tokens[:words]))
+    return corpus
+
+
+def peak_rss_kb() -> Optional[int]:
+    """Peak resident set size of this process in KiB (None where unsupported)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux KiB
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def summarize(durations_ns: Sequence[int]) -> Dict[str, float]:
+    """Latency percentiles in milliseconds and throughput per second"""
+    durations = np.asarray(durations_ns, dtype=float) / 1e6
+    total_seconds = durations.sum() / 1000
+    p50, p95, p99 = np.percentile(durations, [50, 95, 99])
+    return {
+        'calls': len(durations),
+        'meanMs': round(float(durations.mean()), 4),
+        'p50Ms': round(float(p50), 4),
+        'p95Ms': round(float(p95), 4),
+        'p99Ms': round(float(p99), 4),
+        'throughputPerSec': round(len(durations) / total_seconds, 1) if total_seconds else None,
+    }
+
+
+def stage_specs(classifier) -> Dict[str, StageSpec]:
+    from textblob import TextBlob
+    from . import sentiment
+
+    def preprocessed(texts):
+        return [classifier.preprocess_text(text) for text in texts]
+
+    def features(texts):
+        return [classifier.featurize([text]) for text in preprocessed(texts)]
+
+    def steps_inputs(texts):
+        departments = list(classifier.departments) + ['Others']
+        urgencies = ['High', 'Medium', 'Low']
+        return [(departments[i % len(departments)], urgencies[i % len(urgencies)]) for i in range(len(texts))]
+
+    return {
+        'preprocess': (list, classifier.preprocess_text),
+        'keywords': (lambda texts: [text.lower() for text in texts], classifier.matcher.scan),
+        'tfidf': (preprocessed, lambda text: classifier.featurize([text])),
+        'predict_proba': (features, classifier.predict_proba_matrix),
+        'sentiment': (list, lambda text: TextBlob(text).sentiment.polarity),
+        'sentiment_lexicon': (lambda texts: [text.lower() for text in texts], sentiment.polarity),
+        'suggested_steps': (steps_inputs, lambda args: classifier.get_suggested_steps(*args)),
+        # Uncached end-to-end classification
+        'classify': (list, lambda text: classifier._classify_multi_department(text, 0.5)),
+    }
+
+
+def time_stage(prepare: Callable[[List[str]], list], call: Callable, texts: List[str],
+               warmup: int = 10) -> Dict[str, float]:
+    inputs = prepare(texts)
+    for item in inputs[:warmup]:
+        call(item)
+    durations = []
+    clock = time.perf_counter_ns
+    for item in inputs:
+        start = clock()
+        call(item)
+        durations.append(clock() - start)
+    return summarize(durations)
+
+
+def time_batches(classifier, texts: List[str], batch_size: int) -> Dict[str, float]:
+    """Throughput of ``classify_batch`` over the corpus in batches"""
+    durations = []
+    for start in range(0, len(texts), batch_size):
+        batch = texts[start:start + batch_size]
+        began = time.perf_counter_ns()
+        classifier.classify_batch(batch)
+        durations.append(time.perf_counter_ns() - began)
+    total_seconds = sum(durations) / 1e9
+    return dict(
+        summarize(durations),
+        batchSize=batch_size,
+        textsPerSec=round(len(texts) / total_seconds, 1) if total_seconds else None,
+    )
+
+
+def run_benchmark(classifier, size: int = 1000, words: int = 40, seed: int = 0,
+                  stages: Sequence[str] = STAGES, batch_size: int = 100,
+                  warmup: int = 10) -> Dict:
+    """Benchmark the requested stages on a generated corpus and return the report"""
+    import sklearn
+
+    texts = generate_corpus(classifier, size, words, seed)
+    specs = stage_specs(classifier)
+    report = {
+        'meta': {
+            'createdAt': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'corpusSize': size,
+            'textWords': words,
+            'seed': seed,
+            'modelVersion': classifier.model_version,
+            'python': platform.python_version(),
+            'sklearn': sklearn.__version__,
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+        },
+        'stages': {},
+    }
+    for name in stages:
+        prepare, call = specs[name]
+        report['stages'][name] = time_stage(prepare, call, texts, warmup)
+    if batch_size:
+        report['batch'] = time_batches(classifier, texts, batch_size)
+    report['peakRssKb'] = peak_rss_kb()
+    return report
+
+
+def compare(report: Dict, baseline: Dict) -> Dict[str, Dict[str, Optional[float]]]:
+    """p50/p95 ratios (current / baseline) for stages present in both reports"""
+    ratios = {}
+    for name, current in report['stages'].items():
+        previous = baseline.get('stages', {}).get(name)
+        if not previous:
+            continue
+        ratios[name] = {
+            key: round(current[key] / previous[key], 3) if previous.get(key) else None
+            for key in ('p50Ms', 'p95Ms')
+        }
+    return ratios
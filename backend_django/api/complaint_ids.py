@@ -0,0 +1,99 @@
+"""
+Complaint ID allocation.
+
+IDs are ``SMG-<year>-<number>``, numbered from a per-year
+``ComplaintSequence`` row. Each process reserves a block of numbers with one
+atomic UPDATE in a short transaction of its own (hi/lo) and hands them out
+from memory under a lock, so concurrent submissions never read-and-increment
+the same value. Numbers left in a block when a process exits are skipped:
+IDs are unique and increase within a process, but can have gaps and are
+not in submission order across workers.
+"""
+import datetime
+import re
+import threading
+from typing import Callable, Optional
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Complaint, ComplaintSequence
+
+PREFIX = 'SMG'
+ID_PATTERN = re.compile(rf'^{PREFIX}-(\d{{4}})-(\d+)$')
+
+
+def format_id(year: int, number: int) -> str:
+    return f"{PREFIX}-{year}-{str(number).zfill(4)}"
+
+
+def highest_existing(year: int) -> int:
+    """Highest number of ``year`` already used by a complaint (0 if none)"""
+    highest = 0
+    ids = Complaint.objects.filter(id__startswith=f'{PREFIX}-{year}-').values_list('id', flat=True)
+    for complaint_id in ids.iterator():
+        match = ID_PATTERN.match(complaint_id)
+        if match:
+            highest = max(highest, int(match.group(2)))
+    return highest
+
+
+def reserve_block(year: int, size: int) -> int:
+    """
+    Reserve ``size`` consecutive numbers of ``year`` and return the first.
+    Must not run inside a caller's transaction: if that rolled back, the
+    numbers would be handed out again.
+    """
+    with transaction.atomic():
+        sequence = ComplaintSequence.objects.filter(year=year)
+        if not sequence.update(next_value=F('next_value') + size):
+            # First block of the year: start after any IDs already in use
+            try:
+                with transaction.atomic():
+                    start = highest_existing(year) + 1
+                    ComplaintSequence.objects.create(year=year, next_value=start + size)
+                    return start
+            except IntegrityError:
+                # Another worker created the row first
+                sequence.update(next_value=F('next_value') + size)
+        return sequence.values_list('next_value', flat=True).get() - size
+
+
+class BlockAllocator:
+    """Hands out complaint IDs from blocks of ``block_size`` reserved numbers"""
+
+    def __init__(self, block_size: int, clock: Callable[[], datetime.date] = timezone.localdate):
+        self.block_size = block_size
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._year: Optional[int] = None
+        self._next = 0
+        self._limit = 0
+
+    def next_id(self) -> str:
+        year = self.clock().year
+        with self._lock:
+            # A new year starts a new block (and the numbering over)
+            if year != self._year or self._next >= self._limit:
+                self._next = reserve_block(year, self.block_size)
+                self._limit = self._next + self.block_size
+                self._year = year
+            number = self._next
+            self._next += 1
+        return format_id(year, number)
+
+
+_allocator: Optional[BlockAllocator] = None
+_allocator_lock = threading.Lock()
+
+
+def get_allocator() -> BlockAllocator:
+    global _allocator
+    if _allocator is None:
+        from django.conf import settings
+
+        with _allocator_lock:
+            if _allocator is None:
+                _allocator = BlockAllocator(settings.COMPLAINT_ID_BLOCK_SIZE)
+    return _allocator
@@ -0,0 +1,53 @@
+"""
+Conditional GET (ETag / Last-Modified) for polled endpoints.
+
+Each endpoint supplies a validator function computed with one small
+aggregate query (the row's ``date_updated``, or ``max(date_updated)`` and
+``count`` over the caller's scope). ``conditional`` wraps Django's
+``condition`` decorator, so ``If-None-Match`` / ``If-Modified-Since`` are
+answered with 304 before the view queries or serializes anything, and
+200 responses carry the ``ETag`` and ``Last-Modified`` headers.
+"""
+import datetime
+import hashlib
+from typing import Any, Callable, Iterable, Optional, Tuple
+
+from django.views.decorators.http import condition
+
+# (ETag source values, Last-Modified), or None when there is nothing to validate
+Validators = Optional[Tuple[Iterable[Any], Optional[datetime.datetime]]]
+
+
+def make_etag(*parts: Any) -> str:
+    """Short opaque ETag from the values a response depends on"""
+    digest = hashlib.blake2b(digest_size=12)
+    for part in parts:
+        digest.update(repr(part).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def query_key(request) -> Tuple[Tuple[str, str], ...]:
+    """Query parameters, which select the representation, as an ETag part"""
+    return tuple(sorted(request.GET.items()))
+
+
+def conditional(validators: Callable[..., Validators]):
+    """
+    Decorate a view (inside ``require_auth``) with conditional GET support;
+    ``validators(request, *args, **kwargs)`` runs at most once per request
+    """
+    def cached(request, *args, **kwargs) -> Validators:
+        if not hasattr(request, '_conditional_validators'):
+            request._conditional_validators = validators(request, *args, **kwargs)
+        return request._conditional_validators
+
+    def etag(request, *args, **kwargs):
+        result = cached(request, *args, **kwargs)
+        return make_etag(*result[0]) if result else None
+
+    def last_modified(request, *args, **kwargs):
+        result = cached(request, *args, **kwargs)
+        return result[1] if result else None
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
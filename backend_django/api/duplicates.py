@@ -0,0 +1,136 @@
+"""
+Near-duplicate complaint detection with MinHash and locality-sensitive hashing.
+
+A complaint's description and location are shingled into character
+5-grams and 3-grams (locations ignoring spaces and punctuation, so
+"M.G. Road" matches "MG Road") and each summarized by a MinHash signature (128 and 16 values).
+The description signature is split into 32 bands of 4 values, and every
+band hashes to one LSH bucket row in the database. Complaints sharing any
+bucket are candidates, so a lookup is an indexed ``bucket IN (...)`` query
+whose cost depends on the number of near-duplicates, not on the size of
+the table. Candidates are then checked against the estimated Jaccard
+similarity of both their descriptions and their locations.
+"""
+import hashlib
+import re
+import zlib
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .models import Complaint, ComplaintSignature, SignatureBucket
+
+NUM_PERM = 128
+LOCATION_PERM = 16
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 5
+LOCATION_SHINGLE_SIZE = 3
+
+# Multiply-shift hash family: h(x) = ((a * x + b) mod 2**64) >> 32 with odd a
+_rng = np.random.RandomState(20240611)
+_A = (_rng.randint(0, 2 ** 62, size=NUM_PERM + LOCATION_PERM, dtype=np.int64).astype(np.uint64)
+      << np.uint64(1)) | np.uint64(1)
+_B = _rng.randint(0, 2 ** 62, size=NUM_PERM + LOCATION_PERM, dtype=np.int64).astype(np.uint64)
+
+_NON_WORD_RE = re.compile(r'[^a-z0-9]+')
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set:
+    """Character shingles of text"""
+    if len(text) <= size:
+        return {text}
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def _minhash(shingle_set: set, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    hashes = np.fromiter((zlib.crc32(shingle.encode('utf-8')) for shingle in shingle_set), dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        permuted = (a[:, None] * hashes[None, :] + b[:, None]) >> np.uint64(32)
+    return permuted.min(axis=1).astype(np.uint32)
+
+
+def minhash(description: str, location: str) -> np.ndarray:
+    """
+    Signature of a complaint: NUM_PERM uint32 values for the description
+    followed by LOCATION_PERM for the location
+    """
+    description = _NON_WORD_RE.sub(' ', description.lower()).strip()
+    location = _NON_WORD_RE.sub('', location.lower())
+    return np.concatenate([
+        _minhash(shingles(description), _A[:NUM_PERM], _B[:NUM_PERM]),
+        _minhash(shingles(location, LOCATION_SHINGLE_SIZE), _A[NUM_PERM:], _B[NUM_PERM:]),
+    ])
+
+
+def bucket_keys(signature: np.ndarray) -> List[int]:
+    """One signed 64-bit LSH bucket key per band (the band number is part of the key)"""
+    keys = []
+    for band in range(BANDS):
+        digest = hashlib.blake2b(signature[band * ROWS:(band + 1) * ROWS].tobytes(),
+                                 digest_size=8, person=band.to_bytes(2, 'little'))
+        keys.append(int.from_bytes(digest.digest(), 'little', signed=True))
+    return keys
+
+
+def similarity(first: np.ndarray, second: np.ndarray) -> float:
+    """Estimated Jaccard similarity of the descriptions of two signatures"""
+    return float(np.mean(first[:NUM_PERM] == second[:NUM_PERM]))
+
+
+def location_similarity(first: np.ndarray, second: np.ndarray) -> float:
+    return float(np.mean(first[NUM_PERM:] == second[NUM_PERM:]))
+
+
+def find_duplicates(signature: np.ndarray, threshold: float, location_threshold: float,
+                    limit: int, exclude_id: Optional[str] = None) -> List[Dict]:
+    """
+    Open complaints whose description similarity is at least ``threshold``
+    and location similarity at least ``location_threshold``, most similar
+    first, as ``{'id', 'similarity', 'duplicateOf'}`` dicts
+    """
+    candidate_ids = (SignatureBucket.objects
+                     .filter(bucket__in=bucket_keys(signature))
+                     .values_list('complaint_id', flat=True)
+                     .distinct())
+    candidates = (ComplaintSignature.objects
+                  .filter(complaint_id__in=candidate_ids, complaint__status__in=Complaint.OPEN_STATUSES)
+                  .exclude(complaint_id=exclude_id)
+                  .values_list('complaint_id', 'minhash', 'complaint__duplicate_of_id'))
+
+    matches = []
+    for complaint_id, stored, duplicate_of_id in candidates:
+        other = np.frombuffer(bytes(stored), dtype=np.uint32)
+        score = similarity(signature, other)
+        if score >= threshold and location_similarity(signature, other) >= location_threshold:
+            matches.append({'id': complaint_id, 'similarity': round(score, 3), 'duplicateOf': duplicate_of_id})
+    matches.sort(key=lambda match: (-match['similarity'], match['id']))
+    return matches[:limit]
+
+
+def cluster_root(matches: List[Dict]) -> Optional[str]:
+    """The complaint a new duplicate of ``matches`` should be linked to"""
+    if not matches:
+        return None
+    best = matches[0]
+    return best['duplicateOf'] or best['id']
+
+
+def index_complaint(complaint: Complaint, signature: np.ndarray):
+    """Add a complaint's signature and LSH buckets to the index"""
+    ComplaintSignature.objects.create(complaint=complaint, minhash=signature.tobytes())
+    SignatureBucket.objects.bulk_create(
+        SignatureBucket(complaint=complaint, bucket=key) for key in bucket_keys(signature)
+    )
+
+
+def index_complaints(complaints: Iterable[Complaint], batch_size: int = 500) -> int:
+    """Bulk-index complaints that have no signature yet; returns how many were indexed"""
+    signatures, buckets = [], []
+    for complaint in complaints:
+        signature = minhash(complaint.description, complaint.location)
+        signatures.append(ComplaintSignature(complaint=complaint, minhash=signature.tobytes()))
+        buckets.extend(SignatureBucket(complaint=complaint, bucket=key) for key in bucket_keys(signature))
+    ComplaintSignature.objects.bulk_create(signatures, batch_size=batch_size)
+    SignatureBucket.objects.bulk_create(buckets, batch_size=batch_size)
+    return len(signatures)
@@ -120,4 +120,5 @@ ERROR_CODES = {
     'INVALID_STATUS': 'Invalid complaint status',
     'INVALID_INPUT': 'Invalid input provided',
     'MULTI_DEPT_ROUTING': 'Complaint routed to multiple departments',
+    'NLP_TIMEOUT': 'Complaint classification timed out',
 }
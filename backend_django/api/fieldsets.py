@@ -0,0 +1,97 @@
+"""
+Sparse fieldsets for complaint representations.
+
+Complaint endpoints accept ``?view=summary|full`` or an explicit
+``?fields=id,title,status``. The selected fields decide both the response
+keys and the columns the ORM reads (``.only()``), so a summary list never
+loads ``description`` or the multi-KB ``nlp_analysis`` blob, and never joins
+the user table unless ``userName`` is asked for.
+"""
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Optional, Sequence, Tuple
+
+
+class Field(NamedTuple):
+    # Model columns (``.only()`` names) the field reads
+    columns: Tuple[str, ...]
+    value: Callable[[Any], Any]
+
+
+def _isoformat(column: str) -> Field:
+    return Field((column,), lambda complaint: getattr(complaint, column).isoformat())
+
+
+def _column(column: str) -> Field:
+    return Field((column,), lambda complaint: getattr(complaint, column))
+
+
+COMPLAINT_FIELDS: Dict[str, Field] = {
+    'id': _column('id'),
+    'user_id': Field(('user',), lambda complaint: str(complaint.user_id)),
+    'userName': Field(('user', 'user__name'), lambda complaint: complaint.user.name),
+    'title': _column('title'),
+    'description': _column('description'),
+    'location': _column('location'),
+    'status': _column('status'),
+    'department': _column('department'),
+    'priority': _column('priority'),
+    'confidence_score': _column('confidence_score'),
+    'nlp_analysis': _column('nlp_analysis'),
+    'date_submitted': _isoformat('date_submitted'),
+    'date_updated': _isoformat('date_updated'),
+    'duplicateOf': Field(('duplicate_of',), lambda complaint: complaint.duplicate_of_id),
+}
+
+SUMMARY_FIELDS = ('id', 'title', 'status', 'priority', 'department', 'date_submitted', 'date_updated')
+
+VIEWS = ('summary', 'full')
+
+
+class InvalidFields(ValueError):
+    pass
+
+
+def requested_fields(query_params, full: Sequence[str]) -> Tuple[str, ...]:
+    """
+    Fields selected by ``?fields=`` or ``?view=`` (default ``full``), in the
+    order of ``full``; ``id`` is always included
+    """
+    fields = query_params.get('fields')
+    view = query_params.get('view')
+    if fields is not None and view is not None:
+        raise InvalidFields('Use either fields or view, not both')
+    if fields is not None:
+        selected = {name.strip() for name in fields.split(',') if name.strip()}
+        unknown = sorted(selected - set(full))
+        if unknown:
+            raise InvalidFields(f"Unknown field(s): {', '.join(unknown)}. Available: {', '.join(full)}")
+    elif view in (None, 'full'):
+        selected = set(full)
+    elif view == 'summary':
+        selected = set(SUMMARY_FIELDS)
+    else:
+        raise InvalidFields(f"Unknown view: {view}. Available: {', '.join(VIEWS)}")
+    selected.add('id')
+    return tuple(name for name in full if name in selected)
+
+
+def project(queryset, fields: Iterable[str], extra_columns: Iterable[str] = ()):
+    """Restrict ``queryset`` to the columns ``fields`` (plus ``extra_columns``) read"""
+    columns = {'id', *extra_columns}
+    for name in fields:
+        field = COMPLAINT_FIELDS.get(name)
+        if field:
+            columns.update(field.columns)
+    if 'user__name' in columns:
+        queryset = queryset.select_related('user')
+    return queryset.only(*sorted(columns))
+
+
+def represent(complaint, fields: Iterable[str], extra: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Response dict of the model ``fields`` of a complaint, plus precomputed ``extra`` values"""
+    data = {}
+    for name in fields:
+        if name in COMPLAINT_FIELDS:
+            data[name] = COMPLAINT_FIELDS[name].value(complaint)
+        elif extra is not None and name in extra:
+            data[name] = extra[name]
+    return data
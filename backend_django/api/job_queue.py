@@ -0,0 +1,125 @@
+"""Database-backed queue of pending complaint classifications"""
+import datetime
+import logging
+import uuid
+from typing import List, Tuple
+
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from . import analytics, rollups
+from .models import ClassificationJob, Complaint
+from .routing import record_routing, route_confidences, routing_fields, sync_routes
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_classification(complaint: Complaint) -> ClassificationJob:
+    """Queue a complaint for classification by ``manage.py classify_worker``"""
+    return ClassificationJob.objects.create(complaint=complaint)
+
+
+def claim_jobs(batch_size: int, lease_seconds: float) -> List[ClassificationJob]:
+    """
+    Claim up to ``batch_size`` jobs for this worker.
+    Jobs left running longer than ``lease_seconds`` (a crashed worker) are
+    claimable again. The conditional UPDATE makes claims exclusive even on
+    SQLite; databases with SKIP LOCKED also avoid contending on the rows.
+    """
+    now = timezone.now()
+    token = uuid.uuid4().hex
+    claimable = Q(status=ClassificationJob.PENDING) | Q(
+        status=ClassificationJob.RUNNING,
+        started_at__lt=now - datetime.timedelta(seconds=lease_seconds)
+    )
+    
+    with transaction.atomic():
+        candidates = ClassificationJob.objects.filter(claimable).order_by('id')
+        if connection.features.has_select_for_update_skip_locked:
+            candidates = candidates.select_for_update(skip_locked=True)
+        ids = list(candidates.values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return []
+        ClassificationJob.objects.filter(claimable, id__in=ids).update(
+            status=ClassificationJob.RUNNING,
+            claimed_by=token,
+            started_at=now,
+            attempts=F('attempts') + 1
+        )
+    
+    return list(
+        ClassificationJob.objects.filter(claimed_by=token, status=ClassificationJob.RUNNING)
+        .select_related('complaint')
+        .order_by('id')
+    )
+
+
+def run_jobs(jobs: List[ClassificationJob], max_attempts: int) -> Tuple[int, int]:
+    """
+    Classify claimed jobs in one batch and route their complaints.
+    Returns ``(routed, failed)``; failed jobs are retried until
+    ``max_attempts`` is reached. Jobs whose lease was lost to another
+    worker meanwhile are left to that worker and count as neither.
+    """
+    from .nlp_classifier import classifier
+    
+    if not jobs:
+        return 0, 0
+    
+    try:
+        results = classifier.classify_batch([job.complaint.description for job in jobs])
+    except Exception as e:
+        logger.exception("Batch classification failed for %d jobs", len(jobs))
+        for job in jobs:
+            _fail(job, e, max_attempts)
+        return 0, len(jobs)
+    
+    routed = failed = 0
+    for job, nlp_result in zip(jobs, results):
+        try:
+            with transaction.atomic():
+                # Completing the job first makes this worker the only one to route the complaint
+                if not _finish(job, ClassificationJob.DONE, last_error='', finished_at=timezone.now()):
+                    logger.warning("Lost the lease on job %s, leaving complaint %s to its new worker",
+                                   job.id, job.complaint_id)
+                    continue
+                # Re-read the complaint: officers may have changed it since the job was claimed
+                complaint = Complaint.objects.select_for_update().select_related('user').get(id=job.complaint_id)
+                before = analytics.snapshot(complaint)
+                fields = routing_fields(nlp_result)
+                for field, value in fields.items():
+                    setattr(complaint, field, value)
+                complaint.save(update_fields=[*fields, 'date_updated'])
+                analytics.record_change(before, analytics.snapshot(complaint))
+                sync_routes([complaint], {complaint.id: route_confidences(nlp_result)})
+                rollups.record_submission(complaint)
+                record_routing(complaint, complaint.user, nlp_result)
+            routed += 1
+        except Exception as e:
+            logger.exception("Routing failed for complaint %s", job.complaint_id)
+            _fail(job, e, max_attempts)
+            failed += 1
+    
+    return routed, failed
+
+
+def _finish(job: ClassificationJob, status: str, **fields) -> bool:
+    """Move a job this worker still holds out of RUNNING; False when its lease was lost"""
+    return bool(ClassificationJob.objects.filter(
+        pk=job.pk, claimed_by=job.claimed_by, status=ClassificationJob.RUNNING
+    ).update(status=status, **fields))
+
+
+def _fail(job: ClassificationJob, error: Exception, max_attempts: int):
+    exhausted = job.attempts >= max_attempts
+    finished = _finish(
+        job,
+        ClassificationJob.FAILED if exhausted else ClassificationJob.PENDING,
+        last_error=str(error),
+        finished_at=timezone.now() if exhausted else None
+    )
+    if finished and exhausted:
+        Complaint.objects.filter(id=job.complaint_id).update(
+            classification_status=Complaint.CLASSIFICATION_FAILED
+        )
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from api.rollups import backfill
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the hourly/daily analytics rollups from complaints and their status history'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000, help='Rows streamed per database round trip')
+
+    def handle(self, *args, **options):
+        events = backfill(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Analytics rollups rebuilt from {events} event(s)'))
@@ -0,0 +1,54 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from api.benchmark import STAGES, compare, run_benchmark
+from api.nlp_classifier import classifier
+
+
+class Command(BaseCommand):
+    help = 'Benchmark each stage of the NLP classifier and report latency percentiles as JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=1000, help='Number of generated complaint texts')
+        parser.add_argument('--words', type=int, default=40, help='Words per generated text')
+        parser.add_argument('--seed', type=int, default=0, help='Corpus random seed')
+        parser.add_argument('--stage', action='append', dest='stages', choices=STAGES,
+                            help='Only benchmark this stage (repeatable; default all)')
+        parser.add_argument('--batch-size', type=int, default=100,
+                            help='Batch size for the classify_batch run (0 skips it)')
+        parser.add_argument('--warmup', type=int, default=10, help='Untimed calls per stage')
+        parser.add_argument('--output', help='Write the JSON report to this file')
+        parser.add_argument('--compare', help='Baseline report to compute p50/p95 ratios against')
+
+    def handle(self, *args, **options):
+        if options['size'] < 1 or options['words'] < 1:
+            raise CommandError('--size and --words must be positive')
+
+        report = run_benchmark(
+            classifier.get(),
+            size=options['size'],
+            words=options['words'],
+            seed=options['seed'],
+            stages=options['stages'] or STAGES,
+            batch_size=options['batch_size'],
+            warmup=options['warmup'],
+        )
+
+        if options['compare']:
+            try:
+                with open(options['compare']) as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Could not read baseline report: {e}")
+            report['comparison'] = {
+                'baseline': baseline.get('meta', {}).get('createdAt'),
+                'ratios': compare(report, baseline),
+            }
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Wrote benchmark report to {options['output']}"))
+        else:
+            self.stdout.write(output)
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from api.similar_index import SimilarityIndex
+
+
+class Command(BaseCommand):
+    help = 'Compact the similar-complaints vector index (or rebuild it with the current model)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true',
+                            help="Re-index every complaint with the classifier's current model")
+        parser.add_argument('--keep', type=int, default=2, help='Index generations to keep on disk')
+
+    def handle(self, *args, **options):
+        index = SimilarityIndex(settings.SIMILAR_INDEX_DIR)
+        if options['rebuild'] or not index.load():
+            generation = index.build()
+        else:
+            generation = index.compact()
+        removed = index.prune(options['keep'])
+
+        stats = index.stats()
+        self.stdout.write(self.style.SUCCESS(
+            f"Similar-complaints index generation {generation}: {stats['baseRows']} complaint(s), "
+            f"model {stats['modelVersion']} ({len(removed)} old generation(s) removed)"
+        ))
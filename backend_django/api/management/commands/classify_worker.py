@@ -0,0 +1,42 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from api.job_queue import claim_jobs, run_jobs
+
+
+class Command(BaseCommand):
+    help = 'Drain queued complaint classifications (NLP_EXECUTION_MODE=async) in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.NLP_WORKER_BATCH_SIZE,
+                            help='Jobs classified together in one batch')
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Seconds to sleep when the queue is empty')
+        parser.add_argument('--once', action='store_true',
+                            help='Exit once the queue is empty instead of polling')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        self.stdout.write(f'Classification worker started (batch size {batch_size})')
+
+        total_routed = total_failed = 0
+        try:
+            while True:
+                jobs = claim_jobs(batch_size, settings.NLP_JOB_LEASE_SECONDS)
+                if not jobs:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                routed, failed = run_jobs(jobs, settings.NLP_JOB_MAX_ATTEMPTS)
+                total_routed += routed
+                total_failed += failed
+                self.stdout.write(f'Routed {routed} complaint(s), {failed} failed')
+        except KeyboardInterrupt:
+            self.stdout.write('Stopping worker')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Classification worker finished: {total_routed} routed, {total_failed} failed'
+        ))
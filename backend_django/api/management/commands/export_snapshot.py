@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Export complaints, history and users to a columnar (Arrow/Feather) analytics snapshot'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per record batch')
+        parser.add_argument('--compression', choices=['zstd', 'lz4', 'uncompressed'],
+                            default=settings.ANALYTICS_SNAPSHOT_COMPRESSION)
+        parser.add_argument('--keep', type=int, default=3, help='Snapshots to keep on disk')
+
+    def handle(self, *args, **options):
+        from api.snapshots import export_snapshot, prune
+
+        root = settings.ANALYTICS_SNAPSHOT_DIR
+        generation = export_snapshot(root, options['compression'], options['batch_size'])
+        removed = prune(root, options['keep'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Exported analytics snapshot {generation} ({len(removed)} old snapshot(s) removed)'
+        ))
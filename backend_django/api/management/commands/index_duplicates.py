@@ -0,0 +1,35 @@
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from api.duplicates import index_complaints
+from api.models import Complaint, ComplaintSignature, SignatureBucket
+
+
+class Command(BaseCommand):
+    help = 'Build the near-duplicate (MinHash/LSH) index for complaints that are not indexed yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Complaints indexed per transaction')
+        parser.add_argument('--rebuild', action='store_true', help='Drop the index and rebuild it from scratch')
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            SignatureBucket.objects.all().delete()
+            ComplaintSignature.objects.all().delete()
+
+        rows = (Complaint.objects
+                .filter(signature__isnull=True)
+                .order_by('id')
+                .only('id', 'description', 'location')
+                .iterator(chunk_size=options['chunk_size']))
+        total = 0
+        while True:
+            chunk = list(islice(rows, options['chunk_size']))
+            if not chunk:
+                break
+            with transaction.atomic():
+                total += index_complaints(chunk)
+            self.stdout.write(f'Indexed {total} complaint(s)')
+
+        self.stdout.write(self.style.SUCCESS(f'Duplicate index up to date ({total} complaint(s) added)'))
@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from api.model_store import ModelStore
+from api.nlp_classifier import ComplaintClassifier
+from api.online_learning import learn_from_feedback
+
+
+class Command(BaseCommand):
+    help = 'Train the NLP classifier incrementally on officer re-routing corrections'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=None,
+                            help='Maximum number of corrections to train on in this run')
+        parser.add_argument('--weight', type=float, default=settings.NLP_FEEDBACK_WEIGHT,
+                            help='Sample weight of each correction')
+        parser.add_argument('--no-promote', action='store_true',
+                            help='Save the new version without promoting it')
+
+    def handle(self, *args, **options):
+        store = ModelStore(settings.NLP_MODEL_DIR)
+        summary = learn_from_feedback(
+            ComplaintClassifier(store=store),
+            limit=options['limit'],
+            weight=options['weight'],
+            promote=not options['no_promote'],
+        )
+
+        if summary['version'] is None:
+            self.stdout.write(f"No new model version ({summary['skipped']} corrections skipped)")
+            return
+        action = 'Saved' if options['no_promote'] else 'Saved and promoted'
+        self.stdout.write(self.style.SUCCESS(
+            f"{action} model version {summary['version']} from {summary['trained']} corrections "
+            f"({summary['skipped']} skipped, parent {summary['parentVersion']})"
+        ))
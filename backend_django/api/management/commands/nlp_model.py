@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from api.model_store import ModelStore, ModelStoreError
+from api.nlp_classifier import ComplaintClassifier
+
+
+class Command(BaseCommand):
+    help = 'List, train or promote versions of the NLP complaint classifier'
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=['list', 'train', 'promote'])
+        parser.add_argument('version', nargs='?', help='Version to promote')
+        parser.add_argument('--promote', action='store_true', help='Promote the newly trained version')
+
+    def handle(self, *args, **options):
+        store = ModelStore(settings.NLP_MODEL_DIR)
+        action = options['action']
+
+        if action == 'list':
+            current = store.current_version()
+            versions = store.versions()
+            if not versions:
+                self.stdout.write('No model versions stored')
+            for manifest in versions:
+                marker = '*' if manifest['version'] == current else ' '
+                self.stdout.write(
+                    f"{marker} {manifest['version']}  examples={manifest.get('training_examples')} "
+                    f"vocab={manifest.get('vocab_size')} sklearn={manifest.get('sklearn_version')} "
+                    f"data={manifest.get('training_data_hash', '')[:12]}"
+                )
+
+        elif action == 'train':
+            model, texts, labels = ComplaintClassifier(store=store).train_model()
+            version = store.save(model, texts, labels)
+            self.stdout.write(self.style.SUCCESS(f'Saved model version {version}'))
+            if options['promote']:
+                store.promote(version)
+                self.stdout.write(self.style.SUCCESS(f'Promoted {version}'))
+
+        elif action == 'promote':
+            if not options['version']:
+                raise CommandError('promote requires a version (see "nlp_model list")')
+            try:
+                store.promote(options['version'])
+            except ModelStoreError as e:
+                raise CommandError(str(e))
+            self.stdout.write(self.style.SUCCESS(
+                f"Promoted {options['version']}; running workers switch within "
+                f"{settings.NLP_MODEL_CHECK_INTERVAL:g}s"
+            ))
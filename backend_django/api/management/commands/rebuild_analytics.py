@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from api.analytics import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Recompute the analytics summary from the complaints table'
+
+    def handle(self, *args, **options):
+        total = rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Analytics summary rebuilt from {total} complaint(s)'))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand, CommandError
+from api import search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text (FTS5) complaint search index from the complaints table'
+
+    def handle(self, *args, **options):
+        if not search.is_supported():
+            raise CommandError('Full-text search requires the SQLite backend')
+        total = search.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Search index rebuilt ({total} complaint(s))'))
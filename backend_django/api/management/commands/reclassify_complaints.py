@@ -0,0 +1,79 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from api.models import Complaint
+from api.reclassify import Checkpoint, complaints_to_reclassify, reclassify
+
+
+class Command(BaseCommand):
+    help = 'Re-route existing complaints with the current NLP model, streaming them in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--status', action='append', dest='statuses',
+                            choices=[choice for choice, _ in Complaint.STATUS_CHOICES],
+                            help='Only complaints with this status (repeatable)')
+        parser.add_argument('--since', type=datetime.date.fromisoformat,
+                            help='Only complaints submitted on or after this date (YYYY-MM-DD)')
+        parser.add_argument('--until', type=datetime.date.fromisoformat,
+                            help='Only complaints submitted on or before this date (YYYY-MM-DD)')
+        parser.add_argument('--department', help='Only complaints currently routed to this department')
+        parser.add_argument('--chunk-size', type=int, default=500,
+                            help='Complaints read, classified and written per batch')
+        parser.add_argument('--workers', type=int, default=1,
+                            help='Classify batches in this many worker processes')
+        parser.add_argument('--threshold', type=float, default=0.5,
+                            help='Confidence threshold for multi-department routing')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Report routing changes without writing them')
+        parser.add_argument('--resume', action='store_true',
+                            help='Continue after the last checkpointed complaint')
+        parser.add_argument('--checkpoint', default=str(settings.NLP_MODEL_DIR / 'reclassify-checkpoint.json'),
+                            help='Checkpoint file path')
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1 or options['workers'] < 1:
+            raise CommandError('--chunk-size and --workers must be positive')
+
+        filters = {
+            'statuses': sorted(options['statuses'] or []),
+            'since': options['since'].isoformat() if options['since'] else None,
+            'until': options['until'].isoformat() if options['until'] else None,
+            'department': options['department'],
+            'threshold': options['threshold'],
+        }
+        checkpoint = None if options['dry_run'] else Checkpoint(options['checkpoint'], filters)
+        if options['resume']:
+            if checkpoint is None or not checkpoint.load():
+                raise CommandError('No checkpoint for these filters to resume from')
+            self.stdout.write(f'Resuming after {checkpoint.last_id} ({checkpoint.processed} already processed)')
+
+        queryset = complaints_to_reclassify(
+            statuses=options['statuses'], since=options['since'], until=options['until'],
+            department=options['department'], after_id=checkpoint.last_id if checkpoint else None,
+        )
+
+        processed = changed = 0
+        for chunk, changes in reclassify(queryset, chunk_size=options['chunk_size'],
+                                         workers=options['workers'],
+                                         confidence_threshold=options['threshold'],
+                                         dry_run=options['dry_run'], checkpoint=checkpoint):
+            processed += len(chunk)
+            changed += len(changes)
+            if options['dry_run']:
+                for complaint_id, diff in changes:
+                    details = '; '.join(f'{field}: {old} -> {new}' for field, (old, new) in diff.items())
+                    self.stdout.write(f'{complaint_id}  {details}')
+            else:
+                self.stdout.write(f'Reclassified {processed} complaint(s) through {chunk[-1].id}')
+
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(
+                f'Dry run: {changed} of {processed} complaint(s) would be re-routed'
+            ))
+            return
+
+        checkpoint.clear()
+        self.stdout.write(self.style.SUCCESS(
+            f'Reclassified {checkpoint.processed} complaint(s), {checkpoint.changed} re-routed'
+        ))
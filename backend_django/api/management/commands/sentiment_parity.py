@@ -0,0 +1,53 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from api.benchmark import generate_corpus
+from api.models import Complaint
+from api.nlp_classifier import classifier
+from api.sentiment import parity_report
+
+
+class Command(BaseCommand):
+    help = 'Compare the built-in lexicon sentiment engine with TextBlob (latency and label agreement)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--corpus', choices=['complaints', 'file', 'training', 'generated'],
+                            default='complaints',
+                            help='Stored complaint descriptions, a text file with one text per line, '
+                                 'the training templates, or longer texts generated from them')
+        parser.add_argument('--file', help='Text file for --corpus file')
+        parser.add_argument('--size', type=int, default=1000,
+                            help='Generated corpus size, or the number of most recent complaints')
+        parser.add_argument('--words', type=int, default=40, help='Words per generated text')
+        parser.add_argument('--seed', type=int, default=0, help='Generated corpus random seed')
+        parser.add_argument('--output', help='Write the JSON report to this file')
+
+    def handle(self, *args, **options):
+        instance = classifier.get()
+        if options['corpus'] == 'complaints':
+            texts = list(Complaint.objects.order_by('-date_submitted')
+                         .values_list('description', flat=True)[:options['size']])
+        elif options['corpus'] == 'file':
+            if not options['file']:
+                raise CommandError('--corpus file needs --file')
+            with open(options['file']) as f:
+                texts = [line.strip() for line in f if line.strip()]
+        elif options['corpus'] == 'training':
+            texts = [item['text'] for item in instance.generate_training_data()]
+        else:
+            texts = generate_corpus(instance, options['size'], options['words'], options['seed'])
+
+        if not texts:
+            raise CommandError(f"The {options['corpus']} corpus is empty")
+
+        report = dict(parity_report(instance, texts), corpus=options['corpus'])
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+            self.stdout.write(self.style.SUCCESS(
+                f"Wrote parity report to {options['output']}: {report['speedup']}x faster, "
+                f"urgency agreement {report['urgencyAgreement']:.2%}"
+            ))
+        else:
+            self.stdout.write(output)
@@ -52,3 +52,30 @@ class ErrorResponseMiddleware(MiddlewareMixin):
             'message': 'Internal server error',
             'code': 'SERVER_ERROR'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class StageTimingMiddleware(MiddlewareMixin):
+    """
+    Debug timing: when STAGE_TIMING_DEBUG is on and a request sends
+    ``X-Debug-Timing: 1``, return its stage breakdown in a Server-Timing header
+    """
+    
+    def process_request(self, request):
+        from django.conf import settings
+        from . import timing
+        
+        if settings.STAGE_TIMING_DEBUG and request.headers.get('X-Debug-Timing'):
+            request._timing_token = timing.start_trace()
+            request._timing_start = time.perf_counter()
+        return None
+    
+    def process_response(self, request, response):
+        from . import timing
+        
+        token = getattr(request, '_timing_token', None)
+        if token is not None:
+            trace = timing.end_trace(token)
+            trace.append(('total', (time.perf_counter() - request._timing_start) * 1000))
+            response['Server-Timing'] = timing.server_timing(trace)
+            del request._timing_token
+        return response
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='complaint',
+            name='classification_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('classified', 'Classified'), ('failed', 'Failed')], default='classified', max_length=20),
+        ),
+        migrations.CreateModel(
+            name='ClassificationJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('claimed_by', models.CharField(blank=True, max_length=64, null=True)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('complaint', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='classification_jobs', to='api.complaint')),
+            ],
+            options={
+                'db_table': 'classification_jobs',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['status', 'id'], name='classificat_status_fe5a4d_idx'), models.Index(fields=['claimed_by'], name='classificat_claimed_314223_idx')],
+            },
+        ),
+    ]
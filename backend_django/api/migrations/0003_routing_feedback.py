@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_classification_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoutingFeedback',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('text', models.TextField()),
+                ('previous_department', models.CharField(blank=True, max_length=255, null=True)),
+                ('corrected_department', models.CharField(max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('consumed_at', models.DateTimeField(blank=True, null=True)),
+                ('model_version', models.CharField(blank=True, max_length=64, null=True)),
+                ('complaint', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='routing_feedback', to='api.complaint')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.user')),
+            ],
+            options={
+                'db_table': 'routing_feedback',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['consumed_at', 'id'], name='routing_fee_consume_d58334_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_routing_feedback'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ComplaintSignature',
+            fields=[
+                ('complaint', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='signature', serialize=False, to='api.complaint')),
+                ('minhash', models.BinaryField()),
+            ],
+            options={
+                'db_table': 'complaint_signatures',
+            },
+        ),
+        migrations.AddField(
+            model_name='complaint',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='linked_duplicates', to='api.complaint'),
+        ),
+        migrations.CreateModel(
+            name='SignatureBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.BigIntegerField(db_index=True)),
+                ('complaint', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='signature_buckets', to='api.complaint')),
+            ],
+            options={
+                'db_table': 'signature_buckets',
+            },
+        ),
+    ]
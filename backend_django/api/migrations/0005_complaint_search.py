@@ -0,0 +1,59 @@
+from django.db import migrations
+
+FTS_TABLE = 'complaints_fts'
+
+# The original external-content index, replaced by 0011_stable_search_keys
+CREATE_SQL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, description, location,
+        content='complaints', content_rowid='rowid', tokenize='porter unicode61'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS complaints_fts_insert AFTER INSERT ON complaints BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description, location)
+        VALUES (new.rowid, new.title, new.description, new.location);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS complaints_fts_delete AFTER DELETE ON complaints BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, location)
+        VALUES ('delete', old.rowid, old.title, old.description, old.location);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS complaints_fts_update
+        AFTER UPDATE OF title, description, location ON complaints BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, location)
+        VALUES ('delete', old.rowid, old.title, old.description, old.location);
+        INSERT INTO {FTS_TABLE}(rowid, title, description, location)
+        VALUES (new.rowid, new.title, new.description, new.location);
+    END""",
+]
+
+DROP_SQL = [
+    'DROP TRIGGER IF EXISTS complaints_fts_update',
+    'DROP TRIGGER IF EXISTS complaints_fts_delete',
+    'DROP TRIGGER IF EXISTS complaints_fts_insert',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+]
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in CREATE_SQL:
+        schema_editor.execute(statement)
+    schema_editor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in DROP_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_duplicate_detection'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
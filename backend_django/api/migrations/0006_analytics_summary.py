@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:44
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_analytics(apps, schema_editor):
+    from api.analytics import rebuild
+    
+    Complaint = apps.get_model('api', 'Complaint')
+    # Best available resolution time for complaints resolved before date_resolved existed
+    Complaint.objects.filter(status='Resolved').update(date_resolved=F('date_updated'))
+    rebuild(apps.get_model('api', 'AnalyticsSummary'), Complaint)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_complaint_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalyticsSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(blank=True, max_length=255, unique=True)),
+                ('total', models.IntegerField(default=0)),
+                ('submitted', models.IntegerField(default=0)),
+                ('under_review', models.IntegerField(default=0)),
+                ('in_progress', models.IntegerField(default=0)),
+                ('resolved', models.IntegerField(default=0)),
+                ('closed', models.IntegerField(default=0)),
+                ('resolution_seconds', models.FloatField(default=0)),
+                ('resolution_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'analytics_summary',
+                'ordering': ['scope'],
+            },
+        ),
+        migrations.AddField(
+            model_name='complaint',
+            name='date_resolved',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_analytics, migrations.RunPython.noop),
+    ]
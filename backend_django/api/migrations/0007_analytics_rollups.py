@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_analytics_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalyticsRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('hour', 'Hour'), ('day', 'Day')], max_length=10)),
+                ('bucket', models.DateTimeField()),
+                ('primary_department', models.CharField(blank=True, default='', max_length=255)),
+                ('priority', models.CharField(blank=True, default='', max_length=20)),
+                ('status', models.CharField(max_length=50)),
+                ('count', models.IntegerField(default=0)),
+                ('resolution_seconds', models.FloatField(default=0)),
+                ('resolution_count', models.IntegerField(default=0)),
+                ('resolution_histogram', models.JSONField(blank=True, default=list)),
+            ],
+            options={
+                'db_table': 'analytics_rollups',
+                'constraints': [models.UniqueConstraint(fields=('granularity', 'bucket', 'primary_department', 'priority', 'status'), name='unique_rollup_key')],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_analytics_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ComplaintSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.IntegerField(unique=True)),
+                ('next_value', models.BigIntegerField(default=1)),
+            ],
+            options={
+                'db_table': 'complaint_sequences',
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_routes(apps, schema_editor):
+    from api.routing import backfill_routes
+    
+    backfill_routes(apps.get_model('api', 'ComplaintDepartment'), apps.get_model('api', 'Complaint'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_complaint_sequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ComplaintDepartment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('department', models.CharField(max_length=255)),
+                ('confidence', models.FloatField(blank=True, null=True)),
+                ('is_primary', models.BooleanField(default=False)),
+                ('status', models.CharField(max_length=50)),
+                ('date_submitted', models.DateTimeField()),
+                ('complaint', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='routes', to='api.complaint')),
+            ],
+            options={
+                'db_table': 'complaint_departments',
+                'indexes': [models.Index(fields=['department', 'status', '-date_submitted'], name='route_dept_status_date_idx'), models.Index(fields=['department', '-date_submitted', 'complaint'], name='route_dept_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('complaint', 'department'), name='unique_complaint_department')],
+            },
+        ),
+        migrations.RunPython(backfill_routes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:56
+
+from django.db import migrations, models
+
+
+def fill_queue_columns(apps, schema_editor):
+    from api.routing import backfill_routes
+    
+    # Rebuilding the rows fills is_open and priority_rank from the complaints
+    backfill_routes(apps.get_model('api', 'ComplaintDepartment'), apps.get_model('api', 'Complaint'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_complaint_departments'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='complaintdepartment',
+            name='is_open',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddField(
+            model_name='complaintdepartment',
+            name='priority_rank',
+            field=models.SmallIntegerField(default=4),
+        ),
+        migrations.AddIndex(
+            model_name='complaintdepartment',
+            index=models.Index(condition=models.Q(('is_open', True)), fields=['department', 'priority_rank', 'date_submitted', 'complaint', 'is_open'], name='route_queue_idx'),
+        ),
+        migrations.RunPython(fill_queue_columns, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,78 @@
+from importlib import import_module
+
+from django.db import migrations
+
+FTS_TABLE = 'complaints_fts'
+KEYS_TABLE = 'complaints_fts_keys'
+
+# Frozen copy of api.search.CREATE_SQL / DROP_SQL at the time of this migration
+CREATE_SQL = [
+    f"""CREATE TABLE IF NOT EXISTS {KEYS_TABLE} (
+        id INTEGER PRIMARY KEY,
+        complaint_id varchar(50) NOT NULL UNIQUE
+    )""",
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, description, location,
+        content='', tokenize='porter unicode61'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS complaints_fts_insert AFTER INSERT ON complaints BEGIN
+        INSERT INTO {KEYS_TABLE}(complaint_id) VALUES (new.id);
+        INSERT INTO {FTS_TABLE}(rowid, title, description, location)
+        VALUES (last_insert_rowid(), new.title, new.description, new.location);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS complaints_fts_delete AFTER DELETE ON complaints BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, location)
+        SELECT 'delete', id, old.title, old.description, old.location FROM {KEYS_TABLE} WHERE complaint_id = old.id;
+        DELETE FROM {KEYS_TABLE} WHERE complaint_id = old.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS complaints_fts_update
+        AFTER UPDATE OF title, description, location ON complaints BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, location)
+        SELECT 'delete', id, old.title, old.description, old.location FROM {KEYS_TABLE} WHERE complaint_id = old.id;
+        INSERT INTO {FTS_TABLE}(rowid, title, description, location)
+        SELECT id, new.title, new.description, new.location FROM {KEYS_TABLE} WHERE complaint_id = new.id;
+    END""",
+]
+
+DROP_SQL = [
+    'DROP TRIGGER IF EXISTS complaints_fts_update',
+    'DROP TRIGGER IF EXISTS complaints_fts_delete',
+    'DROP TRIGGER IF EXISTS complaints_fts_insert',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+    f'DROP TABLE IF EXISTS {KEYS_TABLE}',
+]
+
+POPULATE_SQL = [
+    f'INSERT INTO {KEYS_TABLE}(complaint_id) SELECT id FROM complaints ORDER BY rowid',
+    f'INSERT INTO {FTS_TABLE}(rowid, title, description, location) '
+    f'SELECT {KEYS_TABLE}.id, title, description, location '
+    f'FROM {KEYS_TABLE} JOIN complaints ON complaints.id = {KEYS_TABLE}.complaint_id',
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')",
+]
+
+
+def key_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    # The old index is keyed on the implicit rowid of complaints, which VACUUM may renumber
+    for statement in DROP_SQL + CREATE_SQL + POPULATE_SQL:
+        schema_editor.execute(statement)
+
+
+def unkey_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in DROP_SQL:
+        schema_editor.execute(statement)
+    import_module('api.migrations.0005_complaint_search').create_search_index(apps, schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_officer_queue'),
+    ]
+
+    operations = [
+        migrations.RunPython(key_search_index, unkey_search_index),
+    ]
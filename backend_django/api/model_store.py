@@ -0,0 +1,153 @@
+"""Versioned on-disk store for trained classifier models"""
+import datetime
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+MODEL_FILENAME = 'model.joblib'
+MANIFEST_FILENAME = 'manifest.json'
+CURRENT_FILENAME = 'CURRENT'
+
+
+class ModelStoreError(Exception):
+    """Raised when a model version is missing or unreadable"""
+
+
+def training_data_hash(texts: Sequence[str], labels: Sequence[str]) -> str:
+    """Stable hash of a labeled training set"""
+    digest = hashlib.sha256()
+    for text, label in zip(texts, labels):
+        digest.update(text.encode('utf-8'))
+        digest.update(b'\x1f')
+        digest.update(label.encode('utf-8'))
+        digest.update(b'\x1e')
+    return digest.hexdigest()
+
+
+def vocabulary_size(model) -> Optional[int]:
+    """Number of input features of a fitted pipeline's featurizer"""
+    featurizer = model[0] if hasattr(model, 'steps') else model
+    if hasattr(featurizer, 'vocabulary_'):
+        return len(featurizer.vocabulary_)
+    return getattr(featurizer, 'n_features', None)
+
+
+class ModelStore:
+    """
+    Versioned model artifacts with an atomically promoted current version.
+
+    Layout::
+
+        <root>/versions/<version>/model.joblib
+        <root>/versions/<version>/manifest.json
+        <root>/CURRENT            # name of the promoted version
+
+    Models are dumped uncompressed so ``load()`` can memory-map their numpy
+    arrays; every worker loading the same version then shares those pages
+    through the OS page cache instead of holding a private copy.
+    Promotion rewrites CURRENT with an atomic rename, and running workers
+    pick the new version up on their next ``current_version()`` check.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.versions_dir = self.root / 'versions'
+        self.current_path = self.root / CURRENT_FILENAME
+
+    def version_dir(self, version: str) -> Path:
+        return self.versions_dir / version
+
+    def save(self, model, texts: Sequence[str], labels: Sequence[str],
+             extra: Optional[Dict[str, Any]] = None) -> str:
+        """Persist a fitted model as a new version and return its name"""
+        import joblib
+        import sklearn
+
+        data_hash = training_data_hash(texts, labels)
+        created_at = datetime.datetime.now(datetime.timezone.utc)
+        version = f"{created_at:%Y%m%dT%H%M%S%f}-{data_hash[:8]}"
+
+        manifest = {
+            'version': version,
+            'created_at': created_at.isoformat(),
+            'training_data_hash': data_hash,
+            'training_examples': len(texts),
+            'sklearn_version': sklearn.__version__,
+            'vocab_size': vocabulary_size(model),
+            'classes': [str(c) for c in getattr(model, 'classes_', [])],
+        }
+        if extra:
+            manifest.update(extra)
+
+        # Write into a scratch directory and rename it into place so readers
+        # never observe a half-written version.
+        self.versions_dir.mkdir(parents=True, exist_ok=True)
+        scratch = Path(tempfile.mkdtemp(prefix=f'.{version}-', dir=self.versions_dir))
+        joblib.dump(model, scratch / MODEL_FILENAME)
+        with open(scratch / MANIFEST_FILENAME, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(scratch, self.version_dir(version))
+
+        logger.info("Saved model version %s", version)
+        return version
+
+    def manifest(self, version: str) -> Dict[str, Any]:
+        path = self.version_dir(version) / MANIFEST_FILENAME
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise ModelStoreError(f"Unknown model version: {version}")
+        except ValueError as e:
+            raise ModelStoreError(f"Corrupt manifest for model version {version}: {e}")
+
+    def versions(self) -> List[Dict[str, Any]]:
+        """Manifests of all stored versions, oldest first"""
+        if not self.versions_dir.exists():
+            return []
+        manifests = []
+        for path in sorted(self.versions_dir.iterdir()):
+            if path.name.startswith('.') or not path.is_dir():
+                continue
+            try:
+                manifests.append(self.manifest(path.name))
+            except ModelStoreError:
+                logger.warning("Skipping unreadable model version %s", path.name)
+        return manifests
+
+    def current_version(self) -> Optional[str]:
+        try:
+            version = self.current_path.read_text().strip()
+        except FileNotFoundError:
+            return None
+        return version or None
+
+    def promote(self, version: str):
+        """Atomically make ``version`` the current model"""
+        self.manifest(version)  # raises for unknown versions
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd, scratch = tempfile.mkstemp(prefix='.CURRENT-', dir=self.root)
+        with os.fdopen(fd, 'w') as f:
+            f.write(version)
+        os.replace(scratch, self.current_path)
+        logger.info("Promoted model version %s", version)
+
+    def load(self, version: Optional[str] = None, mmap_mode: Optional[str] = 'r') -> Tuple[Any, Dict[str, Any]]:
+        """Load a version (default: current) and return ``(model, manifest)``"""
+        import joblib
+
+        version = version or self.current_version()
+        if not version:
+            raise ModelStoreError("No model version has been promoted")
+        manifest = self.manifest(version)
+        try:
+            model = joblib.load(self.version_dir(version) / MODEL_FILENAME, mmap_mode=mmap_mode)
+        except Exception as e:
+            raise ModelStoreError(f"Could not load model version {version}: {e}") from e
+        return model, manifest
@@ -50,6 +50,20 @@ class Complaint(models.Model):
         ('High', 'High'),
         ('Critical', 'Critical'),
     ]
+    # Work-queue order: most urgent first, unprioritized last
+    PRIORITY_RANKS = {'Critical': 0, 'High': 1, 'Medium': 2, 'Low': 3}
+    UNRANKED = len(PRIORITY_RANKS)
+    
+    CLASSIFICATION_PENDING = 'pending'
+    CLASSIFICATION_DONE = 'classified'
+    CLASSIFICATION_FAILED = 'failed'
+    CLASSIFICATION_CHOICES = [
+        (CLASSIFICATION_PENDING, 'Pending'),
+        (CLASSIFICATION_DONE, 'Classified'),
+        (CLASSIFICATION_FAILED, 'Failed'),
+    ]
+    
+    OPEN_STATUSES = ['Submitted', 'Under Review', 'In Progress']
     
     id = models.CharField(primary_key=True, max_length=50)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='complaints')
@@ -65,8 +79,14 @@ class Complaint(models.Model):
     confidence_score = models.FloatField(blank=True, null=True)
     # NLP analysis with multi-department routing info
     nlp_analysis = models.JSONField(blank=True, null=True)
+    # 'pending' while an async classification job has not routed the complaint yet
+    classification_status = models.CharField(max_length=20, choices=CLASSIFICATION_CHOICES, default=CLASSIFICATION_DONE)
+    # First open complaint of the near-duplicate cluster this one was linked to
+    duplicate_of = models.ForeignKey('self', on_delete=models.SET_NULL, blank=True, null=True, related_name='linked_duplicates')
     date_submitted = models.DateTimeField(auto_now_add=True, db_index=True)
     date_updated = models.DateTimeField(auto_now=True)
+    # When the complaint was last marked Resolved (resolution time = date_resolved - date_submitted)
+    date_resolved = models.DateTimeField(blank=True, null=True)
     
     class Meta:
         db_table = 'complaints'
@@ -87,6 +107,137 @@ class Complaint(models.Model):
         return [self.primary_department] if self.primary_department else []
 
 
+class ComplaintDepartment(models.Model):
+    """
+    One department a complaint is routed to. Status, priority rank and
+    submission date are copied from the complaint so department lists and
+    work queues are index range scans. Maintained by api.routing.
+    """
+    complaint = models.ForeignKey(Complaint, on_delete=models.CASCADE, related_name='routes')
+    department = models.CharField(max_length=255)
+    confidence = models.FloatField(blank=True, null=True)
+    is_primary = models.BooleanField(default=False)
+    status = models.CharField(max_length=50)
+    # Complaint.OPEN_STATUSES
+    is_open = models.BooleanField(default=True)
+    # Complaint.PRIORITY_RANKS, or Complaint.UNRANKED
+    priority_rank = models.SmallIntegerField(default=Complaint.UNRANKED)
+    date_submitted = models.DateTimeField()
+    
+    class Meta:
+        db_table = 'complaint_departments'
+        constraints = [
+            models.UniqueConstraint(fields=['complaint', 'department'], name='unique_complaint_department'),
+        ]
+        indexes = [
+            models.Index(fields=['department', 'status', '-date_submitted'], name='route_dept_status_date_idx'),
+            models.Index(fields=['department', '-date_submitted', 'complaint'], name='route_dept_date_idx'),
+            # Covers the officer work queue: open rows by priority, then oldest first
+            # (is_open is repeated so the queue's WHERE clause is answered from the index)
+            models.Index(fields=['department', 'priority_rank', 'date_submitted', 'complaint', 'is_open'],
+                         condition=models.Q(is_open=True), name='route_queue_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.complaint_id} -> {self.department}"
+
+
+class ComplaintSignature(models.Model):
+    """MinHash signature of a complaint's description and location"""
+    complaint = models.OneToOneField(Complaint, on_delete=models.CASCADE, primary_key=True, related_name='signature')
+    minhash = models.BinaryField()
+    
+    class Meta:
+        db_table = 'complaint_signatures'
+
+
+class SignatureBucket(models.Model):
+    """LSH bucket membership: one row per signature band"""
+    complaint = models.ForeignKey(Complaint, on_delete=models.CASCADE, related_name='signature_buckets')
+    bucket = models.BigIntegerField(db_index=True)
+    
+    class Meta:
+        db_table = 'signature_buckets'
+
+
+class AnalyticsSummary(models.Model):
+    """
+    Running complaint counts for one scope: all complaints (empty scope) or
+    one primary department. Maintained incrementally by api.analytics.
+    """
+    scope = models.CharField(max_length=255, unique=True, blank=True)
+    total = models.IntegerField(default=0)
+    submitted = models.IntegerField(default=0)
+    under_review = models.IntegerField(default=0)
+    in_progress = models.IntegerField(default=0)
+    resolved = models.IntegerField(default=0)
+    closed = models.IntegerField(default=0)
+    # Sum and count of date_resolved - date_submitted over Resolved complaints
+    resolution_seconds = models.FloatField(default=0)
+    resolution_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'analytics_summary'
+        ordering = ['scope']
+    
+    def __str__(self):
+        return self.scope or 'All complaints'
+
+
+class AnalyticsRollup(models.Model):
+    """
+    Complaint events in one time bucket: how many complaints of a department
+    and priority entered a status, and for Resolved, how long they took.
+    Maintained incrementally by api.rollups.
+    """
+    HOUR = 'hour'
+    DAY = 'day'
+    GRANULARITY_CHOICES = [
+        (HOUR, 'Hour'),
+        (DAY, 'Day'),
+    ]
+    
+    granularity = models.CharField(max_length=10, choices=GRANULARITY_CHOICES)
+    # Start of the bucket (UTC)
+    bucket = models.DateTimeField()
+    primary_department = models.CharField(max_length=255, blank=True, default='')
+    priority = models.CharField(max_length=20, blank=True, default='')
+    status = models.CharField(max_length=50)
+    count = models.IntegerField(default=0)
+    resolution_seconds = models.FloatField(default=0)
+    resolution_count = models.IntegerField(default=0)
+    # Resolution times per api.rollups.BOUNDS_HOURS bucket (+ overflow)
+    resolution_histogram = models.JSONField(default=list, blank=True)
+    
+    class Meta:
+        db_table = 'analytics_rollups'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['granularity', 'bucket', 'primary_department', 'priority', 'status'],
+                name='unique_rollup_key'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.granularity} {self.bucket:%Y-%m-%d %H:%M} {self.primary_department}/{self.priority}/{self.status}"
+
+
+class ComplaintSequence(models.Model):
+    """
+    Next unreserved complaint number for one year. Workers reserve blocks of
+    numbers from it (api.complaint_ids) and hand them out from memory.
+    """
+    year = models.IntegerField(unique=True)
+    next_value = models.BigIntegerField(default=1)
+    
+    class Meta:
+        db_table = 'complaint_sequences'
+    
+    def __str__(self):
+        return f"{self.year}: {self.next_value}"
+
+
 class ComplaintHistory(models.Model):
     complaint = models.ForeignKey(Complaint, on_delete=models.CASCADE, related_name='history')
     user = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -124,3 +275,63 @@ class Notification(models.Model):
     
     def __str__(self):
         return f"{self.user.name} - {self.type}"
+
+
+class ClassificationJob(models.Model):
+    """Queued NLP classification for a complaint accepted in async mode"""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+    
+    complaint = models.ForeignKey(Complaint, on_delete=models.CASCADE, related_name='classification_jobs')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    # Token of the worker batch that claimed the job
+    claimed_by = models.CharField(max_length=64, blank=True, null=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    
+    class Meta:
+        db_table = 'classification_jobs'
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'id']),
+            models.Index(fields=['claimed_by']),
+        ]
+    
+    def __str__(self):
+        return f"{self.complaint_id} - {self.status}"
+
+
+class RoutingFeedback(models.Model):
+    """An officer/admin correction of a complaint's department, used as a labeled example"""
+    complaint = models.ForeignKey(Complaint, on_delete=models.CASCADE, related_name='routing_feedback')
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    # Text the label applies to (snapshot of the description at correction time)
+    text = models.TextField()
+    previous_department = models.CharField(max_length=255, blank=True, null=True)
+    corrected_department = models.CharField(max_length=255)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Set once the online learner has processed the example
+    consumed_at = models.DateTimeField(blank=True, null=True)
+    # Model version trained on this example (null if it was skipped)
+    model_version = models.CharField(max_length=64, blank=True, null=True)
+    
+    class Meta:
+        db_table = 'routing_feedback'
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['consumed_at', 'id']),
+        ]
+    
+    def __str__(self):
+        return f"{self.complaint_id}: {self.previous_department} -> {self.corrected_department}"
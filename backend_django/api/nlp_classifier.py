@@ -1,15 +1,204 @@
 import re
 import string
-from typing import Dict, List, Tuple
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.naive_bayes import MultinomialNB
-from sklearn.pipeline import Pipeline
-import joblib
-import os
-from textblob import TextBlob
+import threading
+import time
+from functools import cached_property
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from scipy import sparse
+import numpy as np
+import logging
+
+from .classification_cache import ClassificationCache, text_digest
+from . import sentiment
+from .model_store import ModelStore, ModelStoreError
+from .timing import stage
+
+# scikit-learn, joblib and TextBlob are imported where they are used: they
+# take seconds to import, and processes that never classify (migrate,
+# seed_db, most tests) should not pay for them.
+
+logger = logging.getLogger(__name__)
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """Build a regex alternation shaped like a prefix trie of ``words``.
+
+    Sharing prefixes lets the regex engine reject a position after a single
+    character comparison instead of trying every keyword in turn.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: Dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return f'(?:{body})?' if '' in node else body
+
+    return build(trie)
+
+
+class KeywordHits:
+    """Result of a single keyword scan over a complaint text"""
+
+    __slots__ = ('counts', 'department_scores', 'high_count', 'medium_count', 'keywords')
+
+    def __init__(self, counts: Dict[str, int], department_scores: Dict[str, int],
+                 high_count: int, medium_count: int, keywords: List[str]):
+        self.counts = counts
+        self.department_scores = department_scores
+        self.high_count = high_count
+        self.medium_count = medium_count
+        self.keywords = keywords
+
+
+class KeywordMatcher:
+    """
+    Match every department and urgency keyword in one pass over the text.
+
+    Keywords are compiled once into a trie-shaped lookahead regex, so each
+    position of the text is examined once and overlapping keywords
+    ("street light", "street", "light") are all reported, matching the
+    substring semantics of the original per-keyword scans.
+    """
+
+    def __init__(self, departments: Dict[str, List[str]], urgency_keywords: Dict[str, List[str]]):
+        self.departments = departments
+        self.high_keywords = frozenset(urgency_keywords.get('high', []))
+        self.medium_keywords = frozenset(urgency_keywords.get('medium', []))
+
+        # keyword -> departments it scores for (a keyword may belong to several)
+        self.keyword_departments: Dict[str, List[str]] = {}
+        for dept, keywords in departments.items():
+            for keyword in keywords:
+                depts = self.keyword_departments.setdefault(keyword, [])
+                if dept not in depts:
+                    depts.append(dept)
+
+        # Department keywords in declaration order, used to rank extracted keywords
+        self.keyword_rank = {keyword: rank for rank, keyword in enumerate(self.keyword_departments)}
+
+        # Sparse keyword-by-department membership matrix for batch scoring
+        self.department_names = list(departments)
+        department_columns = {dept: col for col, dept in enumerate(self.department_names)}
+        rows, cols = [], []
+        for keyword, depts in self.keyword_departments.items():
+            for dept in depts:
+                rows.append(self.keyword_rank[keyword])
+                cols.append(department_columns[dept])
+        self.department_matrix = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int64), (rows, cols)),
+            shape=(len(self.keyword_rank), len(self.department_names))
+        )
+
+        vocabulary = set(self.keyword_departments) | self.high_keywords | self.medium_keywords
+        # The regex reports the longest keyword starting at each position; every
+        # shorter keyword that is a prefix of it matches at the same position too.
+        self.prefix_closure = {
+            keyword: [other for other in vocabulary if keyword.startswith(other)]
+            for keyword in vocabulary
+        }
+        self.pattern = re.compile('(?=(' + _trie_pattern(vocabulary) + '))')
+
+    def scan(self, text_lower: str) -> KeywordHits:
+        """Scan already-lowercased text and return all keyword hits"""
+        counts: Dict[str, int] = {}
+        for longest in self.pattern.findall(text_lower):
+            for keyword in self.prefix_closure[longest]:
+                counts[keyword] = counts.get(keyword, 0) + 1
+
+        department_scores = dict.fromkeys(self.departments, 0)
+        high_count = medium_count = 0
+        matched_department_keywords = []
+        for keyword, count in counts.items():
+            depts = self.keyword_departments.get(keyword)
+            if depts:
+                matched_department_keywords.append(keyword)
+                for dept in depts:
+                    department_scores[dept] += count
+            if keyword in self.high_keywords:
+                high_count += 1
+            if keyword in self.medium_keywords:
+                medium_count += 1
+
+        matched_department_keywords.sort(key=self.keyword_rank.__getitem__)
+        return KeywordHits(counts, department_scores, high_count, medium_count, matched_department_keywords)
+
+    def count_matrix(self, hits_list: List[KeywordHits]) -> sparse.csr_matrix:
+        """Stack keyword counts of several scans into a texts-by-keywords CSR matrix"""
+        data, indices, indptr = [], [], [0]
+        for hits in hits_list:
+            for keyword, count in hits.counts.items():
+                col = self.keyword_rank.get(keyword)
+                if col is not None:
+                    indices.append(col)
+                    data.append(count)
+            indptr.append(len(indices))
+        return sparse.csr_matrix(
+            (np.array(data, dtype=np.int64), np.array(indices, dtype=np.int64), np.array(indptr, dtype=np.int64)),
+            shape=(len(hits_list), len(self.keyword_rank))
+        )
+
+    def department_score_matrix(self, hits_list: List[KeywordHits]) -> np.ndarray:
+        """Texts-by-departments keyword scores, in ``department_names`` column order"""
+        return (self.count_matrix(hits_list) @ self.department_matrix).toarray()
+
+
+class AnalysisContext:
+    """
+    Artifacts derived from one complaint text, computed at most once.
+
+    Every classification stage reads from the same context, so the text is
+    lowercased once, keywords are scanned once, TextBlob runs once and the
+    TF-IDF vector is built once per complaint.
+    """
+
+    def __init__(self, classifier: 'ComplaintClassifier', text: str):
+        self.classifier = classifier
+        self.text = text
+        # Pin the model so a hot swap mid-classification cannot mix versions
+        self.model = classifier.model
+
+    @cached_property
+    def text_lower(self) -> str:
+        return self.text.lower()
+
+    @cached_property
+    def preprocessed(self) -> str:
+        return self.classifier.clean_lowercased(self.text_lower)
+
+    @cached_property
+    def hits(self) -> KeywordHits:
+        return self.classifier.matcher.scan(self.text_lower)
+
+    @cached_property
+    def sentiment_polarity(self) -> Optional[float]:
+        """Polarity from the configured engine, or None when TextBlob fails"""
+        if self.classifier.sentiment_engine == sentiment.LEXICON:
+            return sentiment.polarity(self.text_lower)
+        from textblob import TextBlob
+        try:
+            return TextBlob(self.text).sentiment.polarity
+        except Exception:
+            logger.warning("Sentiment analysis failed", exc_info=True)
+            return None
+
+    @cached_property
+    def features(self):
+        """TF-IDF row vector of the preprocessed text (None without a model)"""
+        return self.classifier.featurize([self.preprocessed], model=self.model)
+
+
+TextOrContext = Union[str, AnalysisContext]
+
 
 class ComplaintClassifier:
-    def __init__(self):
+    def __init__(self, store: Optional[ModelStore] = None, cache: Optional[ClassificationCache] = None):
         self.departments = {
             'Public Works & Infrastructure': [
                 'road', 'pothole', 'bridge', 'highway', 'street', 'pavement',
@@ -75,35 +264,56 @@ class ComplaintClassifier:
             ]
         }
 
+        self.matcher = KeywordMatcher(self.departments, self.urgency_keywords)
+        self._punctuation_table = str.maketrans('', '', string.punctuation)
+
+        from django.conf import settings
+        if store is None:
+            store = ModelStore(settings.NLP_MODEL_DIR)
+        if cache is None and settings.NLP_CACHE_MAX_ENTRIES > 0:
+            cache = ClassificationCache(settings.NLP_CACHE_MAX_ENTRIES, settings.NLP_CACHE_TTL)
+        self.store = store
+        self.cache = cache
+        self.sentiment_engine = settings.NLP_SENTIMENT_ENGINE
+        if self.sentiment_engine == sentiment.LEXICON:
+            # Read the lexicon during warm-up rather than in the first request
+            sentiment.polarity_lexicon()
         self.model = None
+        self.model_version: Optional[str] = None
+        self._model_lock = threading.Lock()
+        self._last_model_check = time.monotonic()
         self.load_or_train_model()
 
+    def analyze(self, text: TextOrContext) -> AnalysisContext:
+        """Return the analysis context for text (contexts are passed through)"""
+        if isinstance(text, AnalysisContext):
+            return text
+        return AnalysisContext(self, text)
+
     def preprocess_text(self, text: str) -> str:
-        text = text.lower()
+        return self.clean_lowercased(text.lower())
+
+    def clean_lowercased(self, text: str) -> str:
+        """Strip digits, punctuation and extra whitespace from lowercased text"""
         text = re.sub(r'\d+', '', text)
-        text = text.translate(str.maketrans('', '', string.punctuation))
+        text = text.translate(self._punctuation_table)
         text = ' '.join(text.split())
         return text
 
-    def extract_keywords(self, text: str) -> List[str]:
-        text_lower = text.lower()
-        keywords = []
-        for dept, dept_keywords in self.departments.items():
-            for keyword in dept_keywords:
-                if keyword in text_lower:
-                    keywords.append(keyword)
-        return list(set(keywords))[:10]
-
-    def determine_urgency(self, text: str) -> Tuple[str, float]:
-        text_lower = text.lower()
+    def match_keywords(self, text: TextOrContext) -> KeywordHits:
+        """Scan text once for all department and urgency keywords"""
+        return self.analyze(text).hits
 
-        high_count = sum(1 for keyword in self.urgency_keywords['high'] if keyword in text_lower)
-        medium_count = sum(1 for keyword in self.urgency_keywords['medium'] if keyword in text_lower)
+    def extract_keywords(self, text: TextOrContext) -> List[str]:
+        return self.analyze(text).hits.keywords[:10]
 
-        try:
-            blob = TextBlob(text)
-            sentiment = blob.sentiment.polarity
+    def determine_urgency(self, text: TextOrContext) -> Tuple[str, float]:
+        context = self.analyze(text)
+        high_count = context.hits.high_count
+        medium_count = context.hits.medium_count
+        sentiment = context.sentiment_polarity
 
+        if sentiment is not None:
             if high_count >= 2 or sentiment < -0.5:
                 return 'High', 0.9
             elif high_count >= 1 or sentiment < -0.2:
@@ -114,7 +324,7 @@ class ComplaintClassifier:
                 return 'Medium', 0.6
             else:
                 return 'Low', 0.5
-        except:
+        else:
             if high_count >= 1:
                 return 'High', 0.7
             elif medium_count >= 1:
@@ -122,30 +332,20 @@ class ComplaintClassifier:
             else:
                 return 'Low', 0.5
 
-    def analyze_sentiment(self, text: str) -> str:
-        try:
-            blob = TextBlob(text)
-            polarity = blob.sentiment.polarity
+    def analyze_sentiment(self, text: TextOrContext) -> str:
+        polarity = self.analyze(text).sentiment_polarity
 
-            if polarity > 0.1:
-                return 'Positive'
-            elif polarity < -0.1:
-                return 'Negative'
-            else:
-                return 'Neutral'
-        except:
+        if polarity is None:
+            return 'Neutral'
+        if polarity > 0.1:
+            return 'Positive'
+        elif polarity < -0.1:
+            return 'Negative'
+        else:
             return 'Neutral'
 
-    def keyword_based_classify(self, text: str) -> Tuple[str, float]:
-        text_lower = text.lower()
-        scores = {}
-
-        for dept, keywords in self.departments.items():
-            score = 0
-            for keyword in keywords:
-                if keyword in text_lower:
-                    score += text_lower.count(keyword)
-            scores[dept] = score
+    def keyword_based_classify(self, text: TextOrContext) -> Tuple[str, float]:
+        scores = self.analyze(text).hits.department_scores
 
         if all(score == 0 for score in scores.values()):
             return 'Others', 0.5
@@ -159,30 +359,69 @@ class ComplaintClassifier:
         return best_dept[0], confidence
 
     def load_or_train_model(self):
-        model_path = os.path.join(os.path.dirname(__file__), 'complaint_classifier.pkl')
-
-        if os.path.exists(model_path):
+        """Load the promoted model version, training and promoting one if needed"""
+        version = self.store.current_version()
+        if version:
             try:
-                self.model = joblib.load(model_path)
+                self._swap_model(*self.store.load(version))
                 return
-            except:
-                pass
+            except ModelStoreError:
+                logger.exception("Could not load model version %s, retraining", version)
+
+        model, texts, labels = self.train_model()
+        try:
+            version = self.store.save(model, texts, labels)
+            self.store.promote(version)
+        except OSError:
+            logger.exception("Could not save trained model; serving it from memory only")
+            version = None
+        self._swap_model(model, {'version': version})
+
+    def train_model(self):
+        """Fit a fresh pipeline on the built-in training data"""
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.naive_bayes import MultinomialNB
+        from sklearn.pipeline import Pipeline
 
         training_data = self.generate_training_data()
         X = [item['text'] for item in training_data]
         y = [item['department'] for item in training_data]
 
-        self.model = Pipeline([
+        model = Pipeline([
             ('tfidf', TfidfVectorizer(max_features=1000, ngram_range=(1, 2))),
             ('clf', MultinomialNB(alpha=0.1))
         ])
 
-        self.model.fit(X, y)
+        model.fit(X, y)
+        return model, X, y
 
-        try:
-            joblib.dump(self.model, model_path)
-        except:
-            pass
+    def _swap_model(self, model, manifest: Dict):
+        self.model = model
+        self.model_version = manifest.get('version')
+
+    def refresh_model(self, force: bool = False) -> bool:
+        """
+        Hot-swap to the promoted model version if it changed.
+        Checks the store at most every NLP_MODEL_CHECK_INTERVAL seconds
+        unless forced. Returns True when a new version was loaded.
+        """
+        from django.conf import settings
+
+        now = time.monotonic()
+        if not force and now - self._last_model_check < settings.NLP_MODEL_CHECK_INTERVAL:
+            return False
+        with self._model_lock:
+            self._last_model_check = now
+            version = self.store.current_version()
+            if not version or version == self.model_version:
+                return False
+            try:
+                self._swap_model(*self.store.load(version))
+            except ModelStoreError:
+                logger.exception("Could not hot-swap to model version %s", version)
+                return False
+        logger.info("Hot-swapped to model version %s", version)
+        return True
 
     def generate_training_data(self) -> List[Dict]:
         training_data = []
@@ -351,33 +590,41 @@ class ComplaintClassifier:
         
         return common_steps + steps
 
-    def classify_multi_department(self, complaint_text: str, confidence_threshold: float = 0.5) -> Dict:
+    def classify_multi_department(self, complaint_text: TextOrContext, confidence_threshold: float = 0.5) -> Dict:
         """
         Classify complaint and identify ALL relevant departments
         Returns multi-department routing if multiple departments have high confidence
         """
-        preprocessed = self.preprocess_text(complaint_text)
-        text_lower = complaint_text.lower()
+        with stage('nlp.refresh_model'):
+            self.refresh_model()
+        if self.cache is None:
+            return self._classify_multi_department(complaint_text, confidence_threshold)
         
-        # Score each department
-        dept_scores = {}
-        for dept, keywords in self.departments.items():
-            score = 0
-            for keyword in keywords:
-                if keyword in text_lower:
-                    score += text_lower.count(keyword)
-            dept_scores[dept] = score
+        text = complaint_text.text if isinstance(complaint_text, AnalysisContext) else complaint_text
+        return self.cache.get_or_compute(
+            self.cache_key(text, confidence_threshold),
+            lambda: self._classify_multi_department(complaint_text, confidence_threshold)
+        )
+
+    def cache_key(self, text: str, confidence_threshold: float) -> Tuple[str, Optional[str], float]:
+        """Results depend on the normalized text, the model version and the threshold"""
+        return text_digest(text), self.model_version, confidence_threshold
+
+    def _classify_multi_department(self, complaint_text: TextOrContext, confidence_threshold: float) -> Dict:
+        context = self.analyze(complaint_text)
+        
+        # Score each department (single pass shared with urgency and keyword extraction)
+        with stage('nlp.keywords'):
+            dept_scores = context.hits.department_scores
         
         # Get ML predictions if available
         ml_scores = {}
-        try:
-            if self.model:
-                proba = self.model.predict_proba([preprocessed])[0]
-                classes = self.model.classes_
-                for class_idx, class_name in enumerate(classes):
-                    ml_scores[class_name] = float(proba[class_idx])
-        except:
-            pass
+        with stage('nlp.tfidf'):
+            features = context.features
+        with stage('nlp.predict_proba'):
+            proba = self.predict_proba_matrix(features, model=context.model)
+        if proba is not None:
+            ml_scores = dict(zip(self.matcher.department_names, proba[0].tolist()))
         
         # Combine scores (60% keyword-based, 40% ML-based)
         combined_scores = {}
@@ -388,6 +635,83 @@ class ComplaintClassifier:
             ml_weight = ml_scores.get(dept, 0) * 0.4
             combined_scores[dept] = keyword_weight + ml_weight
         
+        with stage('nlp.sentiment'):
+            context.sentiment_polarity
+        with stage('nlp.build_result'):
+            return self._build_result(context, combined_scores, confidence_threshold)
+
+    def classify_batch(self, texts: List[str], confidence_threshold: float = 0.5) -> List[Dict]:
+        """
+        Classify many complaints at once.
+        Keyword scoring is a single sparse matrix product and the TF-IDF
+        transform and predict_proba run once over the whole batch.
+        Results are identical to calling classify_multi_department per text.
+        """
+        self.refresh_model()
+        model = self.model
+        contexts = [self.analyze(text) for text in texts]
+        if not contexts:
+            return []
+        
+        keyword_scores = self.matcher.department_score_matrix([context.hits for context in contexts])
+        total_keyword_scores = keyword_scores.sum(axis=1, keepdims=True)
+        total_keyword_scores[total_keyword_scores == 0] = 1
+        
+        # Transform the whole batch once and hand each context its own row
+        features = self.featurize([context.preprocessed for context in contexts], model=model)
+        if features is not None:
+            for row, context in enumerate(contexts):
+                context.model = model
+                context.features = features[row]
+        
+        # Combine scores (60% keyword-based, 40% ML-based)
+        combined = (keyword_scores / total_keyword_scores) * 0.6
+        proba = self.predict_proba_matrix(features, model=model)
+        if proba is not None:
+            combined = combined + proba * 0.4
+        
+        department_names = self.matcher.department_names
+        return [
+            self._build_result(context, dict(zip(department_names, row.tolist())), confidence_threshold)
+            for context, row in zip(contexts, combined)
+        ]
+
+    def featurize(self, preprocessed_texts: List[str], model=None):
+        """TF-IDF matrix for preprocessed texts, or None without a model"""
+        model = model if model is not None else self.model
+        if not model:
+            return None
+        try:
+            return model[:-1].transform(preprocessed_texts)
+        except Exception:
+            logger.exception("Feature extraction failed, falling back to keyword scores")
+            return None
+
+    def predict_proba_matrix(self, features, model=None) -> Optional[np.ndarray]:
+        """
+        ML probabilities for a feature matrix as a texts-by-departments matrix
+        in ``matcher.department_names`` column order, or None without a model.
+        """
+        model = model if model is not None else self.model
+        if not model or features is None:
+            return None
+        try:
+            proba = model[-1].predict_proba(features)
+        except Exception:
+            logger.exception("ML prediction failed, falling back to keyword scores")
+            return None
+        
+        aligned = np.zeros((proba.shape[0], len(self.matcher.department_names)))
+        columns = {dept: col for col, dept in enumerate(self.matcher.department_names)}
+        for class_idx, class_name in enumerate(model.classes_):
+            col = columns.get(class_name)
+            if col is not None:
+                aligned[:, col] = proba[:, class_idx]
+        return aligned
+
+    def _build_result(self, context: AnalysisContext,
+                      combined_scores: Dict[str, float], confidence_threshold: float) -> Dict:
+        """Turn combined department scores into the routing result"""
         # Find departments above threshold
         qualifying_depts = [
             (dept, score) for dept, score in combined_scores.items() 
@@ -402,9 +726,9 @@ class ComplaintClassifier:
             top_dept = max(combined_scores.items(), key=lambda x: x[1])
             qualifying_depts = [top_dept]
         
-        urgency, urgency_conf = self.determine_urgency(complaint_text)
-        keywords = self.extract_keywords(complaint_text)
-        sentiment = self.analyze_sentiment(complaint_text)
+        urgency, urgency_conf = self.determine_urgency(context)
+        keywords = self.extract_keywords(context)
+        sentiment = self.analyze_sentiment(context)
         
         # Primary department is the top scored one
         primary_dept = qualifying_depts[0][0] if qualifying_depts else 'Others'
@@ -432,8 +756,95 @@ class ComplaintClassifier:
             'suggestedSteps': suggested_steps
         }
     
-    def classify(self, complaint_text: str) -> Dict:
+    def classify(self, complaint_text: TextOrContext) -> Dict:
         """Legacy classify method - uses single department mode"""
         return self.classify_multi_department(complaint_text, confidence_threshold=0.6)
 
-classifier = ComplaintClassifier()
+
+class LazyClassifier:
+    """
+    Process-wide ComplaintClassifier that is only built when first needed.
+
+    Attribute access is delegated to the underlying classifier, loading it
+    on first use. ``warm_up()`` loads it ahead of traffic (optionally in a
+    background thread) and ``readiness()`` reports the load state for the
+    health check, so load balancers can skip cold workers.
+    """
+
+    COLD = 'cold'
+    LOADING = 'loading'
+    READY = 'ready'
+    FAILED = 'failed'
+
+    def __init__(self, factory=ComplaintClassifier):
+        self._factory = factory
+        self._instance: Optional[ComplaintClassifier] = None
+        self._lock = threading.Lock()
+        self._warmup_thread: Optional[threading.Thread] = None
+        self.state = self.COLD
+        self.load_time_ms: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def get(self) -> ComplaintClassifier:
+        """Return the classifier, building it on first call"""
+        instance = self._instance
+        if instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._load()
+                instance = self._instance
+        return instance
+
+    def _load(self):
+        self.state = self.LOADING
+        self.error = None
+        started = time.perf_counter()
+        try:
+            instance = self._factory()
+        except Exception as e:
+            self.state = self.FAILED
+            self.error = str(e)
+            logger.exception("Failed to load complaint classifier")
+            raise
+        self.load_time_ms = round((time.perf_counter() - started) * 1000, 2)
+        self._instance = instance
+        self.state = self.READY
+        logger.info("Complaint classifier ready in %.0f ms", self.load_time_ms)
+
+    def warm_up(self, background: bool = True):
+        """Load the classifier now, or in a daemon thread when background is set"""
+        if not background:
+            self.get()
+            return
+        with self._lock:
+            if self._instance is not None or (self._warmup_thread and self._warmup_thread.is_alive()):
+                return
+            self._warmup_thread = threading.Thread(target=self._warm_up_quietly, name='nlp-warmup', daemon=True)
+            self._warmup_thread.start()
+
+    def _warm_up_quietly(self):
+        try:
+            self.get()
+        except Exception:
+            # Already logged and recorded in readiness(); the next request retries.
+            pass
+
+    @property
+    def is_ready(self) -> bool:
+        return self._instance is not None
+
+    def readiness(self) -> Dict:
+        """Model state for the readiness probe"""
+        return {
+            'ready': self.is_ready,
+            'state': self.state,
+            'loadTimeMs': self.load_time_ms,
+            'modelVersion': getattr(self._instance, 'model_version', None),
+            'error': self.error,
+        }
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
+
+
+classifier = LazyClassifier()
@@ -0,0 +1,212 @@
+"""
+Run NLP classification according to NLP_EXECUTION_MODE.
+
+``inline``   classify in the request thread (default)
+``process``  classify in a bounded pool of worker processes, each of which
+             loads the model once; callers wait at most NLP_CLASSIFY_TIMEOUT
+``async``    submissions are stored as pending and queued for
+             ``manage.py classify_worker``; other classification runs inline
+"""
+import logging
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+
+from .nlp_classifier import classifier
+from .timing import stage
+
+logger = logging.getLogger(__name__)
+
+INLINE = 'inline'
+PROCESS = 'process'
+ASYNC = 'async'
+
+# Set in pool processes (and inherited by their children) before Django starts
+WORKER_ENV = 'SMART_GRIEV_NLP_WORKER'
+
+_executor: Optional[ProcessPoolExecutor] = None
+_warmup_futures: List[Future] = []
+_executor_lock = threading.Lock()
+
+
+class ClassificationTimeout(Exception):
+    """Classification did not finish within NLP_CLASSIFY_TIMEOUT"""
+
+
+def in_worker() -> bool:
+    """True inside an NLP pool process, which must never start a pool of its own"""
+    return os.environ.get(WORKER_ENV) == '1'
+
+
+def _init_worker(settings_module: str):
+    """Pool process initializer: set up Django and load the model once"""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    # ApiConfig.ready() checks this, so setup does not warm up (and start) another pool
+    os.environ[WORKER_ENV] = '1'
+    import django
+    django.setup()
+    from .nlp_classifier import classifier as worker_classifier
+    worker_classifier.get()
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _worker_state() -> Dict:
+    return {'pid': os.getpid(), 'inWorker': in_worker(), 'hasPool': _executor is not None}
+
+
+def _classify_in_worker(text: str, confidence_threshold: float) -> Dict:
+    return classifier.classify_multi_department(text, confidence_threshold)
+
+
+def _classify_batch_in_worker(texts: List[str], confidence_threshold: float) -> List[Dict]:
+    return classifier.classify_batch(texts, confidence_threshold)
+
+
+def execution_mode() -> str:
+    return settings.NLP_EXECUTION_MODE
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """Create the process pool on first use"""
+    global _executor, _warmup_futures
+    if in_worker():
+        raise RuntimeError('NLP pool workers classify in-process and cannot start a pool')
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.NLP_POOL_WORKERS,
+                mp_context=multiprocessing.get_context(settings.NLP_POOL_START_METHOD),
+                initializer=_init_worker,
+                initargs=(os.environ.get('DJANGO_SETTINGS_MODULE', 'smart_griev.settings'),),
+            )
+            # One task per slot starts every worker (and its model load) now
+            _warmup_futures = [_executor.submit(_ping) for _ in range(settings.NLP_POOL_WORKERS)]
+            logger.info("Started NLP process pool with %d workers", settings.NLP_POOL_WORKERS)
+        return _executor
+
+
+def shutdown_executor():
+    """Stop the pool; the next classification starts a fresh one"""
+    global _executor, _warmup_futures
+    with _executor_lock:
+        executor, _executor, _warmup_futures = _executor, None, []
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def classify_complaint(text: str, confidence_threshold: float = 0.5) -> Dict:
+    """
+    Classify a complaint using the configured execution mode.
+    Raises ClassificationTimeout when the process pool does not answer in time.
+    """
+    with stage('nlp.classify'):
+        return _classify_complaint(text, confidence_threshold)
+
+
+def _classify_complaint(text: str, confidence_threshold: float) -> Dict:
+    if execution_mode() != PROCESS:
+        return classifier.classify_multi_department(text, confidence_threshold)
+    return _run_in_pool(_classify_in_worker, text, confidence_threshold)
+
+
+def classify_batch(texts: List[str], confidence_threshold: float = 0.5) -> List[Dict]:
+    """
+    Classify several texts in one vectorized pass, in the process pool in
+    ``process`` mode. Raises ClassificationTimeout like classify_complaint.
+    """
+    with stage('nlp.classify_batch'):
+        if execution_mode() != PROCESS:
+            return classifier.classify_batch(texts, confidence_threshold)
+        return _run_in_pool(_classify_batch_in_worker, texts, confidence_threshold)
+
+
+def _run_in_pool(function, *args):
+    """Run ``function`` in the shared pool, waiting at most NLP_CLASSIFY_TIMEOUT"""
+    future = get_executor().submit(function, *args)
+    try:
+        return future.result(timeout=settings.NLP_CLASSIFY_TIMEOUT)
+    except FutureTimeoutError:
+        future.cancel()
+        raise ClassificationTimeout(
+            f'Classification did not finish within {settings.NLP_CLASSIFY_TIMEOUT:g}s'
+        )
+    except BrokenProcessPool:
+        logger.exception("NLP process pool broke; it will be restarted")
+        shutdown_executor()
+        raise
+
+
+def classify_chunks(chunks: Iterable[Tuple[Any, List[str]]], confidence_threshold: float = 0.5,
+                    workers: int = 1) -> Iterator[Tuple[Any, List[Dict]]]:
+    """
+    Classify ``(payload, texts)`` chunks as batches, yielding
+    ``(payload, results)`` in input order.
+
+    With more than one worker the batches run in a dedicated process pool.
+    At most two chunks per worker are in flight, so a streamed input is
+    never read far ahead of what has been consumed.
+    """
+    if workers <= 1:
+        for payload, texts in chunks:
+            yield payload, classifier.classify_batch(texts, confidence_threshold)
+        return
+
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context(settings.NLP_POOL_START_METHOD),
+        initializer=_init_worker,
+        initargs=(os.environ.get('DJANGO_SETTINGS_MODULE', 'smart_griev.settings'),),
+    )
+    in_flight = deque()
+    try:
+        for payload, texts in chunks:
+            in_flight.append((payload, executor.submit(_classify_batch_in_worker, texts, confidence_threshold)))
+            if len(in_flight) >= 2 * workers:
+                payload, future = in_flight.popleft()
+                yield payload, future.result()
+        while in_flight:
+            payload, future = in_flight.popleft()
+            yield payload, future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def warm_up(background: bool = True):
+    """Load the model ahead of traffic in the current execution mode"""
+    if execution_mode() == PROCESS and not in_worker():
+        get_executor()
+    else:
+        classifier.warm_up(background=background)
+
+
+def readiness() -> Dict:
+    """Model state for the readiness probe in the current execution mode"""
+    if execution_mode() != PROCESS:
+        return dict(classifier.readiness(), mode=execution_mode())
+
+    with _executor_lock:
+        futures = list(_warmup_futures)
+    started = [f for f in futures if f.done() and f.exception() is None]
+    failed = [f for f in futures if f.done() and f.exception() is not None]
+    if started:
+        state = 'ready'
+    elif futures and len(failed) == len(futures):
+        state = 'failed'
+    else:
+        state = 'loading' if futures else 'cold'
+    return {
+        'ready': bool(started),
+        'state': state,
+        'mode': PROCESS,
+        'workers': settings.NLP_POOL_WORKERS,
+        'warmupTasksDone': len(started),
+    }
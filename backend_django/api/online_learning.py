@@ -0,0 +1,120 @@
+"""
+Incremental training of the classifier from officer re-routing feedback.
+
+Corrections recorded by ``routing.reroute_complaint`` are folded into the
+promoted model with ``MultinomialNB.partial_fit``. The featurizer is a
+stateless ``HashingVectorizer``, so new words never require refitting a
+vocabulary; each run trains on the unconsumed feedback only and publishes
+the result as a new model version.
+"""
+import logging
+from typing import Dict, Optional
+
+import numpy as np
+from django.utils import timezone
+
+from .model_store import ModelStoreError
+from .models import RoutingFeedback
+
+logger = logging.getLogger(__name__)
+
+HASHING_FEATURES = 2 ** 18
+FEATURIZER = 'hashing'
+
+
+def build_online_model():
+    """Unfitted hashing + naive Bayes pipeline that supports partial_fit"""
+    from sklearn.feature_extraction.text import HashingVectorizer
+    from sklearn.naive_bayes import MultinomialNB
+    from sklearn.pipeline import Pipeline
+
+    return Pipeline([
+        ('hashing', HashingVectorizer(n_features=HASHING_FEATURES, ngram_range=(1, 2), alternate_sign=False)),
+        ('clf', MultinomialNB(alpha=0.1))
+    ])
+
+
+def is_online_model(model) -> bool:
+    from sklearn.feature_extraction.text import HashingVectorizer
+
+    return model is not None and hasattr(model, 'steps') and isinstance(model[0], HashingVectorizer)
+
+
+def bootstrap_online_model(classifier):
+    """
+    Hashing model seeded with the built-in training data. Used once, when
+    the promoted model still has a fitted TF-IDF vocabulary.
+    """
+    model = build_online_model()
+    training_data = classifier.generate_training_data()
+    texts = [classifier.preprocess_text(item['text']) for item in training_data]
+    labels = [item['department'] for item in training_data]
+    model[-1].partial_fit(model[0].transform(texts), labels, classes=sorted(classifier.departments))
+    return model, len(training_data)
+
+
+def learn_from_feedback(classifier, limit: Optional[int] = None, weight: float = 1.0,
+                        promote: bool = True) -> Dict:
+    """
+    Train the current model on unconsumed routing feedback and publish it.
+
+    Returns a summary with the new ``version`` (None when nothing was
+    trained), the ``parentVersion`` and counts of ``trained`` and
+    ``skipped`` examples. Feedback for departments the model has no class
+    for is skipped and marked consumed so it is not retried forever.
+    """
+    pending = RoutingFeedback.objects.filter(consumed_at__isnull=True).order_by('id')
+    if limit:
+        pending = pending[:limit]
+    pending = list(pending)
+    summary = {'version': None, 'parentVersion': None, 'trained': 0, 'skipped': 0}
+    if not pending:
+        return summary
+
+    store = classifier.store
+    parent_version = store.current_version()
+    summary['parentVersion'] = parent_version
+    model, parent_manifest = None, {}
+    if parent_version:
+        try:
+            # A private, writable copy: partial_fit updates the arrays in place
+            model, parent_manifest = store.load(parent_version, mmap_mode=None)
+        except ModelStoreError:
+            logger.exception("Could not load model version %s for incremental training", parent_version)
+
+    if is_online_model(model):
+        base_examples = parent_manifest.get('training_examples', 0)
+    else:
+        model, base_examples = bootstrap_online_model(classifier)
+
+    known = set(model[-1].classes_)
+    usable = [f for f in pending if f.corrected_department in known]
+    skipped = [f for f in pending if f.corrected_department not in known]
+    for feedback in skipped:
+        logger.warning("Skipping routing feedback %s: unknown department %s",
+                       feedback.id, feedback.corrected_department)
+
+    version = None
+    if usable:
+        texts = [classifier.preprocess_text(f.text) for f in usable]
+        labels = [f.corrected_department for f in usable]
+        model[-1].partial_fit(model[0].transform(texts), labels,
+                              sample_weight=np.full(len(usable), weight, dtype=float))
+        version = store.save(model, texts, labels, extra={
+            'featurizer': FEATURIZER,
+            'incremental': True,
+            'parent_version': parent_version,
+            'feedback_examples': len(usable),
+            'training_examples': base_examples + len(usable),
+        })
+        if promote:
+            store.promote(version)
+
+    now = timezone.now()
+    RoutingFeedback.objects.filter(id__in=[f.id for f in usable]).update(consumed_at=now, model_version=version)
+    RoutingFeedback.objects.filter(id__in=[f.id for f in skipped]).update(consumed_at=now)
+
+    summary.update(version=version, trained=len(usable), skipped=len(skipped))
+    logger.info("Incremental training: %d examples, %d skipped, version %s",
+                len(usable), len(skipped), version)
+    return summary
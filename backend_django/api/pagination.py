@@ -0,0 +1,115 @@
+"""
+Keyset (cursor) pagination for complaint lists.
+
+Pages are ordered by ``(-date_submitted, id)``. A cursor encodes the sort
+key of the last row of a page, and the next page starts strictly after it.
+Every page is therefore an indexed range scan, however deep the client
+pages, and rows inserted meanwhile never shift or repeat earlier pages.
+Cursors are opaque, URL-safe base64 strings.
+
+Department lists page over routing rows the same way, keyed by
+``complaint_id``, so their cursors have the same format. Officer work
+queues are ordered by ``(priority_rank, date_submitted, complaint_id)`` and
+have cursors of their own.
+"""
+import base64
+import datetime
+import json
+from typing import List, Optional, Tuple
+
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _encode(*values) -> str:
+    payload = json.dumps(values, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def _decode(cursor: str) -> list:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError, UnicodeError):
+        raise InvalidCursor(f'Invalid cursor: {cursor!r}')
+    if not isinstance(values, list):
+        raise InvalidCursor(f'Invalid cursor: {cursor!r}')
+    return values
+
+
+def _key(cursor: str, timestamp, complaint_id) -> Tuple[datetime.datetime, str]:
+    try:
+        date_submitted = datetime.datetime.fromisoformat(timestamp)
+    except (ValueError, TypeError):
+        raise InvalidCursor(f'Invalid cursor: {cursor!r}')
+    if not isinstance(complaint_id, str) or date_submitted.tzinfo is None:
+        raise InvalidCursor(f'Invalid cursor: {cursor!r}')
+    return date_submitted, complaint_id
+
+
+def encode_cursor(date_submitted: datetime.datetime, complaint_id: str) -> str:
+    return _encode(date_submitted.isoformat(), complaint_id)
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime.datetime, str]:
+    values = _decode(cursor)
+    if len(values) != 2:
+        raise InvalidCursor(f'Invalid cursor: {cursor!r}')
+    return _key(cursor, *values)
+
+
+def encode_queue_cursor(priority_rank: int, date_submitted: datetime.datetime, complaint_id: str) -> str:
+    return _encode(priority_rank, date_submitted.isoformat(), complaint_id)
+
+
+def decode_queue_cursor(cursor: str) -> Tuple[int, datetime.datetime, str]:
+    values = _decode(cursor)
+    if len(values) != 3 or type(values[0]) is not int:
+        raise InvalidCursor(f'Invalid cursor: {cursor!r}')
+    return (values[0], *_key(cursor, *values[1:]))
+
+
+def keyset_page(queryset, limit: int, cursor: Optional[str] = None,
+                id_field: str = 'id') -> Tuple[List, Optional[str]]:
+    """
+    Up to ``limit`` rows of ``queryset`` after ``cursor``, and the cursor of
+    the next page (None on the last page). ``id_field`` names the complaint
+    id of rows that are not complaints.
+    """
+    queryset = queryset.order_by('-date_submitted', id_field)
+    if cursor:
+        date_submitted, complaint_id = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(date_submitted__lt=date_submitted)
+            | Q(date_submitted=date_submitted, **{f'{id_field}__gt': complaint_id})
+        )
+    rows = list(queryset[:limit + 1])
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(last.date_submitted, getattr(last, id_field))
+
+
+def queue_page(routes, limit: int, cursor: Optional[str] = None) -> Tuple[List, Optional[str]]:
+    """
+    Up to ``limit`` routing rows in work-queue order (most urgent, then
+    oldest first) after ``cursor``, and the cursor of the next page
+    """
+    routes = routes.order_by('priority_rank', 'date_submitted', 'complaint_id')
+    if cursor:
+        priority_rank, date_submitted, complaint_id = decode_queue_cursor(cursor)
+        routes = routes.filter(
+            Q(priority_rank__gt=priority_rank)
+            | Q(priority_rank=priority_rank, date_submitted__gt=date_submitted)
+            | Q(priority_rank=priority_rank, date_submitted=date_submitted, complaint_id__gt=complaint_id)
+        )
+    rows = list(routes[:limit + 1])
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_queue_cursor(last.priority_rank, last.date_submitted, last.complaint_id)
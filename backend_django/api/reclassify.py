@@ -0,0 +1,176 @@
+"""Re-route existing complaints with the current classifier model"""
+import datetime
+import json
+import logging
+import os
+import tempfile
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Sequence
+
+from django.db import transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from . import analytics, nlp_service
+from .models import Complaint
+from .routing import route_confidences, routing_fields, sync_routes
+
+logger = logging.getLogger(__name__)
+
+# Fields read to classify a complaint and diff the result
+READ_FIELDS = [
+    'id', 'description', 'department', 'primary_department', 'departments', 'priority',
+    # Analytics snapshot
+    'status', 'date_submitted', 'date_resolved',
+]
+# Fields written back by bulk_update
+WRITE_FIELDS = [
+    'department', 'primary_department', 'departments', 'priority',
+    'confidence_score', 'nlp_analysis', 'classification_status', 'date_updated',
+]
+# Fields compared for the diff report
+DIFF_FIELDS = ['primary_department', 'departments', 'priority']
+
+
+def complaints_to_reclassify(statuses: Optional[Sequence[str]] = None,
+                             since: Optional[datetime.date] = None,
+                             until: Optional[datetime.date] = None,
+                             department: Optional[str] = None,
+                             after_id: Optional[str] = None) -> QuerySet:
+    """
+    Classified complaints matching the filters, in primary key order.
+    Complaints still waiting for the async queue are left to it.
+    """
+    queryset = Complaint.objects.exclude(classification_status=Complaint.CLASSIFICATION_PENDING)
+    if statuses:
+        queryset = queryset.filter(status__in=statuses)
+    if since:
+        queryset = queryset.filter(date_submitted__date__gte=since)
+    if until:
+        queryset = queryset.filter(date_submitted__date__lte=until)
+    if department:
+        queryset = queryset.filter(department=department)
+    if after_id:
+        queryset = queryset.filter(id__gt=after_id)
+    return queryset.order_by('id').only(*READ_FIELDS)
+
+
+def routing_diff(complaint: Complaint, fields: Dict[str, Any]) -> Dict[str, tuple]:
+    """``{field: (old, new)}`` for routing fields a reclassification changes"""
+    return {
+        name: (getattr(complaint, name), fields[name])
+        for name in DIFF_FIELDS
+        if getattr(complaint, name) != fields[name]
+    }
+
+
+class Checkpoint:
+    """
+    Progress of a reclassification run, saved after every chunk so an
+    interrupted run can resume after the last written complaint.
+    """
+
+    def __init__(self, path, filters: Dict[str, Any]):
+        self.path = Path(path)
+        self.filters = filters
+        self.last_id: Optional[str] = None
+        self.processed = 0
+        self.changed = 0
+
+    def load(self) -> bool:
+        """Restore saved progress; False when there is none for these filters"""
+        try:
+            with open(self.path) as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return False
+        if state.get('filters') != self.filters:
+            return False
+        self.last_id = state.get('lastId')
+        self.processed = state.get('processed', 0)
+        self.changed = state.get('changed', 0)
+        return True
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, scratch = tempfile.mkstemp(prefix='.reclassify-', dir=self.path.parent)
+        with os.fdopen(fd, 'w') as f:
+            json.dump({
+                'filters': self.filters,
+                'lastId': self.last_id,
+                'processed': self.processed,
+                'changed': self.changed,
+            }, f)
+        os.replace(scratch, self.path)
+
+    def clear(self):
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _chunks(queryset: QuerySet, chunk_size: int) -> Iterator[tuple]:
+    rows = queryset.iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk, [complaint.description for complaint in chunk]
+
+
+def _route(complaints, results, now) -> tuple:
+    """Apply classification results to ``complaints``; ``(changes, analytics delta)``"""
+    changes = []
+    summary = analytics.SummaryDelta()
+    for complaint, nlp_result in zip(complaints, results):
+        fields = routing_fields(nlp_result)
+        diff = routing_diff(complaint, fields)
+        if diff:
+            changes.append((complaint.id, diff))
+        before = analytics.snapshot(complaint)
+        for name, value in fields.items():
+            setattr(complaint, name, value)
+        summary.change(before, analytics.snapshot(complaint))
+        # bulk_update bypasses auto_now
+        complaint.date_updated = now
+    return changes, summary
+
+
+def reclassify(queryset: QuerySet, chunk_size: int = 500, workers: int = 1,
+               confidence_threshold: float = 0.5, dry_run: bool = False,
+               checkpoint: Optional[Checkpoint] = None) -> Iterator[tuple]:
+    """
+    Stream ``queryset`` in chunks, classify each chunk as one batch and
+    write the results back with ``bulk_update``.
+
+    Yields ``(chunk, changes)`` per chunk, where ``changes`` lists
+    ``(complaint_id, diff)`` for the complaints whose routing changed.
+    With ``dry_run`` nothing is written and no checkpoint is saved.
+    """
+    for chunk, results in nlp_service.classify_chunks(_chunks(queryset, chunk_size),
+                                                      confidence_threshold, workers):
+        now = timezone.now()
+        if dry_run:
+            changes, _ = _route(chunk, results, now)
+        else:
+            by_id = {complaint.id: nlp_result for complaint, nlp_result in zip(chunk, results)}
+            with transaction.atomic():
+                # Re-read under lock: the status may have changed while the chunk was classified,
+                # and the analytics delta and route rows must start from the stored row
+                fresh = list(Complaint.objects.select_for_update()
+                             .filter(id__in=list(by_id))
+                             .exclude(classification_status=Complaint.CLASSIFICATION_PENDING)
+                             .order_by('id').only(*READ_FIELDS))
+                changes, summary = _route(fresh, [by_id[complaint.id] for complaint in fresh], now)
+                Complaint.objects.bulk_update(fresh, WRITE_FIELDS)
+                sync_routes(fresh, {complaint.id: route_confidences(complaint.nlp_analysis) for complaint in fresh})
+                summary.apply()
+            if checkpoint is not None:
+                checkpoint.last_id = chunk[-1].id
+                checkpoint.processed += len(chunk)
+                checkpoint.changed += len(changes)
+                checkpoint.save()
+        logger.info("Reclassified %d complaints through %s (%d changed)", len(chunk), chunk[-1].id, len(changes))
+        yield chunk, changes
@@ -0,0 +1,207 @@
+"""
+Time-bucketed complaint analytics.
+
+Every complaint event (a routed submission, a status change) adds to an
+hourly and a daily ``AnalyticsRollup`` row keyed by ``(bucket,
+primary_department, priority, status)``, where status is the status the
+complaint entered and department and priority are those at event time.
+Resolved events also carry the resolution time, summed and in a
+log-spaced histogram for percentiles. ``timeseries`` answers trend queries
+from the rollups alone; ``backfill`` (``manage.py backfill_rollups``)
+rebuilds them by streaming complaints and their status history.
+"""
+import bisect
+import datetime
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import AnalyticsRollup, Complaint, ComplaintHistory
+
+GRANULARITIES = (AnalyticsRollup.HOUR, AnalyticsRollup.DAY)
+GROUP_FIELDS = {
+    'department': 'primary_department',
+    'priority': 'priority',
+    'status': 'status',
+}
+
+# Resolution time histogram bounds: 15 minutes to about 85 days
+BOUNDS_HOURS = [0.25 * 2 ** i for i in range(14)]
+
+# (granularity, bucket, primary_department, priority, status)
+RollupKey = Tuple[str, datetime.datetime, str, str, str]
+
+
+def bucket_start(moment: datetime.datetime, granularity: str) -> datetime.datetime:
+    moment = moment.astimezone(datetime.timezone.utc).replace(minute=0, second=0, microsecond=0)
+    if granularity == AnalyticsRollup.DAY:
+        moment = moment.replace(hour=0)
+    return moment
+
+
+def empty_histogram() -> List[int]:
+    return [0] * (len(BOUNDS_HOURS) + 1)
+
+
+def percentile(histogram: Sequence[int], q: float) -> Optional[float]:
+    """
+    Upper bound in hours of the histogram bucket holding the ``q`` quantile
+    (None without data or past the last bucket)
+    """
+    total = sum(histogram)
+    if not total:
+        return None
+    rank = q * total
+    seen = 0
+    for bucket, count in enumerate(histogram[:-1]):
+        seen += count
+        if seen >= rank:
+            return BOUNDS_HOURS[bucket]
+    return None
+
+
+class Accumulator:
+    """Rollup deltas keyed by RollupKey"""
+
+    def __init__(self):
+        self.rows: Dict[RollupKey, list] = {}
+
+    def add(self, at: datetime.datetime, department: Optional[str], priority: Optional[str], status: str,
+            resolution_seconds: Optional[float] = None):
+        for granularity in GRANULARITIES:
+            key = (granularity, bucket_start(at, granularity), department or '', priority or '', status)
+            # count, resolution seconds, resolution count, histogram
+            row = self.rows.get(key)
+            if row is None:
+                row = self.rows[key] = [0, 0.0, 0, empty_histogram()]
+            row[0] += 1
+            if resolution_seconds is not None:
+                row[1] += resolution_seconds
+                row[2] += 1
+                row[3][bisect.bisect_left(BOUNDS_HOURS, resolution_seconds / 3600)] += 1
+
+    def apply(self):
+        """
+        Add the deltas to the stored rows. Rows are locked while they are
+        updated (SQLite already serializes writers within the surrounding
+        write transaction).
+        """
+        for (granularity, bucket, department, priority, status), (count, seconds, resolved, histogram) \
+                in self.rows.items():
+            row, _ = AnalyticsRollup.objects.select_for_update().get_or_create(
+                granularity=granularity, bucket=bucket, primary_department=department,
+                priority=priority, status=status,
+            )
+            row.count += count
+            row.resolution_seconds += seconds
+            row.resolution_count += resolved
+            stored = row.resolution_histogram or empty_histogram()
+            row.resolution_histogram = [a + b for a, b in zip(stored, histogram)]
+            row.save()
+        self.rows.clear()
+
+
+def record_event(complaint: Complaint, status: str, at: Optional[datetime.datetime] = None):
+    """Record that ``complaint`` entered ``status`` (call inside the write transaction)"""
+    at = at or timezone.now()
+    resolution_seconds = None
+    if status == 'Resolved':
+        resolution_seconds = max((at - complaint.date_submitted).total_seconds(), 0.0)
+    accumulator = Accumulator()
+    accumulator.add(at, complaint.primary_department, complaint.priority, status, resolution_seconds)
+    accumulator.apply()
+
+
+def record_submission(complaint: Complaint):
+    """Record a routed submission in the bucket of its submission time"""
+    record_event(complaint, 'Submitted', complaint.date_submitted)
+
+
+def backfill(batch_size: int = 2000) -> int:
+    """
+    Rebuild all rollups by streaming routed complaints and their status
+    history. History is attributed to each complaint's current department
+    and priority. Returns the number of events.
+    """
+    accumulator = Accumulator()
+    events = 0
+    complaints = (Complaint.objects
+                  .exclude(classification_status=Complaint.CLASSIFICATION_PENDING)
+                  .order_by()
+                  .values_list('date_submitted', 'primary_department', 'priority')
+                  .iterator(chunk_size=batch_size))
+    for date_submitted, department, priority in complaints:
+        accumulator.add(date_submitted, department, priority, 'Submitted')
+        events += 1
+
+    history = (ComplaintHistory.objects
+               .filter(action='Status Updated')
+               .exclude(complaint__classification_status=Complaint.CLASSIFICATION_PENDING)
+               .order_by()
+               .values_list('created_at', 'status_to', 'complaint__date_submitted',
+                            'complaint__primary_department', 'complaint__priority')
+               .iterator(chunk_size=batch_size))
+    for created_at, status, date_submitted, department, priority in history:
+        resolution_seconds = None
+        if status == 'Resolved':
+            resolution_seconds = max((created_at - date_submitted).total_seconds(), 0.0)
+        accumulator.add(created_at, department, priority, status, resolution_seconds)
+        events += 1
+
+    with transaction.atomic():
+        AnalyticsRollup.objects.all().delete()
+        AnalyticsRollup.objects.bulk_create(
+            (
+                AnalyticsRollup(
+                    granularity=granularity, bucket=bucket, primary_department=department, priority=priority,
+                    status=status, count=count, resolution_seconds=seconds, resolution_count=resolved,
+                    resolution_histogram=histogram,
+                )
+                for (granularity, bucket, department, priority, status), (count, seconds, resolved, histogram)
+                in accumulator.rows.items()
+            ),
+            batch_size=batch_size,
+        )
+    return events
+
+
+def timeseries(granularity: str, start: datetime.datetime, end: datetime.datetime,
+               group_by: Sequence[str] = (), statuses: Optional[Iterable[str]] = None) -> List[Dict]:
+    """
+    One series per ``group_by`` combination with a point per non-empty
+    bucket in ``[start, end)``: event count and resolution time statistics
+    """
+    group_fields = [GROUP_FIELDS[name] for name in group_by]
+    rows = AnalyticsRollup.objects.filter(
+        granularity=granularity, bucket__gte=bucket_start(start, granularity), bucket__lt=end,
+    )
+    if statuses:
+        rows = rows.filter(status__in=list(statuses))
+
+    # series key -> bucket -> [count, seconds, resolved, histogram]
+    series: Dict[tuple, Dict[datetime.datetime, list]] = defaultdict(dict)
+    for values in rows.values_list('bucket', 'count', 'resolution_seconds', 'resolution_count',
+                                   'resolution_histogram', *group_fields):
+        bucket, count, seconds, resolved, histogram = values[:5]
+        point = series[values[5:]].setdefault(bucket, [0, 0.0, 0, empty_histogram()])
+        point[0] += count
+        point[1] += seconds
+        point[2] += resolved
+        point[3] = [a + b for a, b in zip(point[3], histogram or empty_histogram())]
+
+    result = []
+    for key in sorted(series, key=lambda key: tuple(value or '' for value in key)):
+        points = []
+        for bucket, (count, seconds, resolved, histogram) in sorted(series[key].items()):
+            points.append({
+                'bucket': bucket.isoformat(),
+                'count': count,
+                'resolved': resolved,
+                'avgResolutionHours': round(seconds / resolved / 3600, 2) if resolved else None,
+                'p50ResolutionHours': percentile(histogram, 0.50),
+                'p90ResolutionHours': percentile(histogram, 0.90),
+            })
+        result.append({'group': dict(zip(group_by, key)), 'points': points})
+    return result
@@ -0,0 +1,170 @@
+"""Apply NLP routing results to complaints"""
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+
+from . import analytics
+from .models import Complaint, ComplaintDepartment, ComplaintHistory, Notification, RoutingFeedback, User
+
+
+def routing_fields(nlp_result: Dict) -> Dict:
+    """Complaint field values derived from an NLP classification result"""
+    primary_department = nlp_result['predictedDepartment']
+    return {
+        'department': primary_department,
+        'primary_department': primary_department,
+        'departments': nlp_result.get('departments', [primary_department]),
+        'priority': nlp_result['urgency'],
+        'confidence_score': nlp_result['confidenceScore'],
+        'nlp_analysis': nlp_result,
+        'classification_status': Complaint.CLASSIFICATION_DONE,
+    }
+
+
+def route_confidences(nlp_result: Optional[Dict]) -> Dict[str, float]:
+    """Confidence per department of an NLP classification result"""
+    details = (nlp_result or {}).get('departmentDetails') or []
+    return {detail['department']: detail['confidence'] for detail in details}
+
+
+def routed_departments(primary_department: Optional[str], departments) -> List[str]:
+    """Departments a complaint is routed to, primary first (empty until it is classified)"""
+    routed = [primary_department] if primary_department else []
+    if isinstance(departments, list):
+        routed += [department for department in departments if department and department not in routed]
+    return routed
+
+
+def route_rows(model, complaint, confidences: Dict[str, float]) -> List:
+    """Unsaved routing rows (``model`` instances) for a complaint's current departments"""
+    primary_department = complaint.primary_department or complaint.department
+    values = {
+        'complaint_id': complaint.id,
+        'status': complaint.status,
+        'is_open': complaint.status in Complaint.OPEN_STATUSES,
+        'priority_rank': Complaint.PRIORITY_RANKS.get(complaint.priority, Complaint.UNRANKED),
+        'date_submitted': complaint.date_submitted,
+    }
+    # Historical models (in migrations) may predate some columns
+    columns = {field.attname for field in model._meta.concrete_fields}
+    values = {name: value for name, value in values.items() if name in columns}
+    return [
+        model(department=department, confidence=confidences.get(department),
+              is_primary=department == primary_department, **values)
+        for department in routed_departments(primary_department, complaint.departments)
+    ]
+
+
+def sync_routes(complaints: Iterable[Complaint], confidences: Optional[Dict[str, Dict[str, float]]] = None):
+    """
+    Replace the routing rows of ``complaints`` with their current
+    departments. ``confidences`` maps complaint id to per-department
+    confidence; by default the stored confidences are kept.
+    """
+    complaints = list(complaints)
+    existing = ComplaintDepartment.objects.filter(complaint_id__in=[complaint.id for complaint in complaints])
+    if confidences is None:
+        confidences = defaultdict(dict)
+        for complaint_id, department, confidence in existing.values_list('complaint_id', 'department', 'confidence'):
+            confidences[complaint_id][department] = confidence
+    existing.delete()
+    ComplaintDepartment.objects.bulk_create([
+        row for complaint in complaints
+        for row in route_rows(ComplaintDepartment, complaint, confidences.get(complaint.id, {}))
+    ])
+
+
+def sync_route_status(complaint: Complaint):
+    """Copy a status change to the complaint's routing rows"""
+    ComplaintDepartment.objects.filter(complaint_id=complaint.id).update(
+        status=complaint.status, is_open=complaint.status in Complaint.OPEN_STATUSES
+    )
+
+
+def backfill_routes(route_model, complaint_model, batch_size: int = 1000) -> int:
+    """
+    Rebuild all routing rows from the complaints' department fields (model
+    classes are passed in so migrations can use historical models). Returns
+    the number of rows.
+    """
+    route_model.objects.all().delete()
+    complaints = (complaint_model.objects
+                  .only('id', 'department', 'primary_department', 'departments', 'nlp_analysis',
+                        'status', 'priority', 'date_submitted')
+                  .order_by('id')
+                  .iterator(chunk_size=batch_size))
+    rows = []
+    written = 0
+    for complaint in complaints:
+        rows += route_rows(route_model, complaint, route_confidences(complaint.nlp_analysis))
+        if len(rows) >= batch_size:
+            route_model.objects.bulk_create(rows)
+            written += len(rows)
+            rows = []
+    route_model.objects.bulk_create(rows)
+    return written + len(rows)
+
+
+def record_routing(complaint: Complaint, user: User, nlp_result: Dict):
+    """Write the history entry and notification for a newly routed complaint"""
+    primary_department = nlp_result['predictedDepartment']
+    all_departments = nlp_result.get('departments', [primary_department])
+    is_multi_routing = nlp_result.get('multiDepartmentRouting', False)
+    
+    # Create history entry
+    ComplaintHistory.objects.create(
+        complaint=complaint,
+        user=user,
+        action='Complaint Submitted',
+        status_from=None,
+        status_to='Submitted',
+        comment=f'Complaint routed to: {", ".join(all_departments)}'
+    )
+    
+    # Create notification with multi-department info
+    dept_message = f'{len(all_departments)} departments' if is_multi_routing else primary_department
+    Notification.objects.create(
+        user=user,
+        complaint=complaint,
+        type='complaint_submitted',
+        message=f'Your complaint {complaint.id} has been submitted and routed to {dept_message}'
+    )
+
+
+def reroute_complaint(complaint: Complaint, department: str, user: User, comment: str = '') -> bool:
+    """
+    Make ``department`` the complaint's primary department and record the
+    correction as a labeled example for online learning. Call it inside a
+    transaction on a row loaded with ``select_for_update()``; only the
+    routing columns are written, so concurrent status changes are kept.
+    Returns False when the complaint is already routed there.
+    """
+    previous_department = complaint.primary_department or complaint.department
+    if department == previous_department:
+        return False
+    
+    secondary = [d for d in complaint.get_departments_list() if d not in (previous_department, department)]
+    before = analytics.snapshot(complaint)
+    complaint.department = department
+    complaint.primary_department = department
+    complaint.departments = [department] + secondary
+    complaint.save(update_fields=['department', 'primary_department', 'departments', 'date_updated'])
+    analytics.record_change(before, analytics.snapshot(complaint))
+    sync_routes([complaint])
+    
+    ComplaintHistory.objects.create(
+        complaint=complaint,
+        user=user,
+        action='Department Updated',
+        status_from=complaint.status,
+        status_to=complaint.status,
+        comment=comment or f'Re-routed from {previous_department} to {department}'
+    )
+    
+    RoutingFeedback.objects.create(
+        complaint=complaint,
+        user=user,
+        text=complaint.description,
+        previous_department=previous_department,
+        corrected_department=department
+    )
+    return True
@@ -0,0 +1,129 @@
+"""
+Full-text complaint search with an SQLite FTS5 index.
+
+``complaints_fts`` is a contentless FTS5 table over the title, description
+and location columns of ``complaints``: it stores only the inverted index.
+Its rows are keyed on ``complaints_fts_keys.id``, an INTEGER PRIMARY KEY
+assigned to each complaint id, because the implicit rowid of ``complaints``
+(a varchar-keyed table) may be renumbered by VACUUM. Triggers created by
+migration 0011 keep both in sync with every insert, update and delete,
+including ``QuerySet.update()`` and raw SQL. Results are ranked by bm25
+with title matches weighted above description and location matches.
+"""
+import re
+from typing import List, Optional, Tuple
+
+from django.db import connection
+
+FTS_TABLE = 'complaints_fts'
+KEYS_TABLE = 'complaints_fts_keys'
+# bm25 column weights: title, description, location
+BM25_WEIGHTS = (10.0, 5.0, 2.0)
+
+CREATE_SQL = [
+    f"""CREATE TABLE IF NOT EXISTS {KEYS_TABLE} (
+        id INTEGER PRIMARY KEY,
+        complaint_id varchar(50) NOT NULL UNIQUE
+    )""",
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, description, location,
+        content='', tokenize='porter unicode61'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS complaints_fts_insert AFTER INSERT ON complaints BEGIN
+        INSERT INTO {KEYS_TABLE}(complaint_id) VALUES (new.id);
+        INSERT INTO {FTS_TABLE}(rowid, title, description, location)
+        VALUES (last_insert_rowid(), new.title, new.description, new.location);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS complaints_fts_delete AFTER DELETE ON complaints BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, location)
+        SELECT 'delete', id, old.title, old.description, old.location FROM {KEYS_TABLE} WHERE complaint_id = old.id;
+        DELETE FROM {KEYS_TABLE} WHERE complaint_id = old.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS complaints_fts_update
+        AFTER UPDATE OF title, description, location ON complaints BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, location)
+        SELECT 'delete', id, old.title, old.description, old.location FROM {KEYS_TABLE} WHERE complaint_id = old.id;
+        INSERT INTO {FTS_TABLE}(rowid, title, description, location)
+        SELECT id, new.title, new.description, new.location FROM {KEYS_TABLE} WHERE complaint_id = new.id;
+    END""",
+]
+
+DROP_SQL = [
+    'DROP TRIGGER IF EXISTS complaints_fts_update',
+    'DROP TRIGGER IF EXISTS complaints_fts_delete',
+    'DROP TRIGGER IF EXISTS complaints_fts_insert',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+    f'DROP TABLE IF EXISTS {KEYS_TABLE}',
+]
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def is_supported() -> bool:
+    return connection.vendor == 'sqlite'
+
+
+def match_query(text: str) -> Optional[str]:
+    """
+    FTS5 MATCH expression for free text: every word must match, the last one
+    as a prefix (search-as-you-type). Words are quoted, so user input can
+    never be parsed as FTS5 operators or column filters. None if ``text``
+    has no words.
+    """
+    tokens = _TOKEN_RE.findall(text)
+    if not tokens:
+        return None
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def search(queryset, text: str, limit: int, offset: int = 0) -> Tuple[List[Tuple[str, float]], int]:
+    """
+    ``(complaint_id, bm25 score)`` pairs of the complaints in ``queryset``
+    matching ``text``, best first (lower bm25 is better), and the total
+    number of matches
+    """
+    match = match_query(text)
+    if match is None:
+        return [], 0
+    scope_sql, scope_params = queryset.order_by().values('id').query.sql_with_params()
+    weights = ', '.join(str(weight) for weight in BM25_WEIGHTS)
+    matches_sql = f"""
+        FROM {FTS_TABLE}
+        JOIN {KEYS_TABLE} ON {KEYS_TABLE}.id = {FTS_TABLE}.rowid
+        JOIN complaints ON complaints.id = {KEYS_TABLE}.complaint_id
+        WHERE {FTS_TABLE} MATCH %s AND complaints.id IN ({scope_sql})
+    """
+    params = [match, *scope_params]
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT COUNT(*) {matches_sql}', params)
+        total = cursor.fetchone()[0]
+        cursor.execute(
+            f'SELECT complaints.id, bm25({FTS_TABLE}, {weights}) AS score {matches_sql} '
+            f'ORDER BY score, complaints.date_submitted DESC LIMIT %s OFFSET %s',
+            [*params, limit, offset]
+        )
+        rows = [(complaint_id, float(score)) for complaint_id, score in cursor.fetchall()]
+    return rows, total
+
+
+def rebuild():
+    """Re-create the index from the ``complaints`` table, keying complaints that have no key yet"""
+    with connection.cursor() as cursor:
+        for statement in CREATE_SQL:
+            cursor.execute(statement)
+        cursor.execute(f'DELETE FROM {KEYS_TABLE} WHERE complaint_id NOT IN (SELECT id FROM complaints)')
+        cursor.execute(
+            f'INSERT INTO {KEYS_TABLE}(complaint_id) '
+            f'SELECT id FROM complaints WHERE id NOT IN (SELECT complaint_id FROM {KEYS_TABLE}) ORDER BY rowid'
+        )
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('delete-all')")
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE}(rowid, title, description, location) '
+            f'SELECT {KEYS_TABLE}.id, title, description, location '
+            f'FROM {KEYS_TABLE} JOIN complaints ON complaints.id = {KEYS_TABLE}.complaint_id'
+        )
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+        cursor.execute(f'SELECT COUNT(*) FROM {KEYS_TABLE}')
+        return cursor.fetchone()[0]
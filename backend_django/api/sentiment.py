@@ -0,0 +1,228 @@
+"""
+Built-in lexicon sentiment scorer, a fast alternative to TextBlob.
+
+The polarity table is built from the pattern lexicon TextBlob ships
+(``en/en-sentiment.xml``, read directly so TextBlob and NLTK are never
+imported) the way TextBlob builds it: word senses are averaged per part of
+speech and then across parts of speech, and every adjective also gets its
+"-ly" adverb. Scoring follows TextBlob's rules: the polarity of a text is
+the mean of its assessed words; an adverb modifier scales the next known
+word by its intensity ("very bad"); a preceding negation inverts the
+intensity and turns the word into half of its opposite ("not good" =
+-0.35); "!" boosts the previous assessment; "(!)" marks irony and
+emoticons are scored. One deliberate difference: contracted negations
+("isn't safe") are split and negate, where TextBlob ignores them. Select
+it with ``NLP_SENTIMENT_ENGINE = 'lexicon'``.
+"""
+import importlib.util
+import re
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Tuple
+from xml.etree import ElementTree
+
+import numpy as np
+
+LEXICON = 'lexicon'
+TEXTBLOB = 'textblob'
+
+NEGATIONS = frozenset(('no', 'not', "n't", 'never'))
+# Part-of-speech tags whose words modify the next word
+MODIFIER_TAGS = ('RB',)
+EXCLAMATION_BOOST = 1.25
+NEGATION_FACTOR = -0.5
+IRONY = '(!)'
+
+# TextBlob's emoticons, lowercased like the tokens they are compared with
+EMOTICONS = {
+    emoticon.lower(): score
+    for score, emoticons in (
+        (1.0, ('<3', '♥', '>:D', ':-D', ':D', '=-D', '=D', 'X-D', 'x-D', 'XD', 'xD', '8-D')),
+        (0.75, ('>:P', ':-P', ':P', ':-p', ':p', ':-b', ':b', ':c)', ':o)', ':^)')),
+        (0.5, ('>:)', ':-)', ':)', '=)', '=]', ':]', ':}', ':>', ':3', '8)', '8-)')),
+        (0.25, ('>;]', ';-)', ';)', ';-]', ';]', ';D', ';^)', '*-)', '*)')),
+        (0.05, ('>:o', ':-O', ':O', ':o', ':-o', 'o_O', 'o.O', '°O°', '°o°')),
+        (-0.25, ('>:/', ':-/', ':/', ':\\', '>:\\', ':-.', ':-s', ':s', ':S', ':-S', '>.>')),
+        (-0.75, ('>:[', ':-(', ':(', '=(', ':-[', ':[', ':{', ':-<', ':c', ':-c', '=/')),
+        (-1.0, (":'(", ":'''(", ";'(")),
+    )
+    for emoticon in emoticons
+}
+
+# TextBlob splits quotes everywhere and other punctuation off the ends of words
+_QUOTES = re.escape("'\"“”‘’")
+_PUNCTUATION = re.escape(".,;:!?()[]{}`@#$^&*+-|=~_")
+_TOKEN_RE = re.compile(
+    r"(?<!\S)(?:{emoticons})(?=\s|$)|\( ?! ?\)|n't|\.\.\.|"
+    r"[^\s{q}{p}]+(?:[{p}]+[^\s{q}{p}]+)*|\S".format(
+        emoticons='|'.join(re.escape(e) for e in sorted(EMOTICONS, key=len, reverse=True)),
+        q=_QUOTES,
+        p=_PUNCTUATION,
+    )
+)
+
+
+def _avg(values) -> float:
+    return sum(values) / float(len(values) or 1)
+
+
+def lexicon_path() -> Path:
+    """TextBlob's pattern sentiment lexicon, located without importing TextBlob"""
+    spec = importlib.util.find_spec('textblob')
+    if spec is None or not spec.submodule_search_locations:
+        raise RuntimeError('TextBlob is not installed; the lexicon engine reads its sentiment lexicon')
+    return Path(next(iter(spec.submodule_search_locations))) / 'en' / 'en-sentiment.xml'
+
+
+@lru_cache(maxsize=None)
+def polarity_lexicon() -> Dict[str, Tuple[float, float, bool]]:
+    """``{word: (polarity, intensity, is_modifier)}``, loaded on first use"""
+    words: Dict[str, Dict] = {}
+    for entry in ElementTree.parse(lexicon_path()).getroot().findall('word'):
+        form = entry.attrib.get('form')
+        if form:
+            words.setdefault(form, {}).setdefault(entry.attrib.get('pos'), []).append((
+                float(entry.attrib.get('polarity', 0.0)),
+                float(entry.attrib.get('intensity', 1.0)),
+            ))
+    # Average the senses per part of speech, then the parts of speech
+    for form, senses in words.items():
+        words[form] = {pos: [_avg(column) for column in zip(*scores)] for pos, scores in senses.items()}
+        words[form][None] = [_avg(column) for column in zip(*words[form].values())]
+    # Adjectives also score as their adverb: "terrible" -> "terribly"
+    for form, senses in list(words.items()):
+        if 'JJ' in senses:
+            if form.endswith('y'):
+                form = form[:-1] + 'i'
+            if form.endswith('le'):
+                form = form[:-2]
+            adverb = words.setdefault(form + 'ly', {})
+            adverb['RB'] = adverb[None] = senses['JJ']
+    return {
+        form: (senses[None][0], senses[None][1], any(tag in senses for tag in MODIFIER_TAGS))
+        for form, senses in words.items()
+    }
+
+
+def _clamp(value: float) -> float:
+    return max(-1.0, min(value, 1.0))
+
+
+def polarity(text_lower: str) -> float:
+    """Polarity in [-1, 1] of lowercased text"""
+    table = polarity_lexicon()
+    # Each assessment is [polarity, intensity, negated]
+    assessments: List[list] = []
+    modifier = None
+    negation = False
+    for word in _TOKEN_RE.findall(text_lower.replace("n't", " n't")):
+        entry = table.get(word)
+        if entry is not None:
+            word_polarity, intensity, is_modifier = entry
+            if modifier is None:
+                assessments.append([word_polarity, intensity, False])
+            else:
+                # "very bad": the modifier's assessment becomes the pair's
+                previous = assessments[-1]
+                previous[0] = _clamp(word_polarity * previous[1])
+                previous[1] = intensity
+            if negation:
+                # "not very good"
+                assessments[-1][1] = 1.0 / assessments[-1][1]
+                assessments[-1][2] = True
+            modifier = word if is_modifier else None
+            negation = word in NEGATIONS
+            continue
+
+        if word in NEGATIONS:
+            negation = True
+        elif negation and len(word.strip("'")) > 1:
+            # Negation carries over small words only ("not a good")
+            negation = False
+        if negation and modifier is not None and modifier.endswith('ly'):
+            # "really not good"
+            assessments[-1][2] = True
+            negation = False
+        elif modifier is not None and len(word) > 2:
+            # The modifier also carries over small words only
+            modifier = None
+        if word == '!' and assessments:
+            assessments[-1][0] = _clamp(assessments[-1][0] * EXCLAMATION_BOOST)
+        if word.replace(' ', '') == IRONY:
+            assessments.append([0.0, 1.0, False])
+        elif word in EMOTICONS and not word.isalpha():
+            assessments.append([EMOTICONS[word], 1.0, False])
+
+    if not assessments:
+        return 0.0
+    total = sum(p * NEGATION_FACTOR if negated else p for p, _, negated in assessments)
+    return total / len(assessments)
+
+
+def textblob_polarity(text: str) -> float:
+    from textblob import TextBlob
+    return TextBlob(text).sentiment.polarity
+
+
+def _latency(seconds: float, count: int) -> Dict[str, float]:
+    return {'totalMs': round(seconds * 1000, 2), 'perTextMs': round(seconds * 1000 / count, 4)}
+
+
+def parity_report(classifier, texts: List[str], max_disagreements: int = 20) -> Dict:
+    """
+    Compare the lexicon engine with TextBlob on ``texts``: latency of each
+    engine, polarity error, and agreement of the sentiment and urgency
+    labels the classifier derives from them
+    """
+    # Import and load both engines outside the timers
+    textblob_polarity(texts[0])
+    polarity_lexicon()
+
+    started = time.perf_counter()
+    reference = np.array([textblob_polarity(text) for text in texts])
+    textblob_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    scores = np.array([polarity(text.lower()) for text in texts])
+    lexicon_seconds = time.perf_counter() - started
+
+    sentiment_agree = urgency_agree = 0
+    disagreements = []
+    for text, expected, actual in zip(texts, reference, scores):
+        labels = []
+        for value in (expected, actual):
+            context = classifier.analyze(text)
+            context.sentiment_polarity = float(value)
+            labels.append((
+                classifier.analyze_sentiment(context),
+                classifier.determine_urgency(context)[0],
+            ))
+        (expected_sentiment, expected_urgency), (sentiment, urgency) = labels
+        sentiment_agree += expected_sentiment == sentiment
+        urgency_agree += expected_urgency == urgency
+        if labels[0] != labels[1] and len(disagreements) < max_disagreements:
+            disagreements.append({
+                'text': text,
+                'textblob': {
+                    'polarity': round(float(expected), 4),
+                    'sentiment': expected_sentiment,
+                    'urgency': expected_urgency,
+                },
+                'lexicon': {'polarity': round(float(actual), 4), 'sentiment': sentiment, 'urgency': urgency},
+            })
+
+    count = len(texts)
+    errors = np.abs(reference - scores)
+    return {
+        'examples': count,
+        'textblob': _latency(textblob_seconds, count),
+        'lexicon': _latency(lexicon_seconds, count),
+        'speedup': round(textblob_seconds / lexicon_seconds, 1) if lexicon_seconds else None,
+        'polarityMeanAbsError': round(float(errors.mean()), 4),
+        'polarityMaxAbsError': round(float(errors.max()), 4),
+        'polarityExactMatch': round(float(np.mean(errors < 1e-6)), 4),
+        'sentimentAgreement': round(sentiment_agree / count, 4),
+        'urgencyAgreement': round(urgency_agree / count, 4),
+        'disagreements': disagreements,
+    }
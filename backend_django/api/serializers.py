@@ -1,3 +1,4 @@
+from django.conf import settings
 from rest_framework import serializers
 from .models import User, Complaint, ComplaintHistory, Notification, Department
 
@@ -76,5 +77,21 @@ class StatusUpdateSerializer(serializers.Serializer):
     comment = serializers.CharField(required=False, allow_blank=True, max_length=1000)
 
 
+class DepartmentUpdateSerializer(serializers.Serializer):
+    department = serializers.CharField(max_length=255)
+    comment = serializers.CharField(required=False, allow_blank=True, max_length=1000)
+
+
 class ClassifyTextSerializer(serializers.Serializer):
     text = serializers.CharField()
+
+
+class ClassifyBatchSerializer(serializers.Serializer):
+    texts = serializers.ListField(child=serializers.CharField(max_length=5000), allow_empty=False)
+    
+    def validate_texts(self, value):
+        """Enforce the configured maximum batch size"""
+        max_size = settings.NLP_BATCH_MAX_SIZE
+        if len(value) > max_size:
+            raise serializers.ValidationError(f"At most {max_size} texts can be classified per request.")
+        return value
@@ -0,0 +1,380 @@
+"""
+Sparse TF-IDF vector index of complaint texts for "similar complaints".
+
+Rows are the classifier's feature vectors (TF-IDF or hashing, L2-normalized)
+of each complaint's title and description, so a top-k cosine search is one
+sparse matrix-vector product. The index remembers the model version whose
+vectorizer built it and keeps using that vectorizer until it is rebuilt.
+
+Layout, like the model store::
+
+    <root>/generations/<generation>/{data,indices,indptr,ids}.npy + meta.json
+    <root>/CURRENT            # name of the live generation
+
+Workers memory-map the live generation. Complaints submitted since it was
+written are appended to a small in-memory delta (on submit, and by catching
+up from the database at most every ``catch_up_interval`` seconds).
+``compact()`` merges base and delta into a new generation;
+``manage.py build_similar_index`` runs it on a schedule, or rebuilds from
+scratch with the current model. Requests never build or compact inline: a
+worker that finds no generation builds the first one in a background thread
+(searches raise ``IndexNotReady`` meanwhile), and a delta that grows past
+``max_delta_rows`` is compacted in the background.
+"""
+import datetime
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from itertools import islice
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from .models import Complaint
+
+logger = logging.getLogger(__name__)
+
+CURRENT_FILENAME = 'CURRENT'
+META_FILENAME = 'meta.json'
+ARRAYS = ('data', 'indices', 'indptr', 'ids')
+
+
+def complaint_text(title: str, description: str) -> str:
+    return f'{title} {description}'
+
+
+class IndexNotReady(Exception):
+    """No generation exists yet; the first one is being built in the background"""
+
+
+class SimilarityIndex:
+    def __init__(self, root, classifier=None, check_interval: float = 30,
+                 catch_up_interval: float = 5, max_delta_rows: int = 5000, max_candidates: int = 2000):
+        self.root = Path(root)
+        self.generations_dir = self.root / 'generations'
+        self.current_path = self.root / CURRENT_FILENAME
+        self.check_interval = check_interval
+        self.catch_up_interval = catch_up_interval
+        self.max_delta_rows = max_delta_rows
+        self.max_candidates = max_candidates
+        self._classifier = classifier
+        self._lock = threading.RLock()
+        self._last_check = 0.0
+        self._last_catch_up: Optional[float] = None
+        self._maintenance: Optional[threading.Thread] = None
+        self.generation: Optional[str] = None
+        self.model_version: Optional[str] = None
+        self._featurizer = None
+        self._base = None
+        self._base_ids = np.array([], dtype=str)
+        self._delta_rows: List = []
+        self._delta_ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self.watermark: Optional[datetime.datetime] = None
+
+    @property
+    def classifier(self):
+        if self._classifier is None:
+            from .nlp_classifier import classifier
+            self._classifier = classifier
+        return self._classifier
+
+    # Featurization
+
+    def _featurizer_for(self, version: Optional[str]):
+        """The vectorizer part of the classifier pipeline of ``version``"""
+        instance = self.classifier.get() if hasattr(self.classifier, 'get') else self.classifier
+        if version is None or version == instance.model_version:
+            return instance.model[:-1], instance.model_version
+        model, _ = instance.store.load(version)
+        return model[:-1], version
+
+    def featurize(self, texts: Sequence[str], featurizer=None) -> sparse.csr_matrix:
+        from sklearn.preprocessing import normalize
+
+        instance = self.classifier.get() if hasattr(self.classifier, 'get') else self.classifier
+        matrix = (featurizer or self._featurizer).transform([instance.preprocess_text(text) for text in texts])
+        return normalize(sparse.csr_matrix(matrix, dtype=np.float32), copy=False)
+
+    # Persistence
+
+    def current_generation(self) -> Optional[str]:
+        try:
+            return self.current_path.read_text().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _write(self, matrix: sparse.csr_matrix, ids: np.ndarray, watermark, model_version: str) -> str:
+        created_at = datetime.datetime.now(datetime.timezone.utc)
+        generation = f'{created_at:%Y%m%dT%H%M%S%f}'
+        self.generations_dir.mkdir(parents=True, exist_ok=True)
+        scratch = Path(tempfile.mkdtemp(prefix=f'.{generation}-', dir=self.generations_dir))
+        for name, array in zip(ARRAYS, (matrix.data, matrix.indices, matrix.indptr, ids)):
+            np.save(scratch / f'{name}.npy', array)
+        with open(scratch / META_FILENAME, 'w') as f:
+            json.dump({
+                'generation': generation,
+                'created_at': created_at.isoformat(),
+                'model_version': model_version,
+                'rows': matrix.shape[0],
+                'features': matrix.shape[1],
+                'watermark': watermark.isoformat() if watermark else None,
+            }, f, indent=2)
+        os.replace(scratch, self.generations_dir / generation)
+
+        fd, pointer = tempfile.mkstemp(prefix='.CURRENT-', dir=self.root)
+        with os.fdopen(fd, 'w') as f:
+            f.write(generation)
+        os.replace(pointer, self.current_path)
+        logger.info("Wrote similar-complaints index generation %s (%d rows)", generation, matrix.shape[0])
+        return generation
+
+    def load(self, generation: Optional[str] = None) -> bool:
+        """Memory-map a generation (default: current); False when there is none"""
+        generation = generation or self.current_generation()
+        if not generation:
+            return False
+        path = self.generations_dir / generation
+        with open(path / META_FILENAME) as f:
+            meta = json.load(f)
+        arrays = {name: np.load(path / f'{name}.npy', mmap_mode='r') for name in ARRAYS}
+        base = sparse.csr_matrix(
+            (arrays['data'], arrays['indices'], arrays['indptr']),
+            shape=(meta['rows'], meta['features']),
+        )
+        featurizer, model_version = self._featurizer_for(meta['model_version'])
+        with self._lock:
+            self.generation = generation
+            self.model_version = model_version
+            self._featurizer = featurizer
+            self._base = base
+            self._base_ids = arrays['ids']
+            self._delta_rows, self._delta_ids = [], []
+            self._positions = {str(complaint_id): row for row, complaint_id in enumerate(self._base_ids)}
+            self.watermark = datetime.datetime.fromisoformat(meta['watermark']) if meta['watermark'] else None
+            self._last_check = time.monotonic()
+            self._last_catch_up = None
+        return True
+
+    # Maintenance
+
+    def build(self, batch_size: int = 2000) -> str:
+        """Index every complaint with the classifier's current model and go live"""
+        featurizer, model_version = self._featurizer_for(None)
+        rows, ids, watermark = [], [], None
+        complaints = (Complaint.objects.order_by('date_submitted', 'id')
+                      .values_list('id', 'title', 'description', 'date_submitted')
+                      .iterator(chunk_size=batch_size))
+        while True:
+            batch = list(islice(complaints, batch_size))
+            if not batch:
+                break
+            rows.append(self.featurize(
+                [complaint_text(title, description) for _, title, description, _ in batch], featurizer
+            ))
+            ids.extend(complaint_id for complaint_id, _, _, _ in batch)
+            watermark = batch[-1][3]
+        matrix = sparse.vstack(rows, format='csr') if rows else self.featurize([''], featurizer)[:0]
+        generation = self._write(matrix, np.array(ids, dtype=str), watermark, model_version)
+        self.load(generation)
+        return generation
+
+    def compact(self) -> str:
+        """Merge the in-memory delta into a new generation"""
+        self.catch_up(force=True)
+        with self._lock:
+            base, base_ids = self._base, self._base_ids
+            delta_rows, delta_ids = list(self._delta_rows), list(self._delta_ids)
+            watermark, model_version = self.watermark, self.model_version
+        # Complaints appended meanwhile are caught up again from the watermark after the load
+        matrix = sparse.vstack([base] + delta_rows, format='csr')
+        ids = np.concatenate([np.asarray(base_ids, dtype=str), np.array(delta_ids, dtype=str)])
+        generation = self._write(matrix, ids, watermark, model_version)
+        self.load(generation)
+        return generation
+
+    def prune(self, keep: int = 2) -> List[str]:
+        """Delete all but the ``keep`` newest generations (never the live one)"""
+        if not self.generations_dir.exists():
+            return []
+        current = self.current_generation()
+        generations = sorted(
+            (path.name for path in self.generations_dir.iterdir()
+             if path.is_dir() and not path.name.startswith('.')),
+            reverse=True,
+        )
+        removed = [name for name in generations[keep:] if name != current]
+        for name in removed:
+            shutil.rmtree(self.generations_dir / name, ignore_errors=True)
+        return removed
+
+    def _in_background(self, function):
+        """Run ``function`` in a maintenance thread unless one is already running"""
+        with self._lock:
+            if self._maintenance is not None and self._maintenance.is_alive():
+                return
+            self._maintenance = threading.Thread(
+                target=self._run_maintenance, args=(function,),
+                name=f'similar-index-{function.__name__}', daemon=True,
+            )
+            self._maintenance.start()
+
+    def _run_maintenance(self, function):
+        from django.db import connection
+
+        try:
+            function()
+        except Exception:
+            logger.exception("Similar-complaints index %s failed", function.__name__)
+        finally:
+            connection.close()
+
+    def _compact_and_prune(self):
+        self.compact()
+        self.prune()
+
+    def ensure_loaded(self):
+        """
+        Load the live generation and pick up newer ones. When there is none
+        yet, start building it in the background and raise ``IndexNotReady``.
+        """
+        now = time.monotonic()
+        if self._base is not None and now - self._last_check < self.check_interval:
+            return
+        with self._lock:
+            current = self.current_generation()
+            if current is None and self._base is None:
+                logger.info("No similar-complaints index yet, building one in the background")
+                self._in_background(self.build)
+                raise IndexNotReady('The similar-complaints index is being built')
+            if current is not None and current != self.generation:
+                self.load(current)
+            self._last_check = now
+
+    def append(self, complaint_id: str, title: str, description: str, date_submitted=None):
+        """Add a complaint to the in-memory delta (no-op before the index is loaded)"""
+        if self._base is None:
+            return
+        row = self.featurize([complaint_text(title, description)])
+        with self._lock:
+            if complaint_id in self._positions:
+                return
+            self._positions[complaint_id] = len(self._base_ids) + len(self._delta_ids)
+            self._delta_rows.append(row)
+            self._delta_ids.append(complaint_id)
+            if date_submitted is not None and (self.watermark is None or date_submitted > self.watermark):
+                self.watermark = date_submitted
+
+    def catch_up(self, force: bool = False):
+        """Append complaints other workers accepted since the watermark (throttled unless ``force``)"""
+        now = time.monotonic()
+        with self._lock:
+            if not force and self._last_catch_up is not None and now - self._last_catch_up < self.catch_up_interval:
+                return
+            self._last_catch_up = now
+        queryset = Complaint.objects.order_by('date_submitted', 'id')
+        if self.watermark is not None:
+            queryset = queryset.filter(date_submitted__gte=self.watermark)
+        new = [
+            row for row in queryset.values_list('id', 'title', 'description', 'date_submitted')
+            if row[0] not in self._positions
+        ]
+        if not new:
+            return
+        matrix = self.featurize([complaint_text(title, description) for _, title, description, _ in new])
+        with self._lock:
+            for offset, (complaint_id, _, _, date_submitted) in enumerate(new):
+                if complaint_id in self._positions:
+                    continue
+                self._positions[complaint_id] = len(self._base_ids) + len(self._delta_ids)
+                self._delta_rows.append(matrix[offset])
+                self._delta_ids.append(complaint_id)
+            self.watermark = max(self.watermark or new[-1][3], new[-1][3])
+
+    # Search
+
+    def search(self, text: str, k: int = 10, exclude_id: Optional[str] = None,
+               statuses: Optional[Sequence[str]] = None) -> List[Tuple[str, float]]:
+        """
+        Top ``k`` ``(complaint_id, cosine similarity)`` pairs for ``text``,
+        optionally restricted to complaints whose status is in ``statuses``.
+        Only the ``max_candidates`` best matches are checked against the
+        status filter, so fewer than ``k`` may be returned.
+        """
+        self.ensure_loaded()
+        self.catch_up()
+        query = self.featurize([text])
+        with self._lock:
+            base, base_ids = self._base, self._base_ids
+            delta_rows, delta_ids = list(self._delta_rows), list(self._delta_ids)
+        if len(delta_ids) >= self.max_delta_rows:
+            self._in_background(self._compact_and_prune)
+
+        scores = np.asarray((base @ query.T).todense()).ravel()
+        if delta_rows:
+            delta = sparse.vstack(delta_rows, format='csr')
+            scores = np.concatenate([scores, np.asarray((delta @ query.T).todense()).ravel()])
+
+        def complaint_id_at(row: int) -> str:
+            return str(base_ids[row]) if row < len(base_ids) else delta_ids[row - len(base_ids)]
+
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > self.max_candidates:
+            candidates = candidates[np.argpartition(-scores[candidates], self.max_candidates)[:self.max_candidates]]
+        order = candidates[np.argsort(-scores[candidates], kind='stable')]
+        results: List[Tuple[str, float]] = []
+        # Status changes over time, so filter against the database in ranked chunks,
+        # doubling in size so at most about log2(max_candidates / chunk) queries run
+        start, chunk = 0, max(4 * k, 50)
+        while start < len(order):
+            ranked = [(complaint_id_at(row), float(scores[row])) for row in order[start:start + chunk]]
+            start, chunk = start + chunk, 2 * chunk
+            ranked = [(complaint_id, score) for complaint_id, score in ranked if complaint_id != exclude_id]
+            if statuses is not None:
+                allowed = set(Complaint.objects
+                              .filter(id__in=[complaint_id for complaint_id, _ in ranked], status__in=statuses)
+                              .values_list('id', flat=True))
+                ranked = [(complaint_id, score) for complaint_id, score in ranked if complaint_id in allowed]
+            results.extend(ranked)
+            if len(results) >= k:
+                break
+        return [(complaint_id, round(score, 4)) for complaint_id, score in results[:k]]
+
+    def stats(self) -> Dict:
+        return {
+            'generation': self.generation,
+            'modelVersion': self.model_version,
+            'baseRows': len(self._base_ids),
+            'deltaRows': len(self._delta_ids),
+        }
+
+
+_index: Optional[SimilarityIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> SimilarityIndex:
+    """The process-wide index, created on first use"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            from django.conf import settings
+            _index = SimilarityIndex(
+                settings.SIMILAR_INDEX_DIR,
+                check_interval=settings.NLP_MODEL_CHECK_INTERVAL,
+                catch_up_interval=settings.SIMILAR_CATCH_UP_INTERVAL,
+                max_delta_rows=settings.SIMILAR_MAX_DELTA_ROWS,
+                max_candidates=settings.SIMILAR_MAX_CANDIDATES,
+            )
+        return _index
+
+
+def loaded_index() -> Optional[SimilarityIndex]:
+    """The process-wide index if it has been loaded, else None"""
+    return _index if _index is not None and _index.generation is not None else None
@@ -0,0 +1,358 @@
+"""
+Columnar analytics snapshots.
+
+``export_snapshot`` streams complaints, their history and users out of the
+database into compressed Arrow IPC (Feather v2) files, one record batch per
+chunk, so memory stays bounded however large the tables are. Snapshots are
+laid out like the model store::
+
+    <root>/generations/<generation>/{complaints,history,users}.arrow + meta.json
+    <root>/CURRENT            # name of the latest snapshot
+
+``SnapshotEngine`` loads the latest snapshot once per process (the files
+are compressed, so they are read into memory rather than memory-mapped)
+and computes reports with vectorized pandas/numpy operations, so heavy
+reporting never queries the OLTP database. ``manage.py export_snapshot``
+refreshes the snapshot on a schedule.
+
+pandas and pyarrow are imported only when a snapshot is written or
+loaded, so importing this module (and the URLconf) stays cheap.
+"""
+import datetime
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from itertools import islice
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from .models import Complaint, ComplaintHistory, User
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CURRENT_FILENAME = 'CURRENT'
+META_FILENAME = 'meta.json'
+
+# table name -> (queryset factory, [(column, model field, arrow type name)])
+TABLES = {
+    'complaints': (
+        lambda: Complaint.objects.order_by('id'),
+        [
+            ('id', 'id', 'string'),
+            ('user_id', 'user_id', 'string'),
+            ('status', 'status', 'string'),
+            ('department', 'primary_department', 'string'),
+            ('priority', 'priority', 'string'),
+            ('classification_status', 'classification_status', 'string'),
+            ('confidence_score', 'confidence_score', 'float64'),
+            ('date_submitted', 'date_submitted', 'timestamp'),
+            ('date_updated', 'date_updated', 'timestamp'),
+            ('date_resolved', 'date_resolved', 'timestamp'),
+        ],
+    ),
+    'history': (
+        lambda: ComplaintHistory.objects.order_by('id'),
+        [
+            ('id', 'id', 'int64'),
+            ('complaint_id', 'complaint_id', 'string'),
+            ('user_id', 'user_id', 'string'),
+            ('action', 'action', 'string'),
+            ('status_from', 'status_from', 'string'),
+            ('status_to', 'status_to', 'string'),
+            ('created_at', 'created_at', 'timestamp'),
+        ],
+    ),
+    'users': (
+        lambda: User.objects.order_by('id'),
+        [
+            ('id', 'id', 'string'),
+            ('name', 'name', 'string'),
+            ('role', 'role', 'string'),
+            ('department', 'department', 'string'),
+        ],
+    ),
+}
+
+# Columns stored as categoricals once loaded
+CATEGORICAL = {
+    'complaints': ['status', 'department', 'priority', 'classification_status'],
+    'history': ['action', 'status_from', 'status_to'],
+    'users': ['role', 'department'],
+}
+
+AGE_BINS_DAYS = [0, 1, 3, 7, 30, float('inf')]
+AGE_LABELS = ['<1d', '1-3d', '3-7d', '7-30d', '30d+']
+
+
+def _arrow_type(name: str):
+    import pyarrow as pa
+
+    if name == 'timestamp':
+        return pa.timestamp('us', tz='UTC')
+    return getattr(pa, name)()
+
+
+def _write_table(path: Path, name: str, compression: str, batch_size: int) -> int:
+    import pyarrow as pa
+
+    queryset, columns = TABLES[name]
+    string_columns = [type_name == 'string' for _, _, type_name in columns]
+    columns = [(column, field, _arrow_type(type_name)) for column, field, type_name in columns]
+    schema = pa.schema([(column, arrow_type) for column, _, arrow_type in columns])
+    rows = queryset().values_list(*[field for _, field, _ in columns]).iterator(chunk_size=batch_size)
+    options = pa.ipc.IpcWriteOptions(compression=None if compression == 'uncompressed' else compression)
+    written = 0
+    with pa.OSFile(str(path), 'wb') as sink, pa.ipc.new_file(sink, schema, options=options) as writer:
+        while True:
+            chunk = list(islice(rows, batch_size))
+            if not chunk:
+                break
+            arrays = [
+                # UUIDs and other non-str keys are stored as strings
+                pa.array([None if value is None else str(value) for value in values] if is_string else values,
+                         type=arrow_type)
+                for values, (_, _, arrow_type), is_string in zip(zip(*chunk), columns, string_columns)
+            ]
+            writer.write_batch(pa.record_batch(arrays, schema=schema))
+            written += len(chunk)
+    return written
+
+
+def export_snapshot(root, compression: str = 'zstd', batch_size: int = 5000) -> str:
+    """Write a new snapshot generation and make it current; returns its name"""
+    root = Path(root)
+    generations_dir = root / 'generations'
+    generations_dir.mkdir(parents=True, exist_ok=True)
+    created_at = datetime.datetime.now(datetime.timezone.utc)
+    generation = f'{created_at:%Y%m%dT%H%M%S%f}'
+    scratch = Path(tempfile.mkdtemp(prefix=f'.{generation}-', dir=generations_dir))
+    try:
+        rows = {name: _write_table(scratch / f'{name}.arrow', name, compression, batch_size) for name in TABLES}
+        with open(scratch / META_FILENAME, 'w') as f:
+            json.dump({
+                'generation': generation,
+                'created_at': created_at.isoformat(),
+                'compression': compression,
+                'rows': rows,
+            }, f, indent=2)
+    except Exception:
+        shutil.rmtree(scratch, ignore_errors=True)
+        raise
+    os.replace(scratch, generations_dir / generation)
+
+    fd, pointer = tempfile.mkstemp(prefix='.CURRENT-', dir=root)
+    with os.fdopen(fd, 'w') as f:
+        f.write(generation)
+    os.replace(pointer, root / CURRENT_FILENAME)
+    logger.info("Exported analytics snapshot %s (%s)", generation, rows)
+    return generation
+
+
+def prune(root, keep: int = 3) -> List[str]:
+    """Delete all but the ``keep`` newest snapshots (never the current one)"""
+    generations_dir = Path(root) / 'generations'
+    if not generations_dir.exists():
+        return []
+    current = current_generation(root)
+    generations = sorted(
+        (path.name for path in generations_dir.iterdir() if path.is_dir() and not path.name.startswith('.')),
+        reverse=True,
+    )
+    removed = [name for name in generations[keep:] if name != current]
+    for name in removed:
+        shutil.rmtree(generations_dir / name, ignore_errors=True)
+    return removed
+
+
+def current_generation(root) -> Optional[str]:
+    try:
+        return (Path(root) / CURRENT_FILENAME).read_text().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _hours(delta: 'pd.Series') -> 'pd.Series':
+    return delta.dt.total_seconds() / 3600
+
+
+def _percentiles(hours: 'pd.Series') -> Dict[str, Optional[float]]:
+    import numpy as np
+
+    if hours.empty:
+        return {'count': 0, 'p50Hours': None, 'p90Hours': None, 'p99Hours': None, 'meanHours': None}
+    p50, p90, p99 = np.percentile(hours.to_numpy(), [50, 90, 99])
+    return {
+        'count': int(hours.size),
+        'p50Hours': round(float(p50), 2),
+        'p90Hours': round(float(p90), 2),
+        'p99Hours': round(float(p99), 2),
+        'meanHours': round(float(hours.mean()), 2),
+    }
+
+
+class SnapshotEngine:
+    """Vectorized reports over one snapshot, loaded into pandas"""
+
+    REPORTS = ('resolution', 'backlog', 'departments', 'officers')
+    # Reports over the last ``window_days``; the backlog is always as of the snapshot
+    WINDOWED = ('resolution', 'departments', 'officers')
+
+    def __init__(self, path):
+        import pandas as pd
+
+        self.path = Path(path)
+        with open(self.path / META_FILENAME) as f:
+            self.meta = json.load(f)
+        self.generation = self.meta['generation']
+        self.as_of = pd.Timestamp(self.meta['created_at'])
+        self.tables = {name: self._load(name) for name in TABLES}
+
+    def _load(self, name: str) -> 'pd.DataFrame':
+        from pyarrow import feather
+
+        # Compressed record batches are decompressed on read, so there is nothing to memory-map
+        frame = feather.read_table(self.path / f'{name}.arrow').to_pandas()
+        for column in CATEGORICAL[name]:
+            frame[column] = frame[column].astype('category')
+        return frame
+
+    def report(self, name: str, window_days: int = 30) -> Dict:
+        if name not in self.REPORTS:
+            raise ValueError(f'Unknown report: {name}')
+        result = {
+            'report': name,
+            'snapshot': self.generation,
+            'asOf': self.as_of.isoformat(),
+        }
+        if name in self.WINDOWED:
+            result['windowDays'] = window_days
+            result['data'] = getattr(self, f'{name}_report')(window_days)
+        else:
+            result['data'] = getattr(self, f'{name}_report')()
+        return result
+
+    def resolution_report(self, window_days: int) -> Dict:
+        """Resolution-time percentiles of complaints resolved in the window, overall, per priority and per department"""
+        import pandas as pd
+
+        complaints = self.tables['complaints']
+        since = self.as_of - pd.Timedelta(days=window_days)
+        resolved = complaints[(complaints['status'] == 'Resolved') & (complaints['date_resolved'] >= since)]
+        hours = _hours(resolved['date_resolved'] - resolved['date_submitted']).clip(lower=0)
+        return {
+            'overall': _percentiles(hours),
+            'byPriority': {
+                str(key): _percentiles(group) for key, group in hours.groupby(resolved['priority'], observed=True)
+            },
+            'byDepartment': {
+                str(key): _percentiles(group) for key, group in hours.groupby(resolved['department'], observed=True)
+            },
+        }
+
+    def backlog_report(self) -> Dict:
+        """Open complaints by age bucket, per department and status"""
+        import pandas as pd
+
+        complaints = self.tables['complaints']
+        open_complaints = complaints[complaints['status'].isin(Complaint.OPEN_STATUSES)]
+        age_days = (self.as_of - open_complaints['date_submitted']).dt.total_seconds() / 86400
+        ages = pd.cut(age_days, AGE_BINS_DAYS, labels=AGE_LABELS, right=False)
+
+        def by(column: str) -> Dict:
+            table = pd.crosstab(open_complaints[column], ages).reindex(columns=AGE_LABELS, fill_value=0)
+            return {str(key): {label: int(row[label]) for label in AGE_LABELS} for key, row in table.iterrows()}
+
+        return {
+            'open': int(len(open_complaints)),
+            'medianAgeDays': round(float(age_days.median()), 2) if len(age_days) else None,
+            'ages': {label: int(count) for label, count in ages.value_counts().reindex(AGE_LABELS, fill_value=0).items()},
+            'byDepartment': by('department'),
+            'byStatus': by('status'),
+        }
+
+    def departments_report(self, window_days: int) -> Dict:
+        """Per department: open backlog, arrivals and resolutions in the window"""
+        import pandas as pd
+
+        complaints = self.tables['complaints']
+        since = self.as_of - pd.Timedelta(days=window_days)
+        frame = pd.DataFrame({
+            'department': complaints['department'],
+            'open': complaints['status'].isin(Complaint.OPEN_STATUSES),
+            'submitted': complaints['date_submitted'] >= since,
+            'resolved': (complaints['status'] == 'Resolved') & (complaints['date_resolved'] >= since),
+        })
+        totals = frame.groupby('department', observed=True).agg(
+            total=('open', 'size'), open=('open', 'sum'), submitted=('submitted', 'sum'), resolved=('resolved', 'sum'),
+        )
+        totals['netChange'] = totals['submitted'] - totals['resolved']
+        return {
+            str(department): {column: int(value) for column, value in row.items()}
+            for department, row in totals.sort_values('open', ascending=False).iterrows()
+        }
+
+    def officers_report(self, window_days: int) -> Dict:
+        """Per officer/admin: status updates and resolutions in the window, and their resolution times"""
+        import pandas as pd
+
+        history = self.tables['history']
+        users = self.tables['users']
+        staff = users[users['role'].isin(['OFFICER', 'ADMIN'])].set_index('id')
+        since = self.as_of - pd.Timedelta(days=window_days)
+        updates = history[
+            (history['action'] == 'Status Updated')
+            & (history['created_at'] >= since)
+            & history['user_id'].isin(staff.index)
+        ]
+        resolutions = updates[updates['status_to'] == 'Resolved'].merge(
+            self.tables['complaints'][['id', 'date_submitted']],
+            left_on='complaint_id', right_on='id', how='left', suffixes=('', '_complaint'),
+        )
+        resolutions = resolutions.assign(
+            hours=_hours(resolutions['created_at'] - resolutions['date_submitted']).clip(lower=0)
+        )
+        per_officer = pd.DataFrame({
+            'updates': updates.groupby('user_id').size(),
+            'complaints': updates.groupby('user_id')['complaint_id'].nunique(),
+            'resolved': resolutions.groupby('user_id').size(),
+            'medianResolutionHours': resolutions.groupby('user_id')['hours'].median(),
+        }).reindex(staff.index)
+        per_officer = per_officer[per_officer['updates'].notna()].fillna({'resolved': 0})
+        return {
+            str(user_id): {
+                'name': staff.at[user_id, 'name'],
+                'role': str(staff.at[user_id, 'role']),
+                'department': None if pd.isna(staff.at[user_id, 'department']) else str(staff.at[user_id, 'department']),
+                'updates': int(row['updates']),
+                'complaints': int(row['complaints']),
+                'resolved': int(row['resolved']),
+                'medianResolutionHours': None if pd.isna(row['medianResolutionHours'])
+                else round(float(row['medianResolutionHours']), 2),
+            }
+            for user_id, row in per_officer.sort_values('updates', ascending=False).iterrows()
+        }
+
+
+_engine: Optional[SnapshotEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> Optional[SnapshotEngine]:
+    """Engine over the current snapshot (reloaded when a newer one is exported), or None"""
+    global _engine
+    from django.conf import settings
+
+    root = Path(settings.ANALYTICS_SNAPSHOT_DIR)
+    generation = current_generation(root)
+    if generation is None:
+        return None
+    with _engine_lock:
+        if _engine is None or _engine.generation != generation or _engine.path.parent != root / 'generations':
+            _engine = SnapshotEngine(root / 'generations' / generation)
+        return _engine
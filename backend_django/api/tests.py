@@ -1,6 +1,7 @@
 # Tests for Django API
 
-from django.test import TestCase, Client
+from django.core.cache import cache
+from django.test import TestCase as DjangoTestCase, TransactionTestCase, Client
 from django.urls import reverse
 from rest_framework import status
 from .models import User, Complaint
@@ -8,6 +9,15 @@ import json
 import bcrypt
 
 
+class TestCase(DjangoTestCase):
+    """TestCase that starts every class with an empty cache, so DRF throttle counters don't add up across the suite"""
+    
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cache.clear()
+
+
 class AuthenticationTestCase(TestCase):
     """Test user authentication endpoints"""
     
@@ -141,3 +151,2052 @@ class NLPClassifierTestCase(TestCase):
         for dept_detail in result['departmentDetails']:
             self.assertGreaterEqual(dept_detail['confidence'], 0)
             self.assertLessEqual(dept_detail['confidence'], 1)
+
+    def test_keyword_matcher_matches_substring_counts(self):
+        """Single-pass matcher reports the same counts as per-keyword substring scans"""
+        from .nlp_classifier import classifier
+
+        text = 'Street light broken, street lights and the electricity meter near the bus station need urgent repair'
+        text_lower = text.lower()
+        hits = classifier.match_keywords(text)
+
+        for dept, keywords in classifier.departments.items():
+            expected = sum(text_lower.count(keyword) for keyword in keywords)
+            self.assertEqual(hits.department_scores[dept], expected, dept)
+
+        # Overlapping keywords are all reported
+        self.assertIn('street light', hits.keywords)
+        self.assertIn('street', hits.keywords)
+        self.assertIn('light', hits.keywords)
+        self.assertEqual(hits.high_count, 1)
+
+    def test_extract_keywords_is_deterministic(self):
+        """Extracted keywords follow department keyword order and are capped at 10"""
+        from .nlp_classifier import classifier
+
+        text = 'road pothole bridge highway street pavement construction building repair crack footpath water'
+        keywords = classifier.extract_keywords(text)
+        self.assertEqual(len(keywords), 10)
+        self.assertEqual(keywords[:3], ['road', 'pothole', 'bridge'])
+        self.assertEqual(keywords, classifier.extract_keywords(text))
+
+    def test_analysis_context_runs_sentiment_once(self):
+        """Each classification derives sentiment and features only once"""
+        from unittest import mock
+        import textblob
+        from .nlp_classifier import classifier
+        
+        instance = classifier.get()
+        with mock.patch.object(textblob, 'TextBlob', wraps=textblob.TextBlob) as blob, \
+                mock.patch.object(instance, 'featurize', wraps=instance.featurize) as featurize:
+            instance.classify_multi_department('Huge pothole on the road, urgent attention needed')
+        
+        self.assertEqual(blob.call_count, 1)
+        self.assertEqual(featurize.call_count, 1)
+    
+    def test_stages_accept_shared_context(self):
+        """Stages give the same answers for raw text and a shared context"""
+        from .nlp_classifier import classifier
+        
+        text = 'Dangerous electric wire hanging near the school, serious accident risk'
+        context = classifier.analyze(text)
+        
+        self.assertIs(classifier.analyze(context), context)
+        self.assertEqual(classifier.determine_urgency(context), classifier.determine_urgency(text))
+        self.assertEqual(classifier.analyze_sentiment(context), classifier.analyze_sentiment(text))
+        self.assertEqual(classifier.extract_keywords(context), classifier.extract_keywords(text))
+        self.assertEqual(context.preprocessed, classifier.preprocess_text(text))
+
+
+class ClassifierLoadingTestCase(TestCase):
+    """Test lazy classifier loading and the readiness probe"""
+    
+    def test_classifier_is_built_on_first_use(self):
+        """LazyClassifier builds the classifier once, on first attribute access"""
+        from .nlp_classifier import LazyClassifier
+        
+        built = []
+        
+        class FakeClassifier:
+            def __init__(self):
+                built.append(self)
+            
+            def classify(self, text):
+                return {'text': text}
+        
+        lazy = LazyClassifier(factory=FakeClassifier)
+        self.assertEqual(lazy.readiness()['state'], 'cold')
+        self.assertEqual(built, [])
+        
+        self.assertEqual(lazy.classify('hello'), {'text': 'hello'})
+        lazy.classify('again')
+        self.assertEqual(len(built), 1)
+        self.assertTrue(lazy.readiness()['ready'])
+        self.assertIsNotNone(lazy.readiness()['loadTimeMs'])
+    
+    def test_background_warm_up_and_failure_state(self):
+        """warm_up loads in a thread and load failures are reported, not raised"""
+        from .nlp_classifier import LazyClassifier
+        
+        lazy = LazyClassifier(factory=dict)
+        lazy.warm_up(background=True)
+        lazy._warmup_thread.join(timeout=5)
+        self.assertTrue(lazy.is_ready)
+        
+        def broken():
+            raise RuntimeError('model missing')
+        
+        failing = LazyClassifier(factory=broken)
+        failing.warm_up(background=True)
+        failing._warmup_thread.join(timeout=5)
+        self.assertEqual(failing.readiness()['state'], 'failed')
+        self.assertEqual(failing.readiness()['error'], 'model missing')
+    
+    def test_readiness_endpoint(self):
+        """Readiness probe returns 503 while cold and 200 once loaded"""
+        from unittest import mock
+        from . import nlp_service
+        from .nlp_classifier import LazyClassifier
+        
+        lazy = LazyClassifier(factory=dict)
+        with mock.patch.object(nlp_service, 'classifier', lazy), \
+                mock.patch.object(lazy, 'warm_up') as warm_up:
+            response = self.client.get('/api/health/ready')
+            self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+            self.assertEqual(response.json()['nlp']['state'], 'cold')
+            warm_up.assert_called_once_with(background=True)
+            
+            lazy.get()
+            response = self.client.get('/api/health/ready')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertTrue(self.client.get('/api/health').json()['nlp']['ready'])
+
+class ModelStoreTestCase(TestCase):
+    """Test the versioned model artifact store"""
+    
+    def setUp(self):
+        import tempfile
+        from .model_store import ModelStore
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.store = ModelStore(self.tmp.name)
+    
+    def test_save_promote_and_memory_mapped_load(self):
+        """Saved versions carry a manifest and load memory-mapped once promoted"""
+        import numpy as np
+        from .nlp_classifier import ComplaintClassifier
+        
+        classifier = ComplaintClassifier(store=self.store)
+        version = self.store.current_version()
+        self.assertEqual(classifier.model_version, version)
+        
+        manifest = self.store.manifest(version)
+        for key in ('training_data_hash', 'sklearn_version', 'vocab_size', 'created_at'):
+            self.assertIn(key, manifest)
+        self.assertEqual(manifest['training_examples'], 300)
+        
+        model, loaded_manifest = self.store.load()
+        self.assertEqual(loaded_manifest['version'], version)
+        self.assertIsInstance(model[-1].feature_log_prob_, np.memmap)
+    
+    def test_unknown_version_cannot_be_promoted(self):
+        """Promoting a version that does not exist fails and keeps CURRENT"""
+        from .model_store import ModelStoreError
+        
+        with self.assertRaises(ModelStoreError):
+            self.store.promote('does-not-exist')
+        self.assertIsNone(self.store.current_version())
+    
+    def test_workers_hot_swap_promoted_version(self):
+        """A running classifier switches to a newly promoted version"""
+        from .nlp_classifier import ComplaintClassifier
+        
+        classifier = ComplaintClassifier(store=self.store)
+        old_version = classifier.model_version
+        
+        model, texts, labels = classifier.train_model()
+        new_version = self.store.save(model, texts, labels)
+        self.assertNotEqual(new_version, old_version)
+        self.assertFalse(classifier.refresh_model(force=True))
+        
+        self.store.promote(new_version)
+        with self.settings(NLP_MODEL_CHECK_INTERVAL=0):
+            classifier.classify('Power outage in the area')
+        self.assertEqual(classifier.model_version, new_version)
+
+class ClassificationCacheTestCase(TestCase):
+    """Test the classification result cache"""
+    
+    def test_lru_eviction_and_ttl(self):
+        """Least recently used entries are evicted and stale entries expire"""
+        from .classification_cache import ClassificationCache
+        
+        now = [0.0]
+        cache = ClassificationCache(max_entries=2, ttl=10, clock=lambda: now[0])
+        cache.get_or_compute('a', lambda: 1)
+        cache.get_or_compute('b', lambda: 2)
+        cache.get_or_compute('a', lambda: 'unused')      # hit, 'a' becomes most recent
+        cache.get_or_compute('c', lambda: 3)             # evicts 'b'
+        self.assertEqual(cache.get_or_compute('b', lambda: 'recomputed'), 'recomputed')
+        
+        now[0] = 11
+        self.assertEqual(cache.get_or_compute('c', lambda: 'fresh'), 'fresh')
+        
+        stats = cache.stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 5)
+        self.assertEqual(stats['evictions'], 2)
+        self.assertEqual(stats['expirations'], 1)
+    
+    def test_single_flight(self):
+        """Concurrent misses for one key compute once"""
+        import threading
+        import time
+        from .classification_cache import ClassificationCache
+        
+        cache = ClassificationCache()
+        calls = []
+        release = threading.Event()
+        
+        def compute():
+            calls.append(1)
+            release.wait(timeout=5)
+            return {'department': 'Water Supply & Sanitation'}
+        
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get_or_compute('key', compute)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        deadline = time.monotonic() + 5
+        while cache.stats()['coalesced'] < 4 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(results), 5)
+        self.assertEqual(cache.stats()['coalesced'], 4)
+    
+    def test_classifier_uses_cache(self):
+        """Repeated texts are served from the cache as independent copies"""
+        import tempfile
+        from .classification_cache import ClassificationCache
+        from .model_store import ModelStore
+        from .nlp_classifier import ComplaintClassifier
+        
+        with tempfile.TemporaryDirectory() as root:
+            classifier = ComplaintClassifier(store=ModelStore(root), cache=ClassificationCache())
+            first = classifier.classify_multi_department('Water leak from pipe on Main Street')
+            first['suggestedSteps'].append('mutated by caller')
+            second = classifier.classify_multi_department('  WATER LEAK from pipe on Main Street ')
+            other_threshold = classifier.classify_multi_department('Water leak from pipe on Main Street', 0.9)
+        
+        self.assertNotIn('mutated by caller', second['suggestedSteps'])
+        self.assertEqual(second['predictedDepartment'], 'Water Supply & Sanitation')
+        self.assertEqual(classifier.cache.stats()['hits'], 1)
+        self.assertEqual(classifier.cache.stats()['misses'], 2)
+        self.assertEqual(other_threshold['predictedDepartment'], 'Water Supply & Sanitation')
+
+class ProcessPoolExecutionTestCase(TestCase):
+    """Test running classification in the NLP process pool"""
+    
+    def setUp(self):
+        from .auth import generate_token
+        self.user = User.objects.create(
+            email='pool@example.com', password_hash='x', name='Pool Citizen', role='CITIZEN'
+        )
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {generate_token(self.user)}'}
+    
+    def test_process_mode_matches_inline(self):
+        """Pool workers return the same result as inline classification"""
+        from . import nlp_service
+        from .nlp_classifier import classifier
+        
+        text = 'Sewage overflow near the school, children falling sick'
+        with self.settings(NLP_EXECUTION_MODE='process', NLP_POOL_WORKERS=1, NLP_CLASSIFY_TIMEOUT=60):
+            self.addCleanup(nlp_service.shutdown_executor)
+            result = nlp_service.classify_complaint(text)
+            self.assertTrue(nlp_service.readiness()['ready'])
+        
+        self.assertEqual(result, classifier.classify_multi_department(text))
+    
+    def test_submit_times_out_without_opening_transaction(self):
+        """A slow pool answers 503 and nothing is written"""
+        from concurrent.futures import Future
+        from unittest import mock
+        from . import nlp_service
+        
+        never_done = mock.Mock()
+        never_done.submit.return_value = Future()
+        with self.settings(NLP_EXECUTION_MODE='process', NLP_CLASSIFY_TIMEOUT=0.01), \
+                mock.patch.object(nlp_service, 'get_executor', return_value=never_done), \
+                mock.patch('api.views.transaction.atomic') as atomic:
+            response = self.client.post(
+                '/api/complaints/submit',
+                data=json.dumps({
+                    'title': 'Water leak', 'description': 'Water leaking from pipe for days',
+                    'location': 'Main Street'
+                }),
+                content_type='application/json', **self.auth
+            )
+        
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response.json()['code'], 'NLP_TIMEOUT')
+        atomic.assert_not_called()
+        self.assertFalse(Complaint.objects.exists())
+    
+    def test_batch_endpoint_uses_pool_in_process_mode(self):
+        """Process mode sends batches to the pool, never classifying in the web worker, and times out with 503"""
+        from concurrent.futures import Future
+        from unittest import mock
+        from . import nlp_service
+        from .nlp_classifier import classifier
+        
+        done = Future()
+        done.set_result([{'predictedDepartment': 'Electricity & Power'}])
+        pool = mock.Mock()
+        pool.submit.return_value = done
+        texts = ['Power outage in the area']
+        with self.settings(NLP_EXECUTION_MODE='process', NLP_CLASSIFY_TIMEOUT=0.01), \
+                mock.patch.object(nlp_service, 'get_executor', return_value=pool), \
+                mock.patch.object(classifier.get(), 'classify_batch', side_effect=AssertionError('ran in-process')):
+            response = self.client.post('/api/nlp/classify/batch', data=json.dumps({'texts': texts}),
+                                        content_type='application/json', **self.auth)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.json(), done.result())
+            pool.submit.assert_called_once_with(nlp_service._classify_batch_in_worker, texts, 0.6)
+            
+            pool.submit.return_value = Future()
+            response = self.client.post('/api/nlp/classify/batch', data=json.dumps({'texts': texts}),
+                                        content_type='application/json', **self.auth)
+            self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+    
+    def test_pool_workers_do_not_start_pools(self):
+        """With warm-up on start, Django setup in a pool worker must not start another pool"""
+        import os
+        from unittest import mock
+        from . import nlp_service
+        
+        # Spawned workers read their settings from the environment
+        environment = {'NLP_EXECUTION_MODE': 'process', 'NLP_WARMUP_ON_START': 'True', 'NLP_POOL_WORKERS': '1'}
+        with mock.patch.dict(os.environ, environment), \
+                self.settings(NLP_EXECUTION_MODE='process', NLP_POOL_WORKERS=1, NLP_CLASSIFY_TIMEOUT=60):
+            self.addCleanup(nlp_service.shutdown_executor)
+            state = nlp_service._run_in_pool(nlp_service._worker_state)
+        
+        self.assertNotEqual(state['pid'], os.getpid())
+        self.assertTrue(state['inWorker'])
+        self.assertFalse(state['hasPool'])
+        self.assertFalse(nlp_service.in_worker())
+
+
+class BatchClassificationTestCase(TestCase):
+    """Test batch classification"""
+    
+    def setUp(self):
+        from .auth import generate_token
+        self.client = Client()
+        self.user = User.objects.create(
+            email='citizen@example.com', password_hash='x', name='Citizen', role='CITIZEN'
+        )
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {generate_token(self.user)}'}
+    
+    def test_batch_matches_single_classification(self):
+        """classify_batch returns the same results as per-text classification"""
+        from .nlp_classifier import classifier
+        
+        texts = [
+            'The road has deep potholes causing accidents and water is leaking from pipes',
+            'Power outage in the area',
+            'Nothing relevant here at all',
+        ]
+        self.assertEqual(
+            classifier.classify_batch(texts),
+            [classifier.classify_multi_department(text) for text in texts]
+        )
+        self.assertEqual(classifier.classify_batch([]), [])
+    
+    def test_batch_endpoint(self):
+        """Batch endpoint classifies every text in order"""
+        response = self.client.post(
+            '/api/nlp/classify/batch',
+            data=json.dumps({'texts': ['Power outage in the area', 'Garbage not collected']}),
+            content_type='application/json', **self.auth
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()), 2)
+        self.assertEqual(response.json()[0]['predictedDepartment'], 'Electricity & Power')
+    
+    def test_batch_endpoint_enforces_max_size(self):
+        """Batches larger than NLP_BATCH_MAX_SIZE are rejected"""
+        with self.settings(NLP_BATCH_MAX_SIZE=2):
+            response = self.client.post(
+                '/api/nlp/classify/batch',
+                data=json.dumps({'texts': ['one text', 'two text', 'three text']}),
+                content_type='application/json', **self.auth
+            )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ComplaintSubmissionTestCase(TestCase):
+    """Test complaint submission in inline and async classification modes"""
+    
+    payload = {
+        'title': 'Burst water pipe',
+        'description': 'Water pipe burst on Main Street, road flooded and water supply stopped',
+        'location': 'Main Street'
+    }
+    
+    def setUp(self):
+        from .auth import generate_token
+        self.user = User.objects.create(
+            email='submitter@example.com', password_hash='x', name='Submitter', role='CITIZEN'
+        )
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {generate_token(self.user)}'}
+    
+    def submit(self, payload=None):
+        return self.client.post(
+            '/api/complaints/submit', data=json.dumps(payload or self.payload),
+            content_type='application/json', **self.auth
+        )
+    
+    def test_inline_submission_routes_immediately(self):
+        """Inline mode classifies, routes and notifies within the request"""
+        from .models import ComplaintHistory, Notification
+        
+        response = self.submit()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        data = response.json()['data']
+        self.assertEqual(data['classificationStatus'], 'classified')
+        self.assertEqual(data['department'], 'Water Supply & Sanitation')
+        
+        complaint = Complaint.objects.get(id=data['id'])
+        self.assertEqual(complaint.priority, data['priority'])
+        self.assertEqual(ComplaintHistory.objects.filter(complaint=complaint).count(), 1)
+        self.assertEqual(Notification.objects.filter(complaint=complaint).count(), 1)
+    
+    def test_async_submission_is_routed_by_worker(self):
+        """Async mode accepts immediately and classify_worker routes later"""
+        from django.core.management import call_command
+        from io import StringIO
+        from .models import ClassificationJob, ComplaintHistory, Notification
+        
+        with self.settings(NLP_EXECUTION_MODE='async'):
+            response = self.submit()
+        
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        data = response.json()['data']
+        self.assertEqual(data['classificationStatus'], 'pending')
+        self.assertIsNone(data['department'])
+        complaint = Complaint.objects.get(id=data['id'])
+        self.assertFalse(ComplaintHistory.objects.filter(complaint=complaint).exists())
+        self.assertFalse(Notification.objects.filter(complaint=complaint).exists())
+        
+        call_command('classify_worker', '--once', stdout=StringIO())
+        
+        complaint.refresh_from_db()
+        self.assertEqual(complaint.classification_status, 'classified')
+        self.assertEqual(complaint.department, 'Water Supply & Sanitation')
+        self.assertEqual(complaint.nlp_analysis['predictedDepartment'], complaint.department)
+        self.assertIsNotNone(complaint.priority)
+        self.assertEqual(ComplaintHistory.objects.filter(complaint=complaint).count(), 1)
+        self.assertEqual(Notification.objects.filter(complaint=complaint).count(), 1)
+        self.assertEqual(ClassificationJob.objects.get(complaint=complaint).status, 'done')
+    
+    def test_claims_are_exclusive_and_expired_leases_reclaimed(self):
+        """Two workers never claim the same job; stuck jobs become claimable"""
+        import datetime
+        from django.utils import timezone
+        from .job_queue import claim_jobs
+        from .models import ClassificationJob
+        
+        with self.settings(NLP_EXECUTION_MODE='async'):
+            for _ in range(3):
+                self.submit()
+        
+        first = claim_jobs(2, lease_seconds=300)
+        second = claim_jobs(2, lease_seconds=300)
+        self.assertEqual(len(first), 2)
+        self.assertEqual(len(second), 1)
+        self.assertEqual(claim_jobs(2, lease_seconds=300), [])
+        
+        ClassificationJob.objects.filter(id=first[0].id).update(
+            started_at=timezone.now() - datetime.timedelta(seconds=600)
+        )
+        reclaimed = claim_jobs(2, lease_seconds=300)
+        self.assertEqual([job.id for job in reclaimed], [first[0].id])
+        self.assertEqual(reclaimed[0].attempts, 2)
+    
+    def test_failed_jobs_are_retried_then_marked_failed(self):
+        """Classification errors requeue the job until attempts run out"""
+        from unittest import mock
+        from .job_queue import claim_jobs, run_jobs
+        from .models import ClassificationJob
+        from .nlp_classifier import classifier
+        
+        with self.settings(NLP_EXECUTION_MODE='async'):
+            complaint_id = self.submit().json()['data']['id']
+        
+        with mock.patch.object(classifier.get(), 'classify_batch', side_effect=RuntimeError('boom')):
+            self.assertEqual(run_jobs(claim_jobs(10, 300), max_attempts=2), (0, 1))
+            job = ClassificationJob.objects.get(complaint_id=complaint_id)
+            self.assertEqual((job.status, job.last_error), ('pending', 'boom'))
+            
+            run_jobs(claim_jobs(10, 300), max_attempts=2)
+        
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertEqual(Complaint.objects.get(id=complaint_id).classification_status, 'failed')
+    
+    def test_status_changed_while_classifying_is_kept(self):
+        """The worker writes only routing fields, so an officer's concurrent status change survives"""
+        from .job_queue import claim_jobs, run_jobs
+        from .models import AnalyticsSummary
+        
+        with self.settings(NLP_EXECUTION_MODE='async'):
+            complaint_id = self.submit().json()['data']['id']
+        jobs = claim_jobs(10, 300)
+        Complaint.objects.filter(id=complaint_id).update(status='In Progress')
+        
+        self.assertEqual(run_jobs(jobs, max_attempts=3), (1, 0))
+        complaint = Complaint.objects.get(id=complaint_id)
+        self.assertEqual((complaint.status, complaint.classification_status), ('In Progress', 'classified'))
+        self.assertEqual(list(complaint.routes.values_list('status', flat=True)), ['In Progress'])
+    
+    def test_reclaimed_lease_is_routed_once(self):
+        """A worker whose lease expired and was reclaimed leaves the job to the new worker"""
+        import datetime
+        from django.utils import timezone
+        from .job_queue import claim_jobs, run_jobs
+        from .models import ClassificationJob, ComplaintHistory, Notification
+        
+        with self.settings(NLP_EXECUTION_MODE='async'):
+            complaint_id = self.submit().json()['data']['id']
+        stale = claim_jobs(10, 300)
+        ClassificationJob.objects.update(started_at=timezone.now() - datetime.timedelta(seconds=600))
+        current = claim_jobs(10, 300)
+        
+        self.assertEqual(run_jobs(current, max_attempts=3), (1, 0))
+        self.assertEqual(run_jobs(stale, max_attempts=3), (0, 0))
+        self.assertEqual(ComplaintHistory.objects.filter(complaint_id=complaint_id).count(), 1)
+        self.assertEqual(Notification.objects.filter(complaint_id=complaint_id).count(), 1)
+        self.assertEqual(ClassificationJob.objects.get().claimed_by, current[0].claimed_by)
+
+
+class RoutingFeedbackTestCase(TestCase):
+    """Test department corrections and incremental learning from them"""
+    
+    text = 'Water pipe burst on Main Street, road flooded and water supply stopped'
+    
+    def setUp(self):
+        import tempfile
+        from .auth import generate_token
+        from .model_store import ModelStore
+        from .models import Department
+        
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.store = ModelStore(self.tmp.name)
+        
+        for name in ('Water Supply & Sanitation', 'Public Works & Infrastructure'):
+            Department.objects.create(name=name)
+        citizen = User.objects.create(email='citizen@example.com', password_hash='x', name='Citizen', role='CITIZEN')
+        self.officer = User.objects.create(
+            email='officer@example.com', password_hash='x', name='Officer',
+            role='OFFICER', department='Water Supply & Sanitation'
+        )
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {generate_token(self.officer)}'}
+        self.complaint = Complaint.objects.create(
+            id='GRV-2025-000001', user=citizen, title='Burst pipe', description=self.text,
+            location='Main Street', department='Water Supply & Sanitation',
+            primary_department='Water Supply & Sanitation',
+            departments=['Water Supply & Sanitation', 'Public Works & Infrastructure']
+        )
+    
+    def reroute(self, department, **extra):
+        return self.client.put(
+            f'/api/complaints/{self.complaint.id}/department',
+            data=json.dumps({'department': department}), content_type='application/json',
+            **(extra or self.auth)
+        )
+    
+    def test_reroute_records_feedback(self):
+        """Correcting the department updates routing and stores a labeled example"""
+        from .models import ComplaintHistory, RoutingFeedback
+        
+        response = self.reroute('Public Works & Infrastructure')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        self.complaint.refresh_from_db()
+        self.assertEqual(self.complaint.primary_department, 'Public Works & Infrastructure')
+        self.assertEqual(self.complaint.departments, ['Public Works & Infrastructure'])
+        self.assertTrue(ComplaintHistory.objects.filter(complaint=self.complaint, action='Department Updated').exists())
+        
+        feedback = RoutingFeedback.objects.get(complaint=self.complaint)
+        self.assertEqual(feedback.previous_department, 'Water Supply & Sanitation')
+        self.assertEqual(feedback.corrected_department, 'Public Works & Infrastructure')
+        self.assertEqual(feedback.text, self.text)
+        self.assertIsNone(feedback.consumed_at)
+    
+    def test_reroute_validation(self):
+        """Unknown departments and citizens are rejected; no-op corrections are not recorded"""
+        from .auth import generate_token
+        from .models import RoutingFeedback
+        
+        self.assertEqual(self.reroute('Space Agency').status_code, status.HTTP_400_BAD_REQUEST)
+        citizen_auth = {'HTTP_AUTHORIZATION': f'Bearer {generate_token(self.complaint.user)}'}
+        self.assertEqual(
+            self.reroute('Public Works & Infrastructure', **citizen_auth).status_code, status.HTTP_403_FORBIDDEN
+        )
+        self.assertEqual(self.reroute('Water Supply & Sanitation').status_code, status.HTTP_200_OK)
+        self.assertFalse(RoutingFeedback.objects.exists())
+    
+    def test_reroute_keeps_concurrent_status_change(self):
+        """Re-routing writes only the routing columns, so a status change made meanwhile is kept"""
+        from .routing import reroute_complaint
+        
+        stale = Complaint.objects.get(id=self.complaint.id)
+        Complaint.objects.filter(id=self.complaint.id).update(status='In Progress')
+        reroute_complaint(stale, 'Public Works & Infrastructure', self.officer)
+        
+        self.complaint.refresh_from_db()
+        self.assertEqual(self.complaint.status, 'In Progress')
+        self.assertEqual(self.complaint.primary_department, 'Public Works & Infrastructure')
+    
+    def test_partial_fit_publishes_new_version(self):
+        """Feedback is folded in incrementally and published as a promoted version"""
+        from .models import RoutingFeedback
+        from .nlp_classifier import ComplaintClassifier
+        from .online_learning import learn_from_feedback, is_online_model
+        
+        classifier = ComplaintClassifier(store=self.store)
+        tfidf_version = classifier.model_version
+        self.reroute('Public Works & Infrastructure')
+        
+        summary = learn_from_feedback(classifier, weight=20)
+        self.assertEqual((summary['trained'], summary['skipped']), (1, 0))
+        self.assertEqual(summary['parentVersion'], tfidf_version)
+        self.assertEqual(self.store.current_version(), summary['version'])
+        
+        manifest = self.store.manifest(summary['version'])
+        self.assertEqual(manifest['featurizer'], 'hashing')
+        self.assertEqual(manifest['training_examples'], 301)
+        
+        feedback = RoutingFeedback.objects.get()
+        self.assertIsNotNone(feedback.consumed_at)
+        self.assertEqual(feedback.model_version, summary['version'])
+        
+        classifier.refresh_model(force=True)
+        self.assertTrue(is_online_model(classifier.model))
+        self.assertEqual(
+            classifier.model.predict([classifier.preprocess_text(self.text)])[0], 'Public Works & Infrastructure'
+        )
+        
+        # Consumed feedback is not trained on twice
+        self.assertIsNone(learn_from_feedback(classifier)['version'])
+
+
+class ReclassifyComplaintsTestCase(TestCase):
+    """Test streaming bulk reclassification of existing complaints"""
+    
+    texts = [
+        'Water pipe burst on Main Street, road flooded and water supply stopped',
+        'Power outage in the whole block since last night, transformer sparking',
+        'Huge pothole on the highway causing accidents',
+        'Garbage not collected for two weeks, drainage blocked',
+        'Bus service cancelled without notice, traffic signal broken',
+    ]
+    
+    def setUp(self):
+        import tempfile
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.checkpoint = f'{self.tmp.name}/checkpoint.json'
+        
+        user = User.objects.create(email='citizen@example.com', password_hash='x', name='Citizen', role='CITIZEN')
+        for number, text in enumerate(self.texts, start=1):
+            Complaint.objects.create(
+                id=f'GRV-2025-{number:06d}', user=user, title='Complaint', description=text,
+                location='Main Street', department='Others', primary_department='Others',
+                departments=['Others'], priority='Low'
+            )
+    
+    def run_command(self, *args):
+        from django.core.management import call_command
+        from io import StringIO
+        out = StringIO()
+        call_command('reclassify_complaints', '--chunk-size', '2', '--checkpoint', self.checkpoint, *args, stdout=out)
+        return out.getvalue()
+    
+    def test_dry_run_reports_without_writing(self):
+        """A dry run lists routing changes and leaves complaints untouched"""
+        output = self.run_command('--dry-run')
+        self.assertIn('GRV-2025-000001  primary_department: Others -> Water Supply & Sanitation', output)
+        self.assertIn('5 of 5 complaint(s) would be re-routed', output)
+        self.assertEqual(Complaint.objects.filter(primary_department='Others').count(), 5)
+    
+    def test_bulk_update_matches_single_classification(self):
+        """Every complaint ends up routed as if submitted with the current model"""
+        import os
+        from .nlp_classifier import classifier
+        
+        self.run_command()
+        for complaint in Complaint.objects.all():
+            result = classifier.classify_multi_department(complaint.description)
+            self.assertEqual(complaint.primary_department, result['predictedDepartment'])
+            self.assertEqual(complaint.departments, result['departments'])
+            self.assertEqual(complaint.priority, result['urgency'])
+            self.assertEqual(complaint.nlp_analysis, result)
+        self.assertFalse(os.path.exists(self.checkpoint))
+    
+    def test_resume_continues_after_checkpoint(self):
+        """An interrupted run resumes after the last written chunk"""
+        from django.core.management.base import CommandError
+        from .reclassify import Checkpoint
+        
+        filters = {'statuses': [], 'since': None, 'until': None, 'department': None, 'threshold': 0.5}
+        checkpoint = Checkpoint(self.checkpoint, filters)
+        checkpoint.last_id, checkpoint.processed = 'GRV-2025-000002', 2
+        checkpoint.save()
+        
+        output = self.run_command('--resume')
+        self.assertIn('Resuming after GRV-2025-000002', output)
+        self.assertIn('Reclassified 5 complaint(s)', output)
+        self.assertEqual(
+            list(Complaint.objects.filter(primary_department='Others').order_by('id').values_list('id', flat=True)),
+            ['GRV-2025-000001', 'GRV-2025-000002']
+        )
+        
+        with self.assertRaises(CommandError):
+            self.run_command('--resume')
+    
+    def test_filters_and_parallel_workers(self):
+        """Filtered runs only touch matching complaints; worker processes agree with inline"""
+        from . import nlp_service
+        
+        Complaint.objects.filter(id='GRV-2025-000001').update(status='Resolved')
+        self.run_command('--status', 'Resolved')
+        self.assertEqual(Complaint.objects.exclude(primary_department='Others').count(), 1)
+        
+        chunks = [(index, [text]) for index, text in enumerate(self.texts)]
+        self.assertEqual(
+            list(nlp_service.classify_chunks(chunks, workers=2)),
+            list(nlp_service.classify_chunks(chunks, workers=1))
+        )
+    
+    def test_status_changed_while_classifying_is_kept(self):
+        """The analytics delta and route rows start from the row as stored when the chunk is written"""
+        from unittest import mock
+        from . import analytics, nlp_service
+        from .models import AnalyticsSummary, ComplaintDepartment
+        from .reclassify import complaints_to_reclassify, reclassify
+        
+        analytics.rebuild()
+        classify_chunks = nlp_service.classify_chunks
+        
+        def officer_resolves_while_classifying(chunks, *args):
+            for payload, results in classify_chunks(chunks, *args):
+                complaint = Complaint.objects.get(id='GRV-2025-000001')
+                if complaint.status != 'Resolved':
+                    before = analytics.snapshot(complaint)
+                    complaint.status = 'Resolved'
+                    complaint.save(update_fields=['status'])
+                    analytics.record_change(before, analytics.snapshot(complaint))
+                yield payload, results
+        
+        with mock.patch.object(nlp_service, 'classify_chunks', officer_resolves_while_classifying):
+            for _ in reclassify(complaints_to_reclassify(), chunk_size=2):
+                pass
+        
+        complaint = Complaint.objects.get(id='GRV-2025-000001')
+        self.assertEqual(complaint.status, 'Resolved')
+        self.assertNotEqual(complaint.primary_department, 'Others')
+        self.assertEqual(set(ComplaintDepartment.objects.filter(complaint=complaint).values_list('status', 'is_open')),
+                         {('Resolved', False)})
+        fields = ('scope', 'total', 'submitted', 'resolved')
+        incremental = sorted(AnalyticsSummary.objects.filter(total__gt=0).values_list(*fields))
+        analytics.rebuild()
+        self.assertEqual(sorted(AnalyticsSummary.objects.filter(total__gt=0).values_list(*fields)), incremental)
+
+
+class ClassifierBenchmarkTestCase(TestCase):
+    """Test the stage-level classifier benchmark"""
+    
+    def test_report_covers_every_stage(self):
+        """The JSON report has percentiles for each stage, batch throughput and peak RSS"""
+        from .benchmark import STAGES, compare, generate_corpus, run_benchmark
+        from .nlp_classifier import classifier
+        
+        instance = classifier.get()
+        corpus = generate_corpus(instance, size=5, words=25, seed=1)
+        self.assertEqual([len(text.split()) for text in corpus], [25] * 5)
+        self.assertEqual(corpus, generate_corpus(instance, size=5, words=25, seed=1))
+        
+        report = run_benchmark(instance, size=20, words=30, batch_size=10, warmup=2)
+        json.dumps(report)
+        self.assertEqual(list(report['stages']), list(STAGES))
+        for stats in report['stages'].values():
+            self.assertEqual(stats['calls'], 20)
+            self.assertLessEqual(stats['p50Ms'], stats['p95Ms'])
+            self.assertLessEqual(stats['p95Ms'], stats['p99Ms'])
+        self.assertEqual(report['batch']['calls'], 2)
+        self.assertGreater(report['peakRssKb'], 0)
+        self.assertEqual(compare(report, report)['classify'], {'p50Ms': 1.0, 'p95Ms': 1.0})
+
+
+class StageTimingTestCase(TestCase):
+    """Test per-stage timing hooks, sinks and debug breakdowns"""
+    
+    payload = {
+        'title': 'Power cut',
+        'description': 'Power outage in the whole block since last night, transformer sparking',
+        'location': 'Block C'
+    }
+    
+    def setUp(self):
+        from .auth import generate_token
+        from . import timing
+        self.addCleanup(timing.configure, [])
+        self.citizen = User.objects.create(email='citizen@example.com', password_hash='x', name='Citizen', role='CITIZEN')
+        self.admin = User.objects.create(email='admin@example.com', password_hash='x', name='Admin', role='ADMIN')
+        self.citizen_auth = {'HTTP_AUTHORIZATION': f'Bearer {generate_token(self.citizen)}'}
+        self.admin_auth = {'HTTP_AUTHORIZATION': f'Bearer {generate_token(self.admin)}'}
+    
+    def submit(self, **extra):
+        return self.client.post(
+            '/api/complaints/submit', data=json.dumps(self.payload),
+            content_type='application/json', **self.citizen_auth, **extra
+        )
+    
+    def test_disabled_hooks_are_no_ops(self):
+        """Without sinks or a trace, stage() hands back the shared no-op"""
+        from . import timing
+        
+        self.assertIs(timing.stage('a'), timing.stage('b'))
+        timing.configure(['log'])
+        self.assertIsNot(timing.stage('a'), timing.stage('a'))
+    
+    def test_histogram_sink_and_metrics_endpoint(self):
+        """Submission stages are aggregated and exposed to administrators"""
+        from . import timing
+        
+        timing.configure(['histogram'])
+        self.assertEqual(self.submit().status_code, status.HTTP_201_CREATED)
+        
+        self.assertEqual(
+            self.client.get('/api/metrics/timings', **self.citizen_auth).status_code, status.HTTP_403_FORBIDDEN
+        )
+        response = self.client.get('/api/metrics/timings', **self.admin_auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertTrue(data['enabled'])
+        for name in ('nlp.classify', 'submit.complaint_id', 'submit.insert_complaint',
+                     'submit.record_routing', 'submit.transaction'):
+            self.assertEqual(data['stages'][name]['count'], 1)
+            self.assertLessEqual(data['stages'][name]['p50Ms'], data['stages'][name]['p99Ms'])
+    
+    def test_debug_mode_returns_server_timing(self):
+        """X-Debug-Timing requests get their stage breakdown in Server-Timing"""
+        from .nlp_classifier import classifier
+        
+        self.assertNotIn('Server-Timing', self.submit(HTTP_X_DEBUG_TIMING='1'))
+        with self.settings(STAGE_TIMING_DEBUG=True):
+            self.assertNotIn('Server-Timing', self.submit())
+            # Time a real classification rather than a cache hit
+            classifier.get().cache.clear()
+            response = self.submit(HTTP_X_DEBUG_TIMING='1')
+        
+        stages = [entry.split(';')[0] for entry in response['Server-Timing'].split(', ')]
+        for name in ('nlp.tfidf', 'nlp.predict_proba', 'nlp.sentiment', 'nlp.classify',
+                     'submit.complaint_id', 'submit.transaction', 'total'):
+            self.assertIn(name, stages)
+
+
+class LexiconSentimentTestCase(TestCase):
+    """Test the built-in lexicon sentiment engine"""
+    
+    def test_modifiers_negation_and_exclamation(self):
+        """Scoring follows TextBlob's rules for modifiers, negations and '!'"""
+        from textblob import TextBlob
+        from .sentiment import polarity
+        
+        for text in ('very bad', 'not good', 'it is not safe', 'terrible smell!', 'really not good',
+                     'not very good', 'terribly slow!!', 'street light is broken and dangerous', 'pipe burst',
+                     'absolutely terrifying experience', 'unsafe and scary',
+                     'wonderful response, the repair is perfect', 'no water since monday :(', 'great service (!)'):
+            self.assertAlmostEqual(polarity(text), TextBlob(text).sentiment.polarity, places=9, msg=text)
+        self.assertAlmostEqual(polarity('very bad'), -0.91)
+        # Unlike TextBlob, contracted negations count
+        self.assertAlmostEqual(polarity("the road isn't safe"), polarity('the road is not safe'))
+        self.assertEqual(polarity('pipe burst'), 0.0)
+    
+    def test_lexicon_is_the_full_pattern_lexicon(self):
+        """Every word of TextBlob's lexicon scores like TextBlob, adverbs derived from adjectives included"""
+        from textblob.en import sentiment as pattern_sentiment
+        from .sentiment import polarity_lexicon
+        
+        pattern_sentiment.load()
+        table = polarity_lexicon()
+        self.assertEqual(set(table), set(pattern_sentiment))
+        for word, (word_polarity, intensity, is_modifier) in table.items():
+            expected_polarity, _, expected_intensity = pattern_sentiment[word][None]
+            self.assertEqual((word_polarity, intensity), (expected_polarity, expected_intensity), word)
+            self.assertEqual(is_modifier, 'RB' in pattern_sentiment[word], word)
+    
+    def test_engine_setting_skips_textblob(self):
+        """With the lexicon engine, single and batch classification never call TextBlob"""
+        from unittest import mock
+        from .nlp_classifier import classifier
+        
+        instance = classifier.get()
+        texts = ['Very dangerous electric wire hanging near the school', 'Garbage not collected, terrible smell!']
+        expected = [instance._classify_multi_department(text, 0.5) for text in texts]
+        
+        with mock.patch.object(instance, 'sentiment_engine', 'lexicon'), \
+                mock.patch('textblob.TextBlob', side_effect=AssertionError('TextBlob called')):
+            single = [instance._classify_multi_department(text, 0.5) for text in texts]
+            batch = instance.classify_batch(texts)
+        
+        self.assertEqual(single, batch)
+        self.assertEqual(single, expected)
+    
+    def test_parity_report_on_held_out_complaints(self):
+        """The lexicon engine agrees with TextBlob on complaints written apart from the training templates"""
+        from .nlp_classifier import classifier
+        from .sentiment import parity_report
+        
+        texts = [
+            'The bus driver was extremely rude and refused to stop at the marked stop near the hospital.',
+            'Absolutely terrifying experience: a live wire fell on the pavement outside our gate last night!',
+            'Sewage overflowing into the lane for a week, the smell is unbearable and kids are falling sick.',
+            'Thank you for the quick repair, the new pump works perfectly.',
+            'Nobody answers the helpline. Honestly this is the worst service I have ever seen!!',
+            'The park is not very clean, and the lights are not working after 7 pm.',
+            'Stray dogs near the market are aggressive and unsafe and scary for elderly residents.',
+            'Water supply is irregular and the water that does come is muddy and undrinkable.',
+            'The tax office clerk asked for extra money to process my file, which is clearly illegal.',
+            'Huge pothole on the main road, two scooters skidded this morning; it is dangerously deep.',
+            'Wonderful response from the ward team, the drain was cleared and everything looks perfect now.',
+            'Garbage truck has not come since Monday :( bins are overflowing onto the street.',
+            'The school canteen food was stale and several students complained of stomach pain.',
+            'Really not happy that the streetlight complaint was closed without any work done.',
+            'The new bridge railing is loose and could easily give way under a little pressure.',
+        ]
+        report = parity_report(classifier.get(), texts)
+        self.assertEqual(report['examples'], len(texts))
+        self.assertEqual(report['sentimentAgreement'], 1.0)
+        self.assertEqual(report['urgencyAgreement'], 1.0)
+        self.assertLess(report['polarityMaxAbsError'], 1e-9)
+        self.assertEqual(report['disagreements'], [])
+
+
+class DuplicateDetectionTestCase(TestCase):
+    """Test near-duplicate detection with the MinHash/LSH index"""
+    
+    def setUp(self):
+        from .auth import generate_token
+        self.user = User.objects.create(email='citizen@example.com', password_hash='x', name='Citizen', role='CITIZEN')
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {generate_token(self.user)}'}
+    
+    def submit(self, description, location):
+        response = self.client.post(
+            '/api/complaints/submit',
+            data=json.dumps({'title': 'Complaint', 'description': description, 'location': location}),
+            content_type='application/json', **self.auth
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.json()['data']
+    
+    def test_signature_similarity(self):
+        """Reworded reports from the same place are similar; other places and topics are not"""
+        from .duplicates import location_similarity, minhash, similarity
+        
+        burst = minhash('Water main burst on MG Road, street flooded', 'MG Road')
+        reworded = minhash('water main has burst on MG road - whole street is flooded!', 'M.G. Road')
+        elsewhere = minhash('Water main burst on Park Street, road flooded', 'Park Street')
+        unrelated = minhash('Power outage in the whole block since last night', 'Block C')
+        
+        self.assertEqual(similarity(burst, burst), 1.0)
+        self.assertGreaterEqual(similarity(burst, reworded), 0.5)
+        self.assertEqual(location_similarity(burst, reworded), 1.0)
+        self.assertEqual(location_similarity(burst, elsewhere), 0.0)
+        self.assertLess(similarity(burst, unrelated), 0.1)
+    
+    def test_submissions_are_linked_to_open_cluster(self):
+        """Near-identical submissions link to the first open complaint of their cluster"""
+        first = self.submit('Water main burst on MG Road, street flooded', 'MG Road')
+        self.assertIsNone(first['duplicateOf'])
+        self.assertEqual(first['linkedDuplicates'], [])
+        
+        second = self.submit('Water main burst on MG Road, whole street flooded', 'MG Road')
+        self.assertEqual(second['duplicateOf'], first['id'])
+        self.assertEqual([match['id'] for match in second['linkedDuplicates']], [first['id']])
+        
+        third = self.submit('water main burst on MG road and the street is flooded', 'M.G. Road')
+        self.assertEqual(third['duplicateOf'], first['id'])
+        self.assertEqual({match['id'] for match in third['linkedDuplicates']}, {first['id'], second['id']})
+        
+        other = self.submit('Water main burst on MG Road, street flooded', 'Park Street')
+        self.assertIsNone(other['duplicateOf'])
+        
+        detail = self.client.get(f"/api/complaints/{first['id']}", **self.auth).json()
+        self.assertEqual(detail['linkedDuplicates'], sorted([second['id'], third['id']]))
+    
+    def test_closed_complaints_are_not_linked(self):
+        """Only open complaints are duplicate candidates"""
+        first = self.submit('Streetlight not working near the bus stop', 'Lake View')
+        Complaint.objects.filter(id=first['id']).update(status='Resolved')
+        
+        again = self.submit('Streetlight not working near the bus stop', 'Lake View')
+        self.assertIsNone(again['duplicateOf'])
+    
+    def test_backfill_command_indexes_existing_complaints(self):
+        """index_duplicates indexes complaints created before the index existed"""
+        from django.core.management import call_command
+        from io import StringIO
+        from .duplicates import BANDS
+        from .models import ComplaintSignature, SignatureBucket
+        
+        with self.settings(DUPLICATE_DETECTION_ENABLED=False):
+            old = self.submit('Garbage not collected for two weeks in our lane', 'Rose Colony')
+        self.assertFalse(ComplaintSignature.objects.exists())
+        
+        call_command('index_duplicates', stdout=StringIO())
+        self.assertEqual(SignatureBucket.objects.filter(complaint_id=old['id']).count(), BANDS)
+        
+        new = self.submit('Garbage not collected for two weeks in our lane!', 'Rose Colony')
+        self.assertEqual(new['duplicateOf'], old['id'])
+
+
+class SimilarComplaintsTestCase(TestCase):
+    """Test the similar-complaints vector index and endpoint"""
+    
+    def setUp(self):
+        import tempfile
+        from .auth import generate_token
+        from . import similar_index
+        
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        settings_override = self.settings(SIMILAR_INDEX_DIR=self.tmp.name, DUPLICATE_DETECTION_ENABLED=False)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        similar_index._index = None
+        self.addCleanup(setattr, similar_index, '_index', None)
+        
+        self.citizen = User.objects.create(email='citizen@example.com', password_hash='x', name='Citizen', role='CITIZEN')
+        self.officer = User.objects.create(email='officer@example.com', password_hash='x', name='Officer',
+                                           role='OFFICER', department='Water Supply & Sanitation')
+        self.citizen_auth = {'HTTP_AUTHORIZATION': f'Bearer {generate_token(self.citizen)}'}
+        self.officer_auth = {'HTTP_AUTHORIZATION': f'Bearer {generate_token(self.officer)}'}
+    
+    def submit(self, title, description):
+        response = self.client.post(
+            '/api/complaints/submit',
+            data=json.dumps({'title': title, 'description': description, 'location': 'Ward 5'}),
+            content_type='application/json', **self.citizen_auth
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.json()['data']['id']
+    
+    def similar(self, complaint_id, **params):
+        return self.client.get(f'/api/complaints/{complaint_id}/similar', params, **self.officer_auth)
+    
+    def test_similar_resolved_complaints(self):
+        """Resolved complaints about the same problem rank first; open ones only when asked"""
+        from unittest import mock
+        from . import similar_index
+        
+        leak = self.submit('Water pipe leaking', 'Water pipe leaking on the main road, water wasted all day')
+        outage = self.submit('Power outage', 'Electricity outage in our street since last night')
+        open_leak = self.submit('Pipe leak', 'Leaking water pipe near the school, water wasted')
+        Complaint.objects.filter(id__in=[leak, outage]).update(status='Resolved')
+        current = self.submit('Leaking pipe', 'A water pipe is leaking near the market and water is wasted')
+        
+        # No generation yet: the request starts a background build instead of building inline
+        index = similar_index.get_index()
+        with mock.patch.object(index, '_in_background') as background:
+            response = self.similar(current)
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response.json()['code'], 'SIMILAR_INDEX_UNAVAILABLE')
+        background.assert_called_once_with(index.build)
+        index.build()
+        
+        response = self.similar(current)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()['data']
+        self.assertEqual(data['complaintId'], current)
+        ids = [result['id'] for result in data['results']]
+        self.assertEqual(ids[0], leak)
+        self.assertNotIn(current, ids)
+        self.assertNotIn(open_leak, ids)
+        self.assertTrue(all(result['status'] == 'Resolved' for result in data['results']))
+        
+        # Submitted after the index was loaded: appended in memory
+        newer = self.submit('Water leak', 'Water pipe leaking badly, water wasted on the road')
+        ids = [result['id'] for result in self.similar(current, status='all', k=2).json()['data']['results']]
+        self.assertEqual(len(ids), 2)
+        self.assertTrue(set(ids) <= {leak, open_leak, newer})
+    
+    def test_access_and_validation(self):
+        complaint_id = self.submit('Garbage', 'Garbage not collected for a week')
+        response = self.client.get(f'/api/complaints/{complaint_id}/similar', **self.citizen_auth)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.similar(complaint_id, k=0).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.similar(complaint_id, status='pending').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.similar('GRV-MISSING').status_code, status.HTTP_404_NOT_FOUND)
+    
+    def test_compaction_persists_memory_mapped_generations(self):
+        """Compaction merges the delta; a fresh worker memory-maps the same index"""
+        import numpy as np
+        from django.core.management import call_command
+        from io import StringIO
+        from .similar_index import SimilarityIndex
+        
+        first = self.submit('Streetlight broken', 'Streetlight not working near the bus stop')
+        call_command('build_similar_index', stdout=StringIO())
+        
+        index = SimilarityIndex(self.tmp.name)
+        self.assertTrue(index.load())
+        self.assertIsInstance(index._base_ids, np.memmap)
+        self.assertEqual(index.stats()['baseRows'], 1)
+        
+        second = self.submit('Street light', 'Street light off at night near the park')
+        self.assertEqual(index.search('streetlight not working', k=5), index.search('streetlight not working', k=5))
+        self.assertEqual(index.stats()['deltaRows'], 1)
+        
+        call_command('build_similar_index', '--keep', '1', stdout=StringIO())
+        worker = SimilarityIndex(self.tmp.name)
+        worker.load()
+        self.assertEqual(worker.stats()['baseRows'], 2)
+        self.assertEqual(worker.stats()['deltaRows'], 0)
+        self.assertEqual(worker.search('streetlight not working', k=1)[0][0], first)
+        self.assertEqual(worker.search('street light at night near the park', k=1)[0][0], second)
+        self.assertEqual(len(list((worker.root / 'generations').iterdir())), 1)
+    
+    def test_status_filter_scans_a_bounded_number_of_candidates(self):
+        """Mostly-open matches cost a bounded number of status queries, not one per chunk of the index"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from .similar_index import SimilarityIndex
+        
+        for number in range(4):
+            self.submit(f'Pipe leak {number}', 'Water pipe leaking near the market, water wasted')
+        resolved = self.submit('Small leak', 'Some water leaking somewhere in the ward after the storm last week')
+        Complaint.objects.filter(id=resolved).update(status='Resolved')
+        
+        index = SimilarityIndex(self.tmp.name, catch_up_interval=3600, max_candidates=4)
+        index.build()
+        index.search('water pipe leaking', k=1)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(index.search('water pipe leaking', k=1, statuses=['Resolved']), [])
+        self.assertEqual(len(queries), 1)
+        
+        index.max_candidates = 5
+        self.assertEqual([match[0] for match in index.search('water pipe leaking', k=1, statuses=['Resolved'])],
+                         [resolved])
+    
+    def test_catch_up_is_throttled_and_large_deltas_compact(self):
+        """Searches catch up at most once per interval; a full delta is compacted off the request"""
+        from unittest import mock
+        from .similar_index import SimilarityIndex
+        
+        self.submit('Streetlight broken', 'Streetlight not working near the bus stop')
+        index = SimilarityIndex(self.tmp.name, catch_up_interval=3600, max_delta_rows=2)
+        index.build()
+        
+        self.submit('Street light', 'Street light off at night near the park')
+        index.search('streetlight', k=5)
+        self.submit('Road damaged', 'Potholes on the road near the school')
+        index.search('streetlight', k=5)
+        self.assertEqual(index.stats()['deltaRows'], 1)
+        
+        generation = index.generation
+        with mock.patch.object(index, '_in_background', side_effect=lambda function: function()) as background:
+            index.catch_up(force=True)
+            self.assertEqual(index.stats()['deltaRows'], 2)
+            index.search('streetlight', k=5)
+        background.assert_called_once_with(index._compact_and_prune)
+        self.assertNotEqual(index.generation, generation)
+        self.assertEqual(index.stats()['baseRows'], 3)
+        self.assertEqual(index.stats()['deltaRows'], 0)
+
+
+class ComplaintSearchTestCase(TestCase):
+    """Test full-text complaint search"""
+    
+    def setUp(self):
+        from .auth import generate_token
+        from .routing import sync_routes
+        
+        self.citizen = User.objects.create(email='citizen@example.com', password_hash='x', name='Citizen', role='CITIZEN')
+        self.other = User.objects.create(email='other@example.com', password_hash='x', name='Other', role='CITIZEN')
+        self.officer = User.objects.create(email='officer@example.com', password_hash='x', name='Officer',
+                                           role='OFFICER', department='Water Supply & Sanitation')
+        self.admin = User.objects.create(email='admin@example.com', password_hash='x', name='Admin', role='ADMIN')
+        self.auth = {user.role: {'HTTP_AUTHORIZATION': f'Bearer {generate_token(user)}'}
+                     for user in (self.citizen, self.officer, self.admin)}
+        
+        def create(complaint_id, user, title, description, location, department):
+            complaint = Complaint.objects.create(id=complaint_id, user=user, title=title, description=description,
+                                                 location=location, department=department)
+            sync_routes([complaint])
+            return complaint
+        
+        create('C-1', self.citizen, 'Water leak', 'Pipe leaking near the school', 'Ward 5', 'Water Supply & Sanitation')
+        create('C-2', self.other, 'Dirty water', 'Water supply is muddy, pipes leak', 'Ward 7', 'Water Supply & Sanitation')
+        create('C-3', self.citizen, 'Power cut', 'No electricity since morning', 'Ward 5', 'Electricity')
+    
+    def search(self, role, **params):
+        return self.client.get('/api/complaints/search', params, **self.auth[role])
+    
+    def ids(self, role, **params):
+        response = self.search(role, **params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [result['id'] for result in response.json()['data']['results']]
+    
+    def test_ranked_and_scoped(self):
+        """Title matches rank first, and each role only sees complaints it may list"""
+        self.assertEqual(self.ids('ADMIN', q='leak'), ['C-1', 'C-2'])
+        self.assertEqual(self.ids('CITIZEN', q='leak'), ['C-1'])
+        self.assertEqual(self.ids('OFFICER', q='ward 5'), ['C-1'])
+        self.assertEqual(set(self.ids('ADMIN', q='ward 5')), {'C-1', 'C-3'})
+        self.assertEqual(self.ids('ADMIN', q='electric'), ['C-3'])
+        self.assertEqual(self.ids('ADMIN', q='leak AND "x" OR title:power NEAR('), [])
+    
+    def test_index_follows_updates_and_deletes(self):
+        Complaint.objects.filter(id='C-3').update(title='Transformer sparking')
+        self.assertEqual(self.ids('ADMIN', q='transformer'), ['C-3'])
+        self.assertEqual(self.ids('ADMIN', q='power'), [])
+        Complaint.objects.filter(id='C-1').delete()
+        self.assertEqual(self.ids('ADMIN', q='leak'), ['C-2'])
+    
+    def test_pagination_and_validation(self):
+        data = self.search('ADMIN', q='water', page_size=1).json()['data']
+        self.assertEqual((data['total'], len(data['results']), data['hasMore']), (2, 1, True))
+        data = self.search('ADMIN', q='water', page_size=1, page=2).json()['data']
+        self.assertFalse(data['hasMore'])
+        self.assertEqual(self.search('ADMIN').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.search('ADMIN', q='water', page=0).status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_rebuild_command(self):
+        from django.core.management import call_command
+        from django.db import connection
+        from io import StringIO
+        
+        with connection.cursor() as cursor:
+            cursor.execute("INSERT INTO complaints_fts(complaints_fts) VALUES ('delete-all')")
+        self.assertEqual(self.ids('ADMIN', q='leak'), [])
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(self.ids('ADMIN', q='leak'), ['C-1', 'C-2'])
+    
+    def test_index_survives_renumbered_rowids(self):
+        """VACUUM may renumber the implicit rowids of complaints; the index is keyed independently"""
+        from django.db import connection
+        
+        with connection.cursor() as cursor:
+            cursor.execute('UPDATE complaints SET rowid = 1000 - rowid')
+        self.assertEqual(self.ids('ADMIN', q='leak'), ['C-1', 'C-2'])
+        self.assertEqual(self.ids('ADMIN', q='electricity'), ['C-3'])
+        Complaint.objects.filter(id='C-1').update(title='Road damaged', description='Potholes everywhere')
+        self.assertEqual(self.ids('ADMIN', q='leak'), ['C-2'])
+        self.assertEqual(self.ids('ADMIN', q='potholes'), ['C-1'])
+
+
+class ComplaintListPaginationTestCase(TestCase):
+    """Test keyset pagination of GET /api/complaints"""
+    
+    def setUp(self):
+        import datetime
+        from django.utils import timezone
+        from .auth import generate_token
+        
+        self.admin = User.objects.create(email='admin@example.com', password_hash='x', name='Admin', role='ADMIN')
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {generate_token(self.admin)}'}
+        citizens = [
+            User.objects.create(email=f'citizen{i}@example.com', password_hash='x', name=f'Citizen {i}')
+            for i in range(3)
+        ]
+        now = timezone.now()
+        for i in range(7):
+            Complaint.objects.create(id=f'C-{i}', user=citizens[i % 3], title='t', description='d', location='l')
+        # Two pairs share a timestamp so the id tie-break is exercised
+        for i, minutes in enumerate([1, 1, 2, 3, 3, 4, 5]):
+            Complaint.objects.filter(id=f'C-{i}').update(date_submitted=now - datetime.timedelta(minutes=minutes))
+    
+    def test_pages_cover_all_rows_in_order(self):
+        """Following X-Next-Cursor visits every complaint once, newest first"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        
+        seen, params = [], {'limit': 3}
+        while True:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get('/api/complaints', params, **self.auth)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            # Auth lookup, the ETag validator and one query for the page: no per-row user queries
+            self.assertLessEqual(len(queries), 3)
+            self.assertIsInstance(response.json(), list)
+            seen.extend(item['id'] for item in response.json())
+            self.assertTrue(all(item['userName'].startswith('Citizen') for item in response.json()))
+            if 'X-Next-Cursor' not in response:
+                self.assertNotIn('Link', response)
+                break
+            self.assertIn('rel="next"', response['Link'])
+            params['cursor'] = response['X-Next-Cursor']
+        self.assertEqual(seen, ['C-0', 'C-1', 'C-2', 'C-3', 'C-4', 'C-5', 'C-6'])
+    
+    def test_limit_and_cursor_validation(self):
+        self.assertEqual(len(self.client.get('/api/complaints', **self.auth).json()), 7)
+        for params in ({'limit': 0}, {'limit': 10_000}, {'limit': 'x'}, {'cursor': 'garbage'}):
+            response = self.client.get('/api/complaints', params, **self.auth)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+
+class SparseFieldsetTestCase(TestCase):
+    """Test ?view= and ?fields= on complaint endpoints"""
+    
+    def setUp(self):
+        from .auth import generate_token
+        
+        self.admin = User.objects.create(email='admin@example.com', password_hash='x', name='Admin', role='ADMIN')
+        self.citizen = User.objects.create(email='citizen@example.com', password_hash='x', name='Citizen')
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {generate_token(self.admin)}'}
+        Complaint.objects.create(id='C-1', user=self.citizen, title='Leak', description='Pipe leaking',
+                                 location='Ward 5', priority='High', nlp_analysis={'suggestedSteps': ['Fix'] * 50})
+    
+    def get(self, url, **params):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params, **self.auth)
+        # Skip the conditional GET validator aggregate
+        complaint_queries = [q['sql'] for q in queries if 'FROM "complaints"' in q['sql'] and 'MAX(' not in q['sql']]
+        return response, complaint_queries
+    
+    def test_summary_view_skips_heavy_columns(self):
+        response, queries = self.get('/api/complaints', view='summary')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.json()[0]),
+                         {'id', 'title', 'status', 'priority', 'department', 'date_submitted', 'date_updated'})
+        self.assertEqual(len(queries), 1)
+        for column in ('"nlp_analysis"', '"description"', '"users"'):
+            self.assertNotIn(column, queries[0])
+        
+        response, queries = self.get('/api/complaints')
+        self.assertIn('nlp_analysis', response.json()[0])
+        self.assertEqual(response.json()[0]['userName'], 'Citizen')
+        self.assertIn('"nlp_analysis"', queries[0])
+    
+    def test_explicit_fields(self):
+        response, queries = self.get('/api/complaints/C-1', fields='title,history')
+        self.assertEqual(response.json(), {'id': 'C-1', 'title': 'Leak', 'history': []})
+        self.assertNotIn('"nlp_analysis"', queries[0])
+        
+        response, _ = self.get('/api/complaints/C-1')
+        self.assertEqual(response.json()['attachments'], [])
+        self.assertEqual(response.json()['linkedDuplicates'], [])
+        
+        for params in ({'fields': 'title,secret'}, {'view': 'tiny'}, {'view': 'summary', 'fields': 'title'}):
+            response, _ = self.get('/api/complaints', **params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+    
+    def test_status_update_fields(self):
+        response = self.client.put('/api/complaints/C-1/status?view=summary',
+                                   data=json.dumps({'status': 'In Progress'}),
+                                   content_type='application/json', **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['status'], 'In Progress')
+        self.assertNotIn('nlp_analysis', response.json())
+        complaint = Complaint.objects.get(id='C-1')
+        self.assertEqual(complaint.status, 'In Progress')
+        self.assertEqual(complaint.description, 'Pipe leaking')
+        self.assertEqual(complaint.notifications.get().user, self.citizen)
+
+
+class ConditionalGetTestCase(TestCase):
+    """Test ETag / Last-Modified handling on polled endpoints"""
+    
+    def setUp(self):
+        from .auth import generate_token
+        
+        self.admin = User.objects.create(email='admin@example.com', password_hash='x', name='Admin', role='ADMIN')
+        self.citizen = User.objects.create(email='citizen@example.com', password_hash='x', name='Citizen')
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {generate_token(self.admin)}'}
+        self.citizen_auth = {'HTTP_AUTHORIZATION': f'Bearer {generate_token(self.citizen)}'}
+        self.complaint = Complaint.objects.create(id='C-1', user=self.citizen, title='Leak',
+                                                  description='Pipe leaking', location='Ward 5')
+    
+    def revalidate(self, url, auth=None, **headers):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        
+        first = self.client.get(url, **(auth or self.auth))
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertTrue(first.has_header('ETag'))
+        with CaptureQueriesContext(connection) as queries:
+            second = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'], **(auth or self.auth))
+        return first, second, queries
+    
+    def test_unchanged_polls_get_304_with_one_query(self):
+        for url in ('/api/complaints', '/api/complaints/C-1', '/api/analytics', '/api/notifications'):
+            first, second, queries = self.revalidate(url)
+            self.assertEqual(second.status_code, status.HTTP_304_NOT_MODIFIED, url)
+            self.assertEqual(second.content, b'')
+            # Auth lookup plus the validator aggregate
+            self.assertEqual(len(queries), 2, url)
+    
+    def test_changes_invalidate(self):
+        first = self.client.get('/api/complaints/C-1', **self.auth)
+        self.assertTrue(first.has_header('Last-Modified'))
+        list_etag = self.client.get('/api/complaints', **self.auth)['ETag']
+        
+        response = self.client.put('/api/complaints/C-1/status', data=json.dumps({'status': 'In Progress'}),
+                                   content_type='application/json', **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for url, etag in (('/api/complaints/C-1', first['ETag']), ('/api/complaints', list_etag)):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag, **self.auth)
+            self.assertEqual(response.status_code, status.HTTP_200_OK, url)
+        
+        # The status update notified the citizen; reading it changes the ETag too
+        _, second, _ = self.revalidate('/api/notifications', auth=self.citizen_auth)
+        self.assertEqual(second.status_code, status.HTTP_304_NOT_MODIFIED)
+        etag = second['ETag']
+        notification = self.citizen.notifications.get()
+        self.client.put(f'/api/notifications/{notification.id}/read', **self.citizen_auth)
+        response = self.client.get('/api/notifications', HTTP_IF_NONE_MATCH=etag, **self.citizen_auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+    
+    def test_representation_and_scope_are_part_of_the_etag(self):
+        full = self.client.get('/api/complaints', **self.auth)['ETag']
+        summary = self.client.get('/api/complaints', {'view': 'summary'}, HTTP_IF_NONE_MATCH=full, **self.auth)
+        self.assertEqual(summary.status_code, status.HTTP_200_OK)
+        citizen = self.client.get('/api/complaints', HTTP_IF_NONE_MATCH=full, **self.citizen_auth)
+        self.assertEqual(citizen.status_code, status.HTTP_200_OK)
+    
+    def test_if_modified_since(self):
+        first = self.client.get('/api/complaints/C-1', **self.auth)
+        response = self.client.get('/api/complaints/C-1', HTTP_IF_MODIFIED_SINCE=first['Last-Modified'], **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        response = self.client.get('/api/complaints/C-1', HTTP_IF_MODIFIED_SINCE='Mon, 01 Jan 2001 00:00:00 GMT',
+                                   **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get('/api/complaints/C-404', **self.auth).status_code, status.HTTP_404_NOT_FOUND)
+    
+    def test_list_has_no_last_modified(self):
+        """Removing a complaint from the scope does not raise max(date_updated), so lists rely on the ETag"""
+        first = self.client.get('/api/complaints', **self.auth)
+        self.assertFalse(first.has_header('Last-Modified'))
+        Complaint.objects.filter(id='C-1').delete()
+        response = self.client.get('/api/complaints', HTTP_IF_MODIFIED_SINCE='Mon, 01 Jan 2101 00:00:00 GMT',
+                                   **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get('/api/complaints', HTTP_IF_NONE_MATCH=first['ETag'], **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class AnalyticsSummaryTestCase(TestCase):
+    """Test the incrementally maintained analytics summary"""
+    
+    def setUp(self):
+        from .auth import generate_token
+        
+        self.citizen = User.objects.create(email='citizen@example.com', password_hash='x', name='Citizen')
+        self.admin = User.objects.create(email='admin@example.com', password_hash='x', name='Admin', role='ADMIN')
+        self.citizen_auth = {'HTTP_AUTHORIZATION': f'Bearer {generate_token(self.citizen)}'}
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {generate_token(self.admin)}'}
+    
+    def submit(self, description):
+        response = self.client.post(
+            '/api/complaints/submit',
+            data=json.dumps({'title': 'Complaint', 'description': description, 'location': 'Ward 5'}),
+            content_type='application/json', **self.citizen_auth
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.json()['data']['id']
+    
+    def set_status(self, complaint_id, new_status):
+        response = self.client.put(f'/api/complaints/{complaint_id}/status', data=json.dumps({'status': new_status}),
+                                   content_type='application/json', **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+    
+    def analytics(self):
+        response = self.client.get('/api/analytics', **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()
+    
+    def assertMatchesRebuild(self):
+        from .analytics import rebuild
+        from .models import AnalyticsSummary
+        
+        fields = ('scope', 'total', 'submitted', 'under_review', 'in_progress', 'resolved', 'closed', 'resolution_count')
+        incremental = {row[0]: row for row in AnalyticsSummary.objects.filter(total__gt=0).values_list(*fields)}
+        seconds = dict(AnalyticsSummary.objects.values_list('scope', 'resolution_seconds'))
+        rebuild()
+        rebuilt = {row[0]: row for row in AnalyticsSummary.objects.filter(total__gt=0).values_list(*fields)}
+        self.assertEqual(incremental, rebuilt)
+        for scope, value in AnalyticsSummary.objects.values_list('scope', 'resolution_seconds'):
+            self.assertAlmostEqual(seconds.get(scope, 0), value, places=3)
+    
+    def test_summary_follows_submissions_status_changes_and_rerouting(self):
+        from .routing import reroute_complaint
+        
+        water = self.submit('Water pipe burst on Main Street, road flooded and water supply stopped')
+        power = self.submit('Power outage in the whole block since last night, transformer sparking')
+        self.submit('Huge pothole on the highway causing accidents')
+        
+        self.set_status(water, 'In Progress')
+        self.set_status(water, 'Resolved')
+        self.set_status(power, 'Resolved')
+        self.set_status(power, 'Under Review')  # reopened
+        reroute_complaint(Complaint.objects.get(id=water), 'Public Works & Infrastructure', self.admin)
+        
+        data = self.analytics()
+        self.assertEqual((data['total'], data['pending'], data['resolved']), (3, 2, 1))
+        self.assertEqual(data['byStatus']['Under Review'], 1)
+        self.assertEqual(data['avgResolutionTime'], '0.0 Days')
+        self.assertEqual(data['byDepartment']['Public Works & Infrastructure']['resolved'], 1)
+        self.assertEqual(sum(dept['total'] for dept in data['byDepartment'].values()), 3)
+        self.assertMatchesRebuild()
+    
+    def test_resolution_time_uses_date_resolved(self):
+        import datetime
+        
+        complaint_id = self.submit('Garbage not collected for two weeks, drainage blocked')
+        Complaint.objects.filter(id=complaint_id).update(date_submitted=Complaint.objects.get(id=complaint_id)
+                                                         .date_submitted - datetime.timedelta(days=3))
+        from .analytics import rebuild
+        rebuild()
+        self.set_status(complaint_id, 'Resolved')
+        self.assertEqual(self.analytics()['avgResolutionTime'], '3.0 Days')
+        self.assertIsNotNone(Complaint.objects.get(id=complaint_id).date_resolved)
+        self.assertMatchesRebuild()
+    
+    def test_endpoint_reads_summary_rows_only(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        
+        self.submit('Huge pothole on the highway causing accidents')
+        with CaptureQueriesContext(connection) as queries:
+            self.analytics()
+        self.assertFalse([q for q in queries if 'FROM "complaints"' in q['sql']])
+        
+        etag = self.client.get('/api/analytics', **self.auth)['ETag']
+        self.submit('Power outage in the whole block since last night')
+        self.assertEqual(self.client.get('/api/analytics', HTTP_IF_NONE_MATCH=etag, **self.auth).status_code,
+                         status.HTTP_200_OK)
+    
+    def test_reclassify_and_rebuild_command(self):
+        import tempfile
+        from django.core.management import call_command
+        from io import StringIO
+        from .analytics import rebuild
+        
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        
+        Complaint.objects.create(id='GRV-2025-000001', user=self.citizen, title='Complaint',
+                                 description='Power outage in the whole block since last night, transformer sparking',
+                                 location='Ward 5', department='Others', primary_department='Others',
+                                 departments=['Others'])
+        rebuild()
+        self.assertEqual(self.analytics()['byDepartment']['Others']['total'], 1)
+        call_command('reclassify_complaints', '--checkpoint', f'{tmp.name}/checkpoint.json', stdout=StringIO())
+        self.assertNotIn('Others', self.analytics()['byDepartment'])
+        self.assertMatchesRebuild()
+        
+        out = StringIO()
+        call_command('rebuild_analytics', stdout=out)
+        self.assertIn('1 complaint(s)', out.getvalue())
+
+
+class AnalyticsRollupTestCase(TestCase):
+    """Test time-bucketed analytics rollups and the timeseries endpoint"""
+    
+    def setUp(self):
+        from .auth import generate_token
+        
+        self.citizen = User.objects.create(email='citizen@example.com', password_hash='x', name='Citizen')
+        self.admin = User.objects.create(email='admin@example.com', password_hash='x', name='Admin', role='ADMIN')
+        self.citizen_auth = {'HTTP_AUTHORIZATION': f'Bearer {generate_token(self.citizen)}'}
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {generate_token(self.admin)}'}
+    
+    def submit(self, description):
+        response = self.client.post(
+            '/api/complaints/submit',
+            data=json.dumps({'title': 'Complaint', 'description': description, 'location': 'Ward 5'}),
+            content_type='application/json', **self.citizen_auth
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.json()['data']
+    
+    def set_status(self, complaint_id, new_status):
+        response = self.client.put(f'/api/complaints/{complaint_id}/status', data=json.dumps({'status': new_status}),
+                                   content_type='application/json', **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+    
+    def timeseries(self, **params):
+        response = self.client.get('/api/analytics/timeseries', params, **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        return response.json()['data']
+    
+    def rollup_rows(self):
+        from .models import AnalyticsRollup
+        return sorted(AnalyticsRollup.objects.values_list(
+            'granularity', 'bucket', 'primary_department', 'priority', 'status',
+            'count', 'resolution_count', 'resolution_histogram'
+        ))
+    
+    def test_events_fill_rollups_and_match_backfill(self):
+        from .rollups import backfill
+        
+        water = self.submit('Water pipe burst on Main Street, road flooded and water supply stopped')
+        self.submit('Water supply stopped, no drinking water for three days')
+        power = self.submit('Power outage in the whole block since last night, transformer sparking')
+        self.set_status(water['id'], 'In Progress')
+        self.set_status(water['id'], 'Resolved')
+        self.set_status(power['id'], 'Resolved')
+        
+        incremental = self.rollup_rows()
+        self.assertEqual(backfill(), 6)
+        self.assertEqual(self.rollup_rows(), incremental)
+        
+        data = self.timeseries(group_by='department', status='Submitted')
+        counts = {series['group']['department']: sum(p['count'] for p in series['points']) for series in data['series']}
+        self.assertEqual(counts[water['primaryDepartment']], 2)
+        self.assertEqual(counts[power['primaryDepartment']], 1)
+        
+        data = self.timeseries(group_by='priority', status='Resolved', bucket='hour')
+        points = [point for series in data['series'] for point in series['points']]
+        self.assertEqual(sum(point['resolved'] for point in points), 2)
+        self.assertTrue(all(point['p50ResolutionHours'] == 0.25 for point in points))
+    
+    def test_answered_from_rollups_only(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        
+        self.submit('Huge pothole on the highway causing accidents')
+        with CaptureQueriesContext(connection) as queries:
+            data = self.timeseries(group_by='status,department')
+        self.assertEqual(len(data['series']), 1)
+        self.assertEqual(data['series'][0]['group']['status'], 'Submitted')
+        self.assertFalse([q for q in queries if 'FROM "complaints"' in q['sql']])
+    
+    def test_async_submissions_are_recorded_when_routed(self):
+        from .job_queue import claim_jobs, run_jobs
+        from .models import AnalyticsRollup
+        
+        with self.settings(NLP_EXECUTION_MODE='async'):
+            response = self.client.post(
+                '/api/complaints/submit',
+                data=json.dumps({'title': 'Complaint', 'description': 'Garbage not collected for two weeks',
+                                 'location': 'Ward 5'}),
+                content_type='application/json', **self.citizen_auth
+            )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertFalse(AnalyticsRollup.objects.exists())
+        run_jobs(claim_jobs(10, 60), 3)
+        self.assertEqual(AnalyticsRollup.objects.filter(status='Submitted').exclude(primary_department='').count(), 2)
+    
+    def test_validation(self):
+        for params in ({'bucket': 'week'}, {'group_by': 'user'}, {'status': 'Lost'}, {'from': 'yesterday'},
+                       {'from': '2026-01-01', 'to': '2025-01-01'}, {'bucket': 'hour', 'from': '2020-01-01'}):
+            response = self.client.get('/api/analytics/timeseries', params, **self.auth)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+        data = self.timeseries(**{'from': '2026-01-01', 'to': '2026-01-31T12:00:00'})
+        self.assertEqual(data['series'], [])
+
+
+class AnalyticsSnapshotTestCase(TestCase):
+    """Test columnar analytics snapshots and the report endpoint"""
+    
+    def setUp(self):
+        import tempfile
+        from . import snapshots
+        from .auth import generate_token
+        
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        settings_override = self.settings(ANALYTICS_SNAPSHOT_DIR=self.tmp.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        snapshots._engine = None
+        self.addCleanup(setattr, snapshots, '_engine', None)
+        
+        self.citizen = User.objects.create(email='citizen@example.com', password_hash='x', name='Citizen')
+        self.admin = User.objects.create(email='admin@example.com', password_hash='x', name='Admin', role='ADMIN')
+        self.citizen_auth = {'HTTP_AUTHORIZATION': f'Bearer {generate_token(self.citizen)}'}
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {generate_token(self.admin)}'}
+    
+    def submit(self, description):
+        response = self.client.post(
+            '/api/complaints/submit',
+            data=json.dumps({'title': 'Complaint', 'description': description, 'location': 'Ward 5'}),
+            content_type='application/json', **self.citizen_auth
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.json()['data']
+    
+    def set_status(self, complaint_id, new_status):
+        response = self.client.put(f'/api/complaints/{complaint_id}/status', data=json.dumps({'status': new_status}),
+                                   content_type='application/json', **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+    
+    def report(self, name, **params):
+        response = self.client.get(f'/api/analytics/reports/{name}', params, **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        return response.json()['data']
+    
+    def test_reports_from_snapshot_without_querying_complaints(self):
+        from django.core.management import call_command
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from io import StringIO
+        
+        water = self.submit('Water pipe burst on Main Street, road flooded and water supply stopped')
+        self.submit('Water supply stopped, no drinking water for three days')
+        power = self.submit('Power outage in the whole block since last night, transformer sparking')
+        self.set_status(water['id'], 'Resolved')
+        self.set_status(power['id'], 'In Progress')
+        call_command('export_snapshot', '--batch-size', '2', stdout=StringIO())
+        
+        with CaptureQueriesContext(connection) as queries:
+            backlog = self.report('backlog')
+            resolution = self.report('resolution')
+            departments = self.report('departments', window_days=7)
+            officers = self.report('officers')
+        self.assertFalse([q for q in queries if 'FROM "complaints"' in q['sql']])
+        
+        self.assertEqual(backlog['data']['open'], 2)
+        self.assertEqual(backlog['data']['ages']['<1d'], 2)
+        self.assertEqual(sum(backlog['data']['byStatus']['In Progress'].values()), 1)
+        self.assertEqual(resolution['data']['overall']['count'], 1)
+        self.assertNotIn('windowDays', backlog)
+        self.assertIn(water['priority'], resolution['data']['byPriority'])
+        self.assertEqual(departments['windowDays'], 7)
+        self.assertEqual(departments['data'][water['primaryDepartment']]['resolved'], 1)
+        self.assertEqual(sum(row['submitted'] for row in departments['data'].values()), 3)
+        self.assertEqual(officers['data'][str(self.admin.id)]['updates'], 2)
+        self.assertEqual(officers['data'][str(self.admin.id)]['resolved'], 1)
+    
+    def test_resolution_report_uses_the_window(self):
+        import datetime
+        from django.utils import timezone
+        from . import snapshots
+        
+        old = self.submit('Water pipe burst on Main Street, road flooded and water supply stopped')
+        recent = self.submit('Power outage in the whole block since last night, transformer sparking')
+        self.set_status(old['id'], 'Resolved')
+        self.set_status(recent['id'], 'Resolved')
+        now = timezone.now()
+        Complaint.objects.filter(id=old['id']).update(date_submitted=now - datetime.timedelta(days=41),
+                                                      date_resolved=now - datetime.timedelta(days=40))
+        snapshots.export_snapshot(self.tmp.name)
+        
+        self.assertEqual(self.report('resolution')['data']['overall']['count'], 1)
+        self.assertEqual(self.report('resolution', window_days=60)['data']['overall']['count'], 2)
+    
+    def test_newer_snapshot_is_picked_up_and_old_ones_pruned(self):
+        import os
+        from . import snapshots
+        
+        first = snapshots.export_snapshot(self.tmp.name, compression='lz4')
+        self.assertEqual(self.report('backlog')['snapshot'], first)
+        self.submit('Huge pothole on the highway causing accidents')
+        second = snapshots.export_snapshot(self.tmp.name, compression='uncompressed')
+        data = self.report('backlog')
+        self.assertEqual(data['snapshot'], second)
+        self.assertEqual(data['data']['open'], 1)
+        
+        self.assertEqual(snapshots.prune(self.tmp.name, keep=1), [first])
+        self.assertEqual(os.listdir(os.path.join(self.tmp.name, 'generations')), [second])
+    
+    def test_errors(self):
+        response = self.client.get('/api/analytics/reports/backlog', **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        response = self.client.get('/api/analytics/reports/backlog', **self.citizen_auth)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.get('/api/analytics/reports/revenue', **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get('/api/analytics/reports/departments', {'window_days': 'week'}, **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get('/api/analytics/reports/backlog', {'window_days': 7}, **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ComplaintIdAllocatorTestCase(TransactionTestCase):
+    """Test hi/lo complaint ID allocation under concurrency and across years"""
+    
+    def test_concurrent_allocators_never_repeat(self):
+        import threading
+        import time
+        from django.db import OperationalError, connection
+        from .complaint_ids import BlockAllocator
+        
+        # Four workers (separate allocators) with two threads each
+        allocators = [BlockAllocator(block_size=7) for _ in range(4)]
+        ids, errors = [], []
+        start = threading.Barrier(8)
+        
+        def next_id(allocator):
+            # The in-memory test database reports lock contention instead of
+            # waiting like a file database; a failed reservation changes nothing
+            while True:
+                try:
+                    return allocator.next_id()
+                except OperationalError as e:
+                    if 'locked' not in str(e):
+                        raise
+                    time.sleep(0.001)
+        
+        def work(allocator):
+            try:
+                start.wait()
+                for _ in range(60):
+                    ids.append(next_id(allocator))
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+        
+        threads = [threading.Thread(target=work, args=(allocators[i % 4],)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(errors, [])
+        self.assertEqual(len(ids), 480)
+        self.assertEqual(len(set(ids)), 480)
+        numbers = sorted(int(complaint_id.rsplit('-', 1)[1]) for complaint_id in ids)
+        # Only the unused tails of the last blocks are skipped
+        self.assertLessEqual(numbers[-1], 480 + 4 * 7)
+    
+    def test_year_rollover_and_existing_ids(self):
+        import datetime
+        from .complaint_ids import BlockAllocator
+        from .models import ComplaintSequence
+        
+        user = User.objects.create(email='citizen@example.com', password_hash='x', name='Citizen')
+        Complaint.objects.create(id='SMG-2025-0041', user=user, title='t', description='d', location='l')
+        today = [datetime.date(2025, 12, 31)]
+        allocator = BlockAllocator(block_size=5, clock=lambda: today[0])
+        
+        self.assertEqual([allocator.next_id() for _ in range(2)], ['SMG-2025-0042', 'SMG-2025-0043'])
+        today[0] = datetime.date(2026, 1, 1)
+        self.assertEqual([allocator.next_id() for _ in range(6)],
+                         [f'SMG-2026-{n:04d}' for n in range(1, 7)])
+        # Another worker continues after the reserved blocks
+        self.assertEqual(BlockAllocator(block_size=5, clock=lambda: today[0]).next_id(), 'SMG-2026-0011')
+        self.assertEqual(dict(ComplaintSequence.objects.values_list('year', 'next_value')), {2025: 47, 2026: 16})
+    
+    def test_submissions_get_distinct_ids(self):
+        from .auth import generate_token
+        
+        user = User.objects.create(email='citizen@example.com', password_hash='x', name='Citizen')
+        auth = {'HTTP_AUTHORIZATION': f'Bearer {generate_token(user)}'}
+        cache.clear()
+        ids = set()
+        for text in ('Water pipe burst on Main Street', 'Power outage in the whole block', 'Garbage not collected'):
+            response = self.client.post(
+                '/api/complaints/submit',
+                data=json.dumps({'title': 'Complaint', 'description': text, 'location': 'Ward 5'}),
+                content_type='application/json', **auth
+            )
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            ids.add(response.json()['data']['id'])
+        self.assertEqual(len(ids), 3)
+
+
+class ComplaintRoutingTableTestCase(TestCase):
+    """Test the complaint-to-department routing table and officer lists served from it"""
+    
+    def setUp(self):
+        from .auth import generate_token
+        
+        self.citizen = User.objects.create(email='citizen@example.com', password_hash='x', name='Citizen')
+        self.officer = User.objects.create(email='officer@example.com', password_hash='x', name='Officer',
+                                           role='OFFICER', department='Roads & Infrastructure')
+        self.admin = User.objects.create(email='admin@example.com', password_hash='x', name='Admin', role='ADMIN')
+        self.citizen_auth = {'HTTP_AUTHORIZATION': f'Bearer {generate_token(self.citizen)}'}
+        self.officer_auth = {'HTTP_AUTHORIZATION': f'Bearer {generate_token(self.officer)}'}
+        self.admin_auth = {'HTTP_AUTHORIZATION': f'Bearer {generate_token(self.admin)}'}
+    
+    def create(self, complaint_id, primary, *secondary):
+        from .routing import sync_routes
+        
+        departments = [primary, *secondary]
+        complaint = Complaint.objects.create(
+            id=complaint_id, user=self.citizen, title='Complaint', description='d', location='l',
+            department=primary, primary_department=primary, departments=departments,
+            nlp_analysis={'departmentDetails': [{'department': d, 'confidence': 0.9 - 0.1 * i}
+                                                for i, d in enumerate(departments)]},
+        )
+        sync_routes([complaint], {complaint.id: {d: 0.9 - 0.1 * i for i, d in enumerate(departments)}})
+        return complaint
+    
+    def routes(self):
+        from .models import ComplaintDepartment
+        return sorted(ComplaintDepartment.objects.values_list(
+            'complaint_id', 'department', 'confidence', 'is_primary', 'status'
+        ))
+    
+    def list_ids(self, **params):
+        response = self.client.get('/api/complaints', params, **self.officer_auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [complaint['id'] for complaint in response.json()], response.get('X-Next-Cursor')
+    
+    def test_submission_fills_routes(self):
+        response = self.client.post(
+            '/api/complaints/submit',
+            data=json.dumps({'title': 'Flooding', 'description': 'Water pipe burst and flooded the road, huge pothole',
+                             'location': 'Ward 5'}),
+            content_type='application/json', **self.citizen_auth
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        data = response.json()['data']
+        routes = self.routes()
+        self.assertEqual([route[1] for route in routes if route[3]], [data['primaryDepartment']])
+        self.assertEqual(sorted(route[1] for route in routes), sorted(data['departments']))
+        self.assertTrue(all(route[2] is not None and route[4] == 'Submitted' for route in routes))
+    
+    def test_officers_see_secondary_routes_newest_first(self):
+        import datetime
+        from django.utils import timezone
+        from .models import ComplaintDepartment
+        
+        now = timezone.now()
+        self.create('C-1', 'Water Supply & Sanitation', 'Roads & Infrastructure')
+        self.create('C-2', 'Roads & Infrastructure')
+        self.create('C-3', 'Electricity')
+        self.create('C-4', 'Roads & Infrastructure', 'Electricity')
+        for minutes, complaint_id in enumerate(['C-4', 'C-2', 'C-1', 'C-3']):
+            date_submitted = now - datetime.timedelta(minutes=minutes)
+            Complaint.objects.filter(id=complaint_id).update(date_submitted=date_submitted)
+            ComplaintDepartment.objects.filter(complaint_id=complaint_id).update(date_submitted=date_submitted)
+        
+        ids, cursor = self.list_ids(limit=2)
+        self.assertEqual(ids, ['C-4', 'C-2'])
+        ids, cursor = self.list_ids(limit=2, cursor=cursor)
+        self.assertEqual((ids, cursor), (['C-1'], None))
+        self.assertEqual(self.list_ids(view='summary')[0], ['C-4', 'C-2', 'C-1'])
+    
+    def test_status_and_reroute_keep_routes_in_sync(self):
+        from .models import Department
+        
+        Department.objects.create(name='Roads & Infrastructure')
+        self.create('C-1', 'Water Supply & Sanitation', 'Roads & Infrastructure')
+        response = self.client.put('/api/complaints/C-1/status', data=json.dumps({'status': 'In Progress'}),
+                                   content_type='application/json', **self.officer_auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.put('/api/complaints/C-1/department',
+                                   data=json.dumps({'department': 'Roads & Infrastructure'}),
+                                   content_type='application/json', **self.admin_auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # The previous primary department is dropped; the stored confidence is kept
+        self.assertEqual(self.routes(), [('C-1', 'Roads & Infrastructure', 0.8, True, 'In Progress')])
+    
+    def test_backfill_matches_incremental_rows(self):
+        from .models import ComplaintDepartment
+        from .routing import backfill_routes
+        
+        self.create('C-1', 'Water Supply & Sanitation', 'Roads & Infrastructure')
+        self.create('C-2', 'Electricity')
+        Complaint.objects.create(id='C-3', user=self.citizen, title='t', description='d', location='l',
+                                 classification_status=Complaint.CLASSIFICATION_PENDING)
+        incremental = self.routes()
+        self.assertEqual(backfill_routes(ComplaintDepartment, Complaint, batch_size=2), 3)
+        self.assertEqual(self.routes(), incremental)
+
+
+class OfficerQueueTestCase(TestCase):
+    """Test the officer work queue: open complaints by priority, then age"""
+    
+    def setUp(self):
+        import datetime
+        from django.utils import timezone
+        from .auth import generate_token
+        from .routing import sync_routes
+        
+        self.citizen = User.objects.create(email='citizen@example.com', password_hash='x', name='Citizen')
+        self.officer = User.objects.create(email='officer@example.com', password_hash='x', name='Officer',
+                                           role='OFFICER', department='Electricity')
+        self.admin = User.objects.create(email='admin@example.com', password_hash='x', name='Admin', role='ADMIN')
+        self.citizen_auth = {'HTTP_AUTHORIZATION': f'Bearer {generate_token(self.citizen)}'}
+        self.officer_auth = {'HTTP_AUTHORIZATION': f'Bearer {generate_token(self.officer)}'}
+        self.admin_auth = {'HTTP_AUTHORIZATION': f'Bearer {generate_token(self.admin)}'}
+        
+        now = timezone.now()
+        # id, departments, priority, status, hours old
+        for complaint_id, departments, priority, complaint_status, age in [
+            ('C-1', ['Electricity'], 'Low', 'Submitted', 50),
+            ('C-2', ['Electricity'], 'Critical', 'In Progress', 1),
+            ('C-3', ['Water Supply & Sanitation', 'Electricity'], 'High', 'Submitted', 5),
+            ('C-4', ['Electricity'], 'High', 'Under Review', 9),
+            ('C-5', ['Electricity'], 'Critical', 'Resolved', 90),
+            ('C-6', ['Roads & Infrastructure'], 'Critical', 'Submitted', 3),
+            ('C-7', ['Electricity'], None, 'Submitted', 70),
+            ('C-8', ['Electricity'], 'Critical', 'Submitted', 2),
+        ]:
+            complaint = Complaint.objects.create(
+                id=complaint_id, user=self.citizen, title='Complaint', description='d', location='l',
+                status=complaint_status, priority=priority, department=departments[0],
+                primary_department=departments[0], departments=departments,
+            )
+            Complaint.objects.filter(id=complaint_id).update(date_submitted=now - datetime.timedelta(hours=age))
+            complaint.refresh_from_db()
+            sync_routes([complaint])
+    
+    def queue(self, auth=None, **params):
+        response = self.client.get('/api/officer/queue', params, **(auth or self.officer_auth))
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        return response.json()['data']
+    
+    def test_ordered_by_priority_then_age(self):
+        data = self.queue()
+        self.assertEqual(data['department'], 'Electricity')
+        self.assertEqual([c['id'] for c in data['results']], ['C-8', 'C-2', 'C-4', 'C-3', 'C-1', 'C-7'])
+        self.assertEqual(set(data['results'][0]), {'id', 'title', 'status', 'priority', 'department',
+                                                   'date_submitted', 'date_updated'})
+        self.assertFalse(data['hasMore'])
+        
+        data = self.queue(auth=self.admin_auth, department='Roads & Infrastructure', fields='id,priority')
+        self.assertEqual(data['results'], [{'id': 'C-6', 'priority': 'Critical'}])
+    
+    def test_keyset_pages(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        
+        seen, cursor = [], None
+        while True:
+            params = {'limit': 2}
+            if cursor:
+                params['cursor'] = cursor
+            with CaptureQueriesContext(connection) as queries:
+                data = self.queue(**params)
+            self.assertFalse([q for q in queries if 'FROM "complaints"' in q['sql'] and 'ORDER BY' in q['sql']])
+            seen += [c['id'] for c in data['results']]
+            cursor = data['nextCursor']
+            if not cursor:
+                break
+        self.assertEqual(seen, ['C-8', 'C-2', 'C-4', 'C-3', 'C-1', 'C-7'])
+    
+    def test_resolving_leaves_the_queue(self):
+        response = self.client.put('/api/complaints/C-8/status', data=json.dumps({'status': 'Resolved'}),
+                                   content_type='application/json', **self.officer_auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([c['id'] for c in self.queue(limit=1)['results']], ['C-2'])
+    
+    def test_errors(self):
+        response = self.client.get('/api/officer/queue', **self.citizen_auth)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.get('/api/officer/queue', **self.admin_auth)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        for params in ({'cursor': 'bogus'}, {'limit': 0}, {'view': 'tiny'}):
+            response = self.client.get('/api/officer/queue', params, **self.officer_auth)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
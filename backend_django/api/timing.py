@@ -0,0 +1,169 @@
+"""
+Lightweight per-stage timing hooks.
+
+Wrap a hot-path stage in ``with stage('nlp.tfidf'):``. Durations go to the
+configured sinks (see STAGE_TIMING_SINKS) and to the current request's
+trace when debug timing was requested. With no sinks and no trace,
+``stage()`` returns a shared no-op context manager, so disabled hooks cost
+one list check and one context variable lookup.
+"""
+import bisect
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_sinks: List['Sink'] = []
+_trace: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar('stage_trace', default=None)
+
+
+class Sink(ABC):
+    """Receives every stage duration, in milliseconds"""
+
+    @abstractmethod
+    def record(self, name: str, duration_ms: float):
+        """Called from the timed thread for every stage; keep it cheap"""
+
+
+class LogSink(Sink):
+    """Log each stage duration at DEBUG level"""
+
+    def record(self, name: str, duration_ms: float):
+        logger.debug("Stage %s took %.3fms", name, duration_ms)
+
+
+class HistogramSink(Sink):
+    """
+    In-memory latency histogram per stage with log-spaced buckets from
+    10µs to about 80s. Percentiles are the upper bound of the bucket that
+    contains them, so they are accurate to within a factor of two (None
+    when they fall past the last bucket).
+    """
+
+    BOUNDS_MS = [0.01 * 2 ** i for i in range(24)]
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages: Dict[str, list] = {}
+
+    def record(self, name: str, duration_ms: float):
+        bucket = bisect.bisect_left(self.BOUNDS_MS, duration_ms)
+        with self._lock:
+            entry = self._stages.get(name)
+            if entry is None:
+                # counts per bucket (+ overflow), count, total, max
+                entry = self._stages[name] = [[0] * (len(self.BOUNDS_MS) + 1), 0, 0.0, 0.0]
+            entry[0][bucket] += 1
+            entry[1] += 1
+            entry[2] += duration_ms
+            entry[3] = max(entry[3], duration_ms)
+
+    def _percentile(self, counts: List[int], total: int, q: float) -> Optional[float]:
+        rank = q * total
+        seen = 0
+        for bucket, count in enumerate(counts[:-1]):
+            seen += count
+            if seen >= rank:
+                return self.BOUNDS_MS[bucket]
+        return None
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            stages = {name: (list(entry[0]), entry[1], entry[2], entry[3]) for name, entry in self._stages.items()}
+        return {
+            name: {
+                'count': count,
+                'meanMs': round(total / count, 4),
+                'maxMs': round(maximum, 4),
+                'p50Ms': self._percentile(counts, count, 0.50),
+                'p95Ms': self._percentile(counts, count, 0.95),
+                'p99Ms': self._percentile(counts, count, 0.99),
+            }
+            for name, (counts, count, total, maximum) in sorted(stages.items())
+        }
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ('name', 'trace', 'start')
+
+    def __init__(self, name: str, trace):
+        self.name = name
+        self.trace = trace
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        duration_ms = (time.perf_counter() - self.start) * 1000
+        for sink in _sinks:
+            sink.record(self.name, duration_ms)
+        if self.trace is not None:
+            self.trace.append((self.name, duration_ms))
+        return False
+
+
+def stage(name: str):
+    """Context manager timing one stage (a no-op when timing is off)"""
+    trace = _trace.get()
+    if not _sinks and trace is None:
+        return _NULL_STAGE
+    return _Stage(name, trace)
+
+
+def configure(sink_names: Iterable[str]):
+    """
+    Install sinks by name: ``log``, ``histogram`` or the dotted path of a
+    Sink subclass. An empty list disables timing.
+    """
+    from django.utils.module_loading import import_string
+
+    builtin = {'log': LogSink, 'histogram': HistogramSink}
+    sinks = []
+    for name in sink_names:
+        name = name.strip()
+        if name:
+            sinks.append((builtin.get(name) or import_string(name))())
+    _sinks[:] = sinks
+
+
+def histogram() -> Optional[HistogramSink]:
+    """The configured histogram sink, if any"""
+    return next((sink for sink in _sinks if isinstance(sink, HistogramSink)), None)
+
+
+def start_trace():
+    """Collect the stages of the current request; returns a token for end_trace"""
+    return _trace.set([])
+
+
+def end_trace(token) -> List[Tuple[str, float]]:
+    trace = _trace.get() or []
+    _trace.reset(token)
+    return trace
+
+
+def server_timing(trace: List[Tuple[str, float]]) -> str:
+    """Format a trace as a Server-Timing header value"""
+    return ', '.join(f'{name};dur={duration_ms:.3f}' for name, duration_ms in trace)
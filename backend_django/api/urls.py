@@ -4,6 +4,7 @@ from . import views
 urlpatterns = [
     # Health check
     path('health', views.health_check, name='health_check'),
+    path('health/ready', views.readiness_check, name='readiness_check'),
     
     # Authentication
     path('auth/register', views.register, name='register'),
@@ -12,17 +13,26 @@ urlpatterns = [
     # Complaints
     path('complaints/submit', views.submit_complaint, name='submit_complaint'),
     path('complaints', views.get_complaints, name='get_complaints'),
+    path('complaints/search', views.search_complaints, name='search_complaints'),
+    path('officer/queue', views.officer_queue, name='officer_queue'),
     path('complaints/<str:complaint_id>', views.get_complaint, name='get_complaint'),
     path('complaints/<str:complaint_id>/status', views.update_status, name='update_status'),
+    path('complaints/<str:complaint_id>/department', views.update_department, name='update_department'),
+    path('complaints/<str:complaint_id>/similar', views.similar_complaints, name='similar_complaints'),
     
     # NLP
     path('nlp/classify', views.classify_text, name='classify_text'),
+    path('nlp/classify/batch', views.classify_text_batch, name='classify_text_batch'),
+    path('nlp/stats', views.nlp_stats, name='nlp_stats'),
+    path('metrics/timings', views.stage_timings, name='stage_timings'),
     
     # Departments
     path('departments', views.get_departments, name='get_departments'),
     
     # Analytics
     path('analytics', views.get_analytics, name='get_analytics'),
+    path('analytics/timeseries', views.analytics_timeseries, name='analytics_timeseries'),
+    path('analytics/reports/<str:report>', views.analytics_report, name='analytics_report'),
     
     # Notifications
     path('notifications', views.get_notifications, name='get_notifications'),
@@ -1,21 +1,34 @@
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
+from django.conf import settings
 from django.db import transaction
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 import bcrypt
 import datetime
 
-from .models import User, Department, Complaint, ComplaintHistory, Notification
+from .models import User, Department, Complaint, ComplaintDepartment, ComplaintHistory, Notification, AnalyticsSummary
 from .errors import StandardError, ERROR_CODES
 from .serializers import (
     UserSerializer, ComplaintSerializer, ComplaintHistorySerializer,
     NotificationSerializer, DepartmentSerializer, RegisterSerializer,
     LoginSerializer, ComplaintSubmitSerializer, StatusUpdateSerializer,
-    ClassifyTextSerializer
+    DepartmentUpdateSerializer, ClassifyTextSerializer, ClassifyBatchSerializer
 )
 from .auth import get_auth_user, generate_token, require_auth
 from .utils import generate_complaint_id
+from .pagination import InvalidCursor, keyset_page, queue_page
+from .fieldsets import InvalidFields, project, represent, requested_fields
+from .conditional import conditional, query_key
+from .routing import routing_fields, record_routing, reroute_complaint, route_confidences, sync_route_status, sync_routes
+from .timing import stage
+from . import timing
+from .job_queue import enqueue_classification
 from .nlp_classifier import classifier
+from . import analytics, duplicates, nlp_service, rollups, search, similar_index
+from .nlp_service import ClassificationTimeout
 
 
 @api_view(['GET'])
@@ -23,10 +36,25 @@ def health_check(request):
     """Health check endpoint"""
     return Response({
         'status': 'ok',
-        'message': 'Smart Griev Backend Running (Django + SQLite)'
+        'message': 'Smart Griev Backend Running (Django + SQLite)',
+        'nlp': nlp_service.readiness()
     }, status=status.HTTP_200_OK)
 
 
+@api_view(['GET'])
+def readiness_check(request):
+    """Readiness probe: 200 once the NLP model is loaded, 503 while it is cold"""
+    readiness = nlp_service.readiness()
+    if not readiness['ready']:
+        # Probing a cold worker starts loading it so it becomes routable
+        nlp_service.warm_up(background=True)
+    
+    return Response({
+        'status': 'ready' if readiness['ready'] else 'not_ready',
+        'nlp': readiness
+    }, status=status.HTTP_200_OK if readiness['ready'] else status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
 @api_view(['POST'])
 def register(request):
     """Register a new user"""
@@ -160,75 +188,127 @@ def submit_complaint(request):
     location = data.get('location')
     
     try:
-        with transaction.atomic():
-            # Classify complaint using NLP (with multi-department support)
-            nlp_result = classifier.classify_multi_department(description)
+        queued = nlp_service.execution_mode() == nlp_service.ASYNC
+        
+        # Classify complaint using NLP (with multi-department support) before
+        # opening the write transaction, so CPU-bound NLP never holds it open.
+        # In async mode the complaint is accepted now and routed by classify_worker.
+        nlp_result = None if queued else nlp_service.classify_complaint(description)
+        signature = None
+        if settings.DUPLICATE_DETECTION_ENABLED:
+            signature = duplicates.minhash(description, location)
+        
+        # Outside the write transaction: reserving a new block of IDs commits on its own
+        with stage('submit.complaint_id'):
             complaint_id = generate_complaint_id()
+        
+        with stage('submit.transaction'), transaction.atomic():
+            linked_duplicates = []
+            if signature is not None:
+                with stage('submit.duplicates'):
+                    linked_duplicates = duplicates.find_duplicates(
+                        signature,
+                        settings.DUPLICATE_SIMILARITY_THRESHOLD,
+                        settings.DUPLICATE_LOCATION_THRESHOLD,
+                        settings.DUPLICATE_MAX_LINKS
+                    )
+            duplicate_of = duplicates.cluster_root(linked_duplicates)
             
-            # Extract multi-department info
-            primary_department = nlp_result['predictedDepartment']
-            all_departments = nlp_result.get('departments', [primary_department])
-            is_multi_routing = nlp_result.get('multiDepartmentRouting', False)
-            
-            # Create complaint
-            complaint = Complaint.objects.create(
-                id=complaint_id,
-                user=user,
-                title=title,
-                description=description,
-                location=location,
-                status='Submitted',
-                department=primary_department,
-                primary_department=primary_department,
-                departments=all_departments,
-                priority=nlp_result['urgency'],
-                confidence_score=nlp_result['confidenceScore'],
-                nlp_analysis=nlp_result
-            )
+            if queued:
+                with stage('submit.insert_complaint'):
+                    complaint = Complaint.objects.create(
+                        id=complaint_id,
+                        user=user,
+                        title=title,
+                        description=description,
+                        location=location,
+                        status='Submitted',
+                        duplicate_of_id=duplicate_of,
+                        classification_status=Complaint.CLASSIFICATION_PENDING
+                    )
+                with stage('submit.enqueue'):
+                    enqueue_classification(complaint)
+            else:
+                with stage('submit.insert_complaint'):
+                    complaint = Complaint.objects.create(
+                        id=complaint_id,
+                        user=user,
+                        title=title,
+                        description=description,
+                        location=location,
+                        status='Submitted',
+                        duplicate_of_id=duplicate_of,
+                        **routing_fields(nlp_result)
+                    )
+                # Routing rows, history entry and notification
+                with stage('submit.record_routing'):
+                    sync_routes([complaint], {complaint.id: route_confidences(nlp_result)})
+                    record_routing(complaint, user, nlp_result)
+                with stage('submit.rollups'):
+                    rollups.record_submission(complaint)
             
-            # Create history entry
-            ComplaintHistory.objects.create(
-                complaint=complaint,
-                user=user,
-                action='Complaint Submitted',
-                status_from=None,
-                status_to='Submitted',
-                comment=f'Complaint routed to: {", ".join(all_departments)}'
-            )
-            
-            # Create notification with multi-department info
-            dept_message = f'{len(all_departments)} departments' if is_multi_routing else primary_department
-            Notification.objects.create(
-                user=user,
-                complaint=complaint,
-                type='complaint_submitted',
-                message=f'Your complaint {complaint_id} has been submitted and routed to {dept_message}'
-            )
-            
-            response_data = {
-                'id': complaint.id,
-                'user_id': str(user.id),
-                'title': complaint.title,
-                'description': complaint.description,
-                'location': complaint.location,
-                'status': complaint.status,
-                'department': complaint.department,
-                'departments': all_departments,
-                'primaryDepartment': primary_department,
-                'multiDepartmentRouting': is_multi_routing,
-                'priority': complaint.priority,
-                'confidence_score': complaint.confidence_score,
-                'nlp_analysis': complaint.nlp_analysis,
-                'date_submitted': complaint.date_submitted.isoformat(),
-                'date_updated': complaint.date_updated.isoformat(),
-                'userName': user.name
-            }
+            with stage('submit.analytics'):
+                analytics.record_change(None, analytics.snapshot(complaint))
             
+            if signature is not None:
+                with stage('submit.index_duplicates'):
+                    duplicates.index_complaint(complaint, signature)
+        
+        # Workers that never served a similarity search pick the complaint up on first use
+        index = similar_index.loaded_index()
+        if index is not None:
+            with stage('submit.index_similar'):
+                try:
+                    index.append(complaint.id, title, description, complaint.date_submitted)
+                except Exception:
+                    import logging
+                    logging.getLogger(__name__).exception("Failed to add %s to the similar-complaints index", complaint.id)
+        
+        all_departments = complaint.departments
+        response_data = {
+            'id': complaint.id,
+            'user_id': str(user.id),
+            'title': complaint.title,
+            'description': complaint.description,
+            'location': complaint.location,
+            'status': complaint.status,
+            'department': complaint.department,
+            'departments': all_departments,
+            'primaryDepartment': complaint.primary_department,
+            'multiDepartmentRouting': len(all_departments) > 1,
+            'classificationStatus': complaint.classification_status,
+            'duplicateOf': complaint.duplicate_of_id,
+            'linkedDuplicates': [
+                {'id': match['id'], 'similarity': match['similarity']} for match in linked_duplicates
+            ],
+            'priority': complaint.priority,
+            'confidence_score': complaint.confidence_score,
+            'nlp_analysis': complaint.nlp_analysis,
+            'date_submitted': complaint.date_submitted.isoformat(),
+            'date_updated': complaint.date_updated.isoformat(),
+            'userName': user.name
+        }
+        
+        if queued:
             return StandardError.success_response(
                 data=response_data,
-                message='Complaint submitted successfully',
-                status_code=status.HTTP_201_CREATED
+                message='Complaint accepted and queued for routing',
+                status_code=status.HTTP_202_ACCEPTED
             )
+        return StandardError.success_response(
+            data=response_data,
+            message='Complaint submitted successfully',
+            status_code=status.HTTP_201_CREATED
+        )
+    
+    except ClassificationTimeout as e:
+        return StandardError.error_response(
+            message='Complaint classification is taking too long, please retry',
+            error_code='NLP_TIMEOUT',
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            details={'error': str(e)},
+            log_level='warning'
+        )
     
     except Exception as e:
         import logging
@@ -240,24 +320,260 @@ def submit_complaint(request):
         )
 
 
+def scoped_complaints(user):
+    """
+    Complaints a user may list: their own (citizen), those routed to their
+    department as primary or secondary (officer) or all (admin)
+    """
+    if user.role == 'CITIZEN':
+        return Complaint.objects.filter(user=user)
+    if user.role == 'OFFICER':
+        return Complaint.objects.filter(routes__department=user.department)
+    return Complaint.objects.all()
+
+
+def department_page(department, fields, limit, cursor):
+    """
+    A page of a department's complaints, newest first: the page is found on
+    the routing table's (department, date) index, then only its complaints
+    are loaded
+    """
+    routes = ComplaintDepartment.objects.filter(department=department).only('complaint_id', 'date_submitted')
+    routes, next_cursor = keyset_page(routes, limit, cursor, id_field='complaint_id')
+    return routed_complaints(routes, fields), next_cursor
+
+
+def routed_complaints(routes, fields):
+    """The complaints of a page of routing rows, in page order, reading only ``fields``"""
+    complaints = project(Complaint.objects.filter(id__in=[route.complaint_id for route in routes]), fields)
+    by_id = complaints.order_by().in_bulk()
+    return [by_id[route.complaint_id] for route in routes if route.complaint_id in by_id]
+
+
+LIST_FIELDS = (
+    'id', 'user_id', 'userName', 'title', 'description', 'location', 'status', 'department',
+    'priority', 'confidence_score', 'nlp_analysis', 'date_submitted', 'date_updated'
+)
+DETAIL_FIELDS = LIST_FIELDS + ('duplicateOf', 'linkedDuplicates', 'history', 'attachments')
+STATUS_UPDATE_FIELDS = tuple(name for name in LIST_FIELDS if name != 'userName')
+
+
+def complaint_list_validators(request):
+    """
+    The caller's scope changes whenever a row in it is added, updated or
+    removed. Only the ETag sees removals (through the count): a complaint
+    deleted or re-routed away does not raise max(date_updated), so the list
+    has no Last-Modified.
+    """
+    user = request.user_obj
+    scope = scoped_complaints(user).aggregate(last_updated=Max('date_updated'), count=Count('id'))
+    return (user.id, user.role, user.department, scope['count'], scope['last_updated'], query_key(request)), None
+
+
 @api_view(['GET'])
 @require_auth
+@conditional(complaint_list_validators)
 def get_complaints(request):
-    """Get complaints based on user role"""
+    """
+    Get complaints based on user role, newest first, one page at a time.
+    
+    The body stays a plain list; the next page's cursor is returned in the
+    X-Next-Cursor header and a Link rel="next" header (absent on the last page).
+    ?view=summary or ?fields=... select the fields (and columns read).
+    """
     user = request.user_obj
     
     try:
-        if user.role == 'CITIZEN':
-            complaints = Complaint.objects.filter(user=user).order_by('-date_submitted')
-        elif user.role == 'OFFICER':
-            complaints = Complaint.objects.filter(department=user.department).order_by('-date_submitted')
-        else:  # ADMIN
-            complaints = Complaint.objects.all().order_by('-date_submitted')
+        fields = requested_fields(request.query_params, LIST_FIELDS)
+    except InvalidFields as e:
+        return StandardError.validation_error({'fields': [str(e)]})
+    try:
+        limit = int(request.query_params.get('limit', settings.COMPLAINTS_PAGE_SIZE))
+    except ValueError:
+        return StandardError.validation_error({'limit': ['Must be an integer']})
+    if not 1 <= limit <= settings.COMPLAINTS_MAX_PAGE_SIZE:
+        return StandardError.validation_error(
+            {'limit': [f'Must be between 1 and {settings.COMPLAINTS_MAX_PAGE_SIZE}']}
+        )
+    
+    try:
+        try:
+            if user.role == 'OFFICER':
+                page, next_cursor = department_page(user.department, fields, limit, request.query_params.get('cursor'))
+            else:
+                # The cursor needs date_submitted even when it is not returned
+                complaints = project(scoped_complaints(user), fields, extra_columns=('date_submitted',))
+                page, next_cursor = keyset_page(complaints, limit, request.query_params.get('cursor'))
+        except InvalidCursor as e:
+            return StandardError.validation_error({'cursor': [str(e)]})
         
-        # Serialize complaints
-        result = []
-        for complaint in complaints:
-            data = {
+        result = [represent(complaint, fields) for complaint in page]
+        
+        response = Response(result, status=status.HTTP_200_OK)
+        if next_cursor:
+            params = request.query_params.copy()
+            params['cursor'] = next_cursor
+            params['limit'] = limit
+            response['X-Next-Cursor'] = next_cursor
+            response['Link'] = f'<{request.build_absolute_uri(request.path)}?{params.urlencode()}>; rel="next"'
+        return response
+    
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+@require_auth
+def officer_queue(request):
+    """
+    Open complaints routed to the officer's department (an admin passes
+    ?department=), most urgent first and oldest first within a priority.
+    Paged with ?limit= and ?cursor= (nextCursor); summary fields by default.
+    """
+    user = request.user_obj
+    if user.role == 'OFFICER':
+        department = user.department
+        if not department:
+            return StandardError.permission_error('Officer is not assigned to a department')
+    elif user.role == 'ADMIN':
+        department = request.query_params.get('department')
+        if not department:
+            return StandardError.validation_error({'department': ['This parameter is required for administrators']})
+    else:
+        return StandardError.permission_error('Only officers and administrators have a work queue')
+    
+    params = request.query_params.copy()
+    if 'fields' not in params:
+        params.setdefault('view', 'summary')
+    try:
+        fields = requested_fields(params, LIST_FIELDS)
+    except InvalidFields as e:
+        return StandardError.validation_error({'fields': [str(e)]})
+    try:
+        limit = int(request.query_params.get('limit', settings.OFFICER_QUEUE_PAGE_SIZE))
+    except ValueError:
+        return StandardError.validation_error({'limit': ['Must be an integer']})
+    if not 1 <= limit <= settings.COMPLAINTS_MAX_PAGE_SIZE:
+        return StandardError.validation_error(
+            {'limit': [f'Must be between 1 and {settings.COMPLAINTS_MAX_PAGE_SIZE}']}
+        )
+    
+    try:
+        # Ordered and paged on the routing table's queue index alone
+        routes = (ComplaintDepartment.objects
+                  .filter(department=department, is_open=True)
+                  .only('complaint_id', 'priority_rank', 'date_submitted'))
+        try:
+            routes, next_cursor = queue_page(routes, limit, request.query_params.get('cursor'))
+        except InvalidCursor as e:
+            return StandardError.validation_error({'cursor': [str(e)]})
+        
+        return StandardError.success_response(data={
+            'department': department,
+            'results': [represent(complaint, fields) for complaint in routed_complaints(routes, fields)],
+            'nextCursor': next_cursor,
+            'hasMore': next_cursor is not None
+        })
+    
+    except Exception as e:
+        return StandardError.server_error(message='Failed to load work queue', details={'error': str(e)})
+
+
+def complaint_validators(request, complaint_id):
+    """A complaint's representation also changes with its history and linked duplicates"""
+    row = Complaint.objects.filter(id=complaint_id).aggregate(
+        date_updated=Max('date_updated'),
+        last_history=Max('history__created_at'),
+        last_linked=Max('linked_duplicates__date_submitted'),
+        linked=Count('linked_duplicates', distinct=True)
+    )
+    if row['date_updated'] is None:
+        return None
+    last_modified = max(value for value in (row['date_updated'], row['last_history'], row['last_linked']) if value)
+    return (complaint_id, *row.values(), query_key(request)), last_modified
+
+
+@api_view(['GET'])
+@require_auth
+@conditional(complaint_validators)
+def get_complaint(request, complaint_id):
+    """Get a single complaint by ID (?view=summary or ?fields=... select the fields)"""
+    user = request.user_obj
+    
+    try:
+        fields = requested_fields(request.query_params, DETAIL_FIELDS)
+    except InvalidFields as e:
+        return StandardError.validation_error({'fields': [str(e)]})
+    
+    try:
+        complaint = project(Complaint.objects.filter(id=complaint_id), fields).first()
+        if not complaint:
+            return Response({'error': 'Complaint not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        extra = {'attachments': []}
+        if 'history' in fields:
+            history = ComplaintHistory.objects.filter(complaint=complaint).order_by('-created_at')
+            extra['history'] = [
+                {
+                    'id': h.id,
+                    'complaint_id': h.complaint_id,
+                    'user_id': str(h.user_id),
+                    'action': h.action,
+                    'status_from': h.status_from,
+                    'status_to': h.status_to,
+                    'comment': h.comment,
+                    'created_at': h.created_at.isoformat()
+                }
+                for h in history
+            ]
+        if 'linkedDuplicates' in fields:
+            extra['linkedDuplicates'] = list(
+                complaint.linked_duplicates.order_by('id').values_list('id', flat=True)
+            )
+        
+        return Response(represent(complaint, fields, extra), status=status.HTTP_200_OK)
+    
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+SEARCH_PAGE_SIZE = 20
+SEARCH_MAX_PAGE_SIZE = 100
+
+
+@api_view(['GET'])
+@require_auth
+def search_complaints(request):
+    """Full-text search over the complaints a user may list, ranked by relevance"""
+    user = request.user_obj
+    
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        return StandardError.validation_error({'q': ['This parameter is required']})
+    try:
+        page = int(request.query_params.get('page', 1))
+        page_size = int(request.query_params.get('page_size', SEARCH_PAGE_SIZE))
+    except ValueError:
+        return StandardError.validation_error({'page': ['page and page_size must be integers']})
+    if page < 1 or not 1 <= page_size <= SEARCH_MAX_PAGE_SIZE:
+        return StandardError.validation_error(
+            {'page': [f'page must be positive and page_size between 1 and {SEARCH_MAX_PAGE_SIZE}']}
+        )
+    if not search.is_supported():
+        return StandardError.error_response(
+            message='Full-text search requires the SQLite backend',
+            error_code='SEARCH_UNAVAILABLE',
+            status_code=status.HTTP_501_NOT_IMPLEMENTED
+        )
+    
+    try:
+        with stage('search.match'):
+            matches, total = search.search(scoped_complaints(user), query, page_size, (page - 1) * page_size)
+        found = Complaint.objects.select_related('user').in_bulk([complaint_id for complaint_id, _ in matches])
+        results = []
+        for complaint_id, score in matches:
+            complaint = found[complaint_id]
+            results.append({
                 'id': complaint.id,
                 'user_id': str(complaint.user.id),
                 'userName': complaint.user.name,
@@ -267,67 +583,87 @@ def get_complaints(request):
                 'status': complaint.status,
                 'department': complaint.department,
                 'priority': complaint.priority,
-                'confidence_score': complaint.confidence_score,
-                'nlp_analysis': complaint.nlp_analysis,
                 'date_submitted': complaint.date_submitted.isoformat(),
-                'date_updated': complaint.date_updated.isoformat()
-            }
-            result.append(data)
-        
-        return Response(result, status=status.HTTP_200_OK)
+                'date_updated': complaint.date_updated.isoformat(),
+                # bm25 is lower-is-better; flip it so higher means more relevant
+                'score': round(-score, 4)
+            })
+        return StandardError.success_response(data={
+            'query': query,
+            'results': results,
+            'total': total,
+            'page': page,
+            'pageSize': page_size,
+            'hasMore': page * page_size < total
+        })
     
     except Exception as e:
-        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        return StandardError.server_error(message='Failed to search complaints', details={'error': str(e)})
+
+
+SIMILAR_STATUS_FILTERS = {
+    'resolved': ['Resolved', 'Closed'],
+    'open': Complaint.OPEN_STATUSES,
+    'all': None,
+}
 
 
 @api_view(['GET'])
 @require_auth
-def get_complaint(request, complaint_id):
-    """Get a single complaint by ID"""
+def similar_complaints(request, complaint_id):
+    """Past complaints most similar to a complaint (Officer/Admin)"""
     user = request.user_obj
+    if user.role not in ['OFFICER', 'ADMIN']:
+        return StandardError.permission_error('Only officers and administrators can search similar complaints')
     
+    status_filter = request.query_params.get('status', 'resolved')
+    if status_filter not in SIMILAR_STATUS_FILTERS:
+        return StandardError.validation_error({'status': [f'Must be one of: {", ".join(SIMILAR_STATUS_FILTERS)}']})
     try:
-        complaint = Complaint.objects.filter(id=complaint_id).first()
-        if not complaint:
-            return Response({'error': 'Complaint not found'}, status=status.HTTP_404_NOT_FOUND)
-        
-        # Get history
-        history = ComplaintHistory.objects.filter(complaint=complaint).order_by('-created_at')
-        history_data = []
-        for h in history:
-            history_data.append({
-                'id': h.id,
-                'complaint_id': h.complaint.id,
-                'user_id': str(h.user.id),
-                'action': h.action,
-                'status_from': h.status_from,
-                'status_to': h.status_to,
-                'comment': h.comment,
-                'created_at': h.created_at.isoformat()
-            })
-        
-        response_data = {
-            'id': complaint.id,
-            'user_id': str(complaint.user.id),
-            'userName': complaint.user.name,
-            'title': complaint.title,
-            'description': complaint.description,
-            'location': complaint.location,
-            'status': complaint.status,
-            'department': complaint.department,
-            'priority': complaint.priority,
-            'confidence_score': complaint.confidence_score,
-            'nlp_analysis': complaint.nlp_analysis,
-            'date_submitted': complaint.date_submitted.isoformat(),
-            'date_updated': complaint.date_updated.isoformat(),
-            'history': history_data,
-            'attachments': []
-        }
-        
-        return Response(response_data, status=status.HTTP_200_OK)
+        k = int(request.query_params.get('k', 10))
+    except ValueError:
+        return StandardError.validation_error({'k': ['Must be an integer']})
+    if not 1 <= k <= settings.SIMILAR_MAX_RESULTS:
+        return StandardError.validation_error({'k': [f'Must be between 1 and {settings.SIMILAR_MAX_RESULTS}']})
+    
+    complaint = Complaint.objects.filter(id=complaint_id).only('id', 'title', 'description').first()
+    if not complaint:
+        return StandardError.not_found_error(ERROR_CODES['COMPLAINT_NOT_FOUND'])
+    
+    try:
+        with stage('similar.search'):
+            matches = similar_index.get_index().search(
+                similar_index.complaint_text(complaint.title, complaint.description),
+                k=k,
+                exclude_id=complaint.id,
+                statuses=SIMILAR_STATUS_FILTERS[status_filter]
+            )
+        found = Complaint.objects.only(
+            'id', 'title', 'status', 'primary_department', 'date_submitted'
+        ).in_bulk([complaint_id for complaint_id, _ in matches])
+        results = [
+            {
+                'id': match_id,
+                'title': found[match_id].title,
+                'status': found[match_id].status,
+                'department': found[match_id].primary_department,
+                'similarity': score,
+                'date_submitted': found[match_id].date_submitted.isoformat()
+            }
+            for match_id, score in matches if match_id in found
+        ]
+        return StandardError.success_response(data={'complaintId': complaint.id, 'results': results})
+    
+    except similar_index.IndexNotReady:
+        return StandardError.error_response(
+            message='The similar-complaints index is being built, please retry shortly',
+            error_code='SIMILAR_INDEX_UNAVAILABLE',
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            log_level='warning'
+        )
     
     except Exception as e:
-        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        return StandardError.server_error(message='Failed to search similar complaints', details={'error': str(e)})
 
 
 @api_view(['PUT'])
@@ -343,18 +679,33 @@ def update_status(request, complaint_id):
     new_status = serializer.validated_data.get('status')
     comment = serializer.validated_data.get('comment', '')
     
+    try:
+        fields = requested_fields(request.query_params, STATUS_UPDATE_FIELDS)
+    except InvalidFields as e:
+        return StandardError.validation_error({'fields': [str(e)]})
+    
     try:
         with transaction.atomic():
-            complaint = Complaint.objects.filter(id=complaint_id).first()
+            complaint = project(
+                Complaint.objects.filter(id=complaint_id), fields,
+                extra_columns=(
+                    'status', 'user', 'date_updated', 'primary_department', 'priority', 'date_submitted', 'date_resolved'
+                )
+            ).first()
             if not complaint:
                 return Response({'error': 'Complaint not found'}, status=status.HTTP_404_NOT_FOUND)
             
             old_status = complaint.status
+            before = analytics.snapshot(complaint)
             complaint.status = new_status
-            complaint.save()
+            if new_status == 'Resolved' and old_status != 'Resolved':
+                complaint.date_resolved = timezone.now()
+            complaint.save(update_fields=['status', 'date_updated', 'date_resolved'])
+            analytics.record_change(before, analytics.snapshot(complaint))
+            sync_route_status(complaint)
             
             # Create history entry
-            ComplaintHistory.objects.create(
+            history = ComplaintHistory.objects.create(
                 complaint=complaint,
                 user=user,
                 action='Status Updated',
@@ -362,29 +713,17 @@ def update_status(request, complaint_id):
                 status_to=new_status,
                 comment=comment
             )
+            rollups.record_event(complaint, new_status, history.created_at)
             
             # Create notification
             Notification.objects.create(
-                user=complaint.user,
+                user_id=complaint.user_id,
                 complaint=complaint,
                 type='status_updated',
                 message=f'Your complaint {complaint_id} status has been updated to {new_status}'
             )
             
-            response_data = {
-                'id': complaint.id,
-                'user_id': str(complaint.user.id),
-                'title': complaint.title,
-                'description': complaint.description,
-                'location': complaint.location,
-                'status': complaint.status,
-                'department': complaint.department,
-                'priority': complaint.priority,
-                'confidence_score': complaint.confidence_score,
-                'nlp_analysis': complaint.nlp_analysis,
-                'date_submitted': complaint.date_submitted.isoformat(),
-                'date_updated': complaint.date_updated.isoformat()
-            }
+            response_data = represent(complaint, fields)
             
             return Response(response_data, status=status.HTTP_200_OK)
     
@@ -392,6 +731,50 @@ def update_status(request, complaint_id):
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@api_view(['PUT'])
+@require_auth
+def update_department(request, complaint_id):
+    """Re-route a complaint to another department (Officer/Admin); corrections feed online learning"""
+    user = request.user_obj
+    if user.role not in ['OFFICER', 'ADMIN']:
+        return StandardError.permission_error('Only officers and administrators can re-route complaints')
+    
+    serializer = DepartmentUpdateSerializer(data=request.data)
+    if not serializer.is_valid():
+        return StandardError.validation_error(serializer.errors)
+    
+    department = serializer.validated_data.get('department')
+    comment = serializer.validated_data.get('comment', '')
+    
+    if not Department.objects.filter(name=department).exists():
+        return StandardError.validation_error({'department': [f'Unknown department: {department}']})
+    
+    try:
+        with transaction.atomic():
+            complaint = Complaint.objects.select_for_update().filter(id=complaint_id).first()
+            if not complaint:
+                return StandardError.not_found_error(ERROR_CODES['COMPLAINT_NOT_FOUND'])
+            
+            if user.role == 'OFFICER' and user.department not in complaint.get_departments_list():
+                return StandardError.permission_error('Officers can only re-route complaints routed to their department')
+            
+            rerouted = reroute_complaint(complaint, department, user, comment)
+        
+        return StandardError.success_response(
+            data={
+                'id': complaint.id,
+                'department': complaint.department,
+                'primaryDepartment': complaint.primary_department,
+                'departments': complaint.departments,
+                'date_updated': complaint.date_updated.isoformat()
+            },
+            message='Complaint re-routed' if rerouted else 'Complaint already routed to this department'
+        )
+    
+    except Exception as e:
+        return StandardError.server_error(message='Failed to re-route complaint', details={'error': str(e)})
+
+
 @api_view(['POST'])
 @require_auth
 def classify_text(request):
@@ -403,12 +786,64 @@ def classify_text(request):
     text = serializer.validated_data.get('text')
     
     try:
-        result = classifier.classify(text)
+        result = nlp_service.classify_complaint(text, confidence_threshold=0.6)
         return Response(result, status=status.HTTP_200_OK)
+    except ClassificationTimeout as e:
+        return Response({'error': str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@api_view(['POST'])
+@require_auth
+def classify_text_batch(request):
+    """Classify a batch of texts using NLP in one vectorized pass"""
+    serializer = ClassifyBatchSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response({'error': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+    
+    texts = serializer.validated_data.get('texts')
+    
+    try:
+        results = nlp_service.classify_batch(texts, confidence_threshold=0.6)
+        return Response(results, status=status.HTTP_200_OK)
+    except ClassificationTimeout as e:
+        return Response({'error': str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+@require_auth
+def nlp_stats(request):
+    """NLP model state and classification cache counters (Admin only)"""
+    user = request.user_obj
+    if user.role != 'ADMIN':
+        return StandardError.permission_error('Only administrators can view NLP statistics')
+    
+    # Do not load a cold model just to report on it
+    cache = classifier.cache if classifier.is_ready else None
+    return Response({
+        'model': classifier.readiness(),
+        'cache': cache.stats() if cache is not None else None
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@require_auth
+def stage_timings(request):
+    """Per-stage latency histograms from the histogram timing sink (Admin only)"""
+    user = request.user_obj
+    if user.role != 'ADMIN':
+        return StandardError.permission_error('Only administrators can view timing metrics')
+    
+    sink = timing.histogram()
+    return Response({
+        'enabled': sink is not None,
+        'stages': sink.snapshot() if sink is not None else {}
+    }, status=status.HTTP_200_OK)
+
+
 @api_view(['GET'])
 def get_departments(request):
     """Get all departments"""
@@ -421,44 +856,144 @@ def get_departments(request):
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+def analytics_validators(request):
+    totals = AnalyticsSummary.objects.aggregate(last_updated=Max('updated_at'), rows=Count('id'))
+    return (totals['rows'], totals['last_updated']), totals['last_updated']
+
+
 @api_view(['GET'])
 @require_auth
+@conditional(analytics_validators)
 def get_analytics(request):
-    """Get analytics data"""
+    """Get analytics data from the incrementally maintained summary"""
     try:
-        complaints = Complaint.objects.all()
-        
-        total = complaints.count()
-        pending = complaints.exclude(status__in=['Resolved', 'Closed']).count()
-        resolved = complaints.filter(status='Resolved').count()
-        
-        # Calculate average resolution time
-        resolved_complaints = complaints.filter(status='Resolved')
-        if resolved_complaints.exists():
-            total_time = 0
-            count = 0
-            for c in resolved_complaints:
-                days = (c.date_updated - c.date_submitted).days
-                total_time += days
-                count += 1
-            avg_days = total_time / count if count > 0 else 0
-            avg_resolution_time = f"{avg_days:.1f} Days"
-        else:
-            avg_resolution_time = "N/A"
-        
-        return Response({
-            'total': total,
-            'pending': pending,
-            'resolved': resolved,
-            'avgResolutionTime': avg_resolution_time
-        }, status=status.HTTP_200_OK)
+        return Response(analytics.report(), status=status.HTTP_200_OK)
     
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+TIMESERIES_DEFAULT_SPAN = {'hour': datetime.timedelta(days=2), 'day': datetime.timedelta(days=30)}
+TIMESERIES_MAX_BUCKETS = 1000
+
+
+def parse_moment(value: str):
+    """ISO date or datetime query parameter as an aware datetime (naive values are UTC)"""
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f'Invalid date: {value}')
+        moment = datetime.datetime.combine(day, datetime.time())
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment, datetime.timezone.utc)
+    return moment
+
+
+@api_view(['GET'])
+@require_auth
+def analytics_timeseries(request):
+    """
+    Complaint event counts and resolution times per hour or day, optionally
+    grouped by department, priority and/or status (answered from rollups)
+    """
+    params = request.query_params
+    granularity = params.get('bucket', 'day')
+    if granularity not in rollups.GRANULARITIES:
+        return StandardError.validation_error({'bucket': [f'Must be one of: {", ".join(rollups.GRANULARITIES)}']})
+    
+    group_by = [name.strip() for name in params.get('group_by', '').split(',') if name.strip()]
+    unknown = [name for name in group_by if name not in rollups.GROUP_FIELDS]
+    if unknown:
+        return StandardError.validation_error(
+            {'group_by': [f'Unknown: {", ".join(unknown)}. Available: {", ".join(rollups.GROUP_FIELDS)}']}
+        )
+    
+    statuses = [name.strip() for name in params.get('status', '').split(',') if name.strip()]
+    valid_statuses = [choice for choice, _ in Complaint.STATUS_CHOICES]
+    if any(name not in valid_statuses for name in statuses):
+        return StandardError.validation_error({'status': [f'Must be one of: {", ".join(valid_statuses)}']})
+    
+    try:
+        end = parse_moment(params['to']) if params.get('to') else timezone.now()
+        start = parse_moment(params['from']) if params.get('from') else end - TIMESERIES_DEFAULT_SPAN[granularity]
+    except ValueError as e:
+        return StandardError.validation_error({'from': [str(e)]})
+    bucket_size = datetime.timedelta(hours=1) if granularity == 'hour' else datetime.timedelta(days=1)
+    if start >= end:
+        return StandardError.validation_error({'from': ['Must be before to']})
+    if (end - start) / bucket_size > TIMESERIES_MAX_BUCKETS:
+        return StandardError.validation_error(
+            {'from': [f'At most {TIMESERIES_MAX_BUCKETS} {granularity} buckets per request']}
+        )
+    
+    try:
+        series = rollups.timeseries(granularity, start, end, group_by, statuses)
+        return StandardError.success_response(data={
+            'bucket': granularity,
+            'from': start.isoformat(),
+            'to': end.isoformat(),
+            'groupBy': group_by,
+            'status': statuses,
+            'series': series
+        })
+    
+    except Exception as e:
+        return StandardError.server_error(message='Failed to load analytics time series', details={'error': str(e)})
+
+
+@api_view(['GET'])
+@require_auth
+def analytics_report(request, report):
+    """Vectorized report over the latest columnar snapshot (Admin only, never queries complaints)"""
+    user = request.user_obj
+    if user.role != 'ADMIN':
+        return StandardError.permission_error('Only administrators can view analytics reports')
+    
+    # Imported here: loading the snapshot engine pulls in pandas and pyarrow
+    from . import snapshots
+    
+    if report not in snapshots.SnapshotEngine.REPORTS:
+        return StandardError.not_found_error(
+            f'Unknown report: {report}. Available: {", ".join(snapshots.SnapshotEngine.REPORTS)}'
+        )
+    if report not in snapshots.SnapshotEngine.WINDOWED and 'window_days' in request.query_params:
+        return StandardError.validation_error({'window_days': [f'The {report} report has no window']})
+    try:
+        window_days = int(request.query_params.get('window_days', 30))
+    except ValueError:
+        return StandardError.validation_error({'window_days': ['Must be an integer']})
+    if not 1 <= window_days <= 3650:
+        return StandardError.validation_error({'window_days': ['Must be between 1 and 3650']})
+    
+    try:
+        engine = snapshots.get_engine()
+        if engine is None:
+            return StandardError.error_response(
+                message='No analytics snapshot yet; run manage.py export_snapshot',
+                error_code='SNAPSHOT_UNAVAILABLE',
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+        with stage('analytics.report'):
+            data = engine.report(report, window_days)
+        return StandardError.success_response(data=data)
+    
+    except Exception as e:
+        return StandardError.server_error(message='Failed to build analytics report', details={'error': str(e)})
+
+
+def notification_validators(request):
+    """Marking a notification read changes no timestamp, so these only have an ETag"""
+    user = request.user_obj
+    totals = Notification.objects.filter(user=user).aggregate(
+        latest=Max('id'), count=Count('id'), unread=Count('id', filter=Q(is_read=False))
+    )
+    return (user.id, totals['latest'], totals['count'], totals['unread']), None
+
+
 @api_view(['GET'])
 @require_auth
+@conditional(notification_validators)
 def get_notifications(request):
     """Get user notifications"""
     user = request.user_obj
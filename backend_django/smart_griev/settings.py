@@ -58,6 +58,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'api.middleware.RequestLoggingMiddleware',
+    'api.middleware.StageTimingMiddleware',
     'api.middleware.ErrorResponseMiddleware',
 ]
 
@@ -147,7 +148,11 @@ CORS_ALLOW_HEADERS = [
     'user-agent',
     'x-csrftoken',
     'x-requested-with',
+    'if-none-match',
+    'if-modified-since',
 ]
+# Pagination and cache validator headers, readable by browser clients
+CORS_EXPOSE_HEADERS = ['link', 'x-next-cursor', 'etag']
 
 # CSRF Settings - Disable for API-only backend
 CSRF_TRUSTED_ORIGINS = [
@@ -172,6 +177,72 @@ JWT_SECRET_KEY = SECRET_KEY
 JWT_ALGORITHM = 'HS256'
 JWT_EXPIRATION_DAYS = 7
 
+# NLP Classifier Settings
+NLP_BATCH_MAX_SIZE = int(os.getenv('NLP_BATCH_MAX_SIZE', '500'))
+# Load the classifier in a background thread at startup instead of on the first request
+NLP_WARMUP_ON_START = os.getenv('NLP_WARMUP_ON_START', 'False') == 'True'
+# Versioned model artifacts (see api/model_store.py)
+NLP_MODEL_DIR = Path(os.getenv('NLP_MODEL_DIR', BASE_DIR / 'models'))
+# Seconds between checks for a newly promoted model version
+NLP_MODEL_CHECK_INTERVAL = float(os.getenv('NLP_MODEL_CHECK_INTERVAL', '30'))
+# Per-process classification result cache (0 entries disables it)
+NLP_CACHE_MAX_ENTRIES = int(os.getenv('NLP_CACHE_MAX_ENTRIES', '2048'))
+NLP_CACHE_TTL = float(os.getenv('NLP_CACHE_TTL', '600'))
+# 'inline' classifies in the request thread, 'process' in a pool of worker processes,
+# 'async' queues submissions for `manage.py classify_worker`
+NLP_EXECUTION_MODE = os.getenv('NLP_EXECUTION_MODE', 'inline')
+NLP_POOL_WORKERS = int(os.getenv('NLP_POOL_WORKERS', '2'))
+NLP_POOL_START_METHOD = os.getenv('NLP_POOL_START_METHOD', 'spawn')
+# Seconds a request waits for the process pool before giving up
+NLP_CLASSIFY_TIMEOUT = float(os.getenv('NLP_CLASSIFY_TIMEOUT', '10'))
+# Sentiment engine behind urgency and sentiment labels: 'textblob' or 'lexicon' (built-in, faster)
+NLP_SENTIMENT_ENGINE = os.getenv('NLP_SENTIMENT_ENGINE', 'textblob')
+# Async classification queue
+NLP_WORKER_BATCH_SIZE = int(os.getenv('NLP_WORKER_BATCH_SIZE', '32'))
+NLP_JOB_LEASE_SECONDS = float(os.getenv('NLP_JOB_LEASE_SECONDS', '300'))
+NLP_JOB_MAX_ATTEMPTS = int(os.getenv('NLP_JOB_MAX_ATTEMPTS', '3'))
+# Sample weight of each officer correction in `manage.py learn_from_feedback`
+NLP_FEEDBACK_WEIGHT = float(os.getenv('NLP_FEEDBACK_WEIGHT', '5'))
+
+# GET /api/complaints page size (?limit=) and its cap; pages are keyset-paginated
+COMPLAINTS_PAGE_SIZE = int(os.getenv('COMPLAINTS_PAGE_SIZE', '100'))
+COMPLAINTS_MAX_PAGE_SIZE = int(os.getenv('COMPLAINTS_MAX_PAGE_SIZE', '500'))
+# GET /api/officer/queue page size (same cap)
+OFFICER_QUEUE_PAGE_SIZE = int(os.getenv('OFFICER_QUEUE_PAGE_SIZE', '50'))
+
+# Near-duplicate detection (see api/duplicates.py): estimated Jaccard similarity of
+# description and location shingles an open complaint needs to be linked as a duplicate
+DUPLICATE_DETECTION_ENABLED = os.getenv('DUPLICATE_DETECTION_ENABLED', 'True') == 'True'
+DUPLICATE_SIMILARITY_THRESHOLD = float(os.getenv('DUPLICATE_SIMILARITY_THRESHOLD', '0.5'))
+DUPLICATE_LOCATION_THRESHOLD = float(os.getenv('DUPLICATE_LOCATION_THRESHOLD', '0.3'))
+DUPLICATE_MAX_LINKS = int(os.getenv('DUPLICATE_MAX_LINKS', '10'))
+
+# Similar-complaints vector index (see api/similar_index.py), compacted by
+# `manage.py build_similar_index`; each worker memory-maps the live generation
+SIMILAR_INDEX_DIR = Path(os.getenv('SIMILAR_INDEX_DIR', NLP_MODEL_DIR / 'similar'))
+SIMILAR_MAX_RESULTS = int(os.getenv('SIMILAR_MAX_RESULTS', '50'))
+# Seconds between database catch-ups of other workers' submissions
+SIMILAR_CATCH_UP_INTERVAL = float(os.getenv('SIMILAR_CATCH_UP_INTERVAL', '5'))
+# In-memory delta size at which a worker compacts in the background
+SIMILAR_MAX_DELTA_ROWS = int(os.getenv('SIMILAR_MAX_DELTA_ROWS', '5000'))
+# Best matches checked against the status filter per search
+SIMILAR_MAX_CANDIDATES = int(os.getenv('SIMILAR_MAX_CANDIDATES', '2000'))
+
+# Complaint numbers each process reserves at a time (see api/complaint_ids.py);
+# numbers left unused when a process exits are skipped
+COMPLAINT_ID_BLOCK_SIZE = int(os.getenv('COMPLAINT_ID_BLOCK_SIZE', '20'))
+
+# Columnar analytics snapshots (see api/snapshots.py), refreshed by `manage.py export_snapshot`;
+# compression is zstd, lz4 or uncompressed
+ANALYTICS_SNAPSHOT_DIR = Path(os.getenv('ANALYTICS_SNAPSHOT_DIR', BASE_DIR / 'snapshots'))
+ANALYTICS_SNAPSHOT_COMPRESSION = os.getenv('ANALYTICS_SNAPSHOT_COMPRESSION', 'zstd')
+
+# Stage timing hooks (see api/timing.py): comma-separated sinks, e.g. "log,histogram"
+# or dotted paths of custom Sink classes; empty disables timing
+STAGE_TIMING_SINKS = [s for s in os.getenv('STAGE_TIMING_SINKS', '').split(',') if s.strip()]
+# Return a Server-Timing header for requests that send X-Debug-Timing: 1
+STAGE_TIMING_DEBUG = os.getenv('STAGE_TIMING_DEBUG', 'False') == 'True'
+
 # File Upload Settings
 ALLOWED_FILE_TYPES = ['image/jpeg', 'image/png', 'image/gif', 'application/pdf', 'application/msword']
 MAX_FILE_SIZE = 10 * 1024 * 1024
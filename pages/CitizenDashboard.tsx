@@ -13,6 +13,8 @@ const CitizenDashboard: React.FC<Props> = ({ user }) => {
   const [activeTab, setActiveTab] = useState<'submit' | 'list'>('list');
   const [complaints, setComplaints] = useState<Complaint[]>([]);
   const [loading, setLoading] = useState(false);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [selectedComplaint, setSelectedComplaint] = useState<Complaint | null>(null);
   
   // Form State
@@ -29,11 +31,21 @@ const CitizenDashboard: React.FC<Props> = ({ user }) => {
 
   const loadComplaints = async () => {
     setLoading(true);
-    const data = await api.getComplaints(user.role);
-    setComplaints(data);
+    const page = await api.getComplaints(user.role);
+    setComplaints(page.complaints);
+    setNextCursor(page.nextCursor);
     setLoading(false);
   };
 
+  const loadMoreComplaints = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    const page = await api.getComplaints(user.role, undefined, nextCursor);
+    setComplaints(prev => [...prev, ...page.complaints]);
+    setNextCursor(page.nextCursor);
+    setLoadingMore(false);
+  };
+
   const handleFileChange = (e: React.ChangeEvent<HTMLInputElement>) => {
     if (e.target.files) {
       setFiles(Array.from(e.target.files));
@@ -120,6 +132,18 @@ const CitizenDashboard: React.FC<Props> = ({ user }) => {
               />
             ))
           )}
+          {!loading && nextCursor && (
+            <div className="col-span-full flex justify-center">
+              <button
+                onClick={loadMoreComplaints}
+                disabled={loadingMore}
+                className="px-4 py-2 rounded-lg border border-gray-300 text-gray-700 hover:bg-gray-50 text-sm font-medium flex items-center gap-2 disabled:opacity-70"
+              >
+                {loadingMore && <Loader2 className="animate-spin" size={16} />}
+                Load more
+              </button>
+            </div>
+          )}
         </div>
       ) : (
         <div className="bg-white rounded-xl shadow-sm border border-gray-200 p-6 max-w-2xl mx-auto">
@@ -12,6 +12,8 @@ interface Props {
 const OfficerDashboard: React.FC<Props> = ({ user }) => {
   const [complaints, setComplaints] = useState<Complaint[]>([]);
   const [loading, setLoading] = useState(false);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [selectedComplaint, setSelectedComplaint] = useState<Complaint | null>(null);
 
   useEffect(() => {
@@ -20,11 +22,21 @@ const OfficerDashboard: React.FC<Props> = ({ user }) => {
 
   const loadComplaints = async () => {
     setLoading(true);
-    const data = await api.getComplaints(user.role, user.department);
-    setComplaints(data);
+    const page = await api.getComplaints(user.role, user.department);
+    setComplaints(page.complaints);
+    setNextCursor(page.nextCursor);
     setLoading(false);
   };
 
+  const loadMoreComplaints = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    const page = await api.getComplaints(user.role, user.department, nextCursor);
+    setComplaints(prev => [...prev, ...page.complaints]);
+    setNextCursor(page.nextCursor);
+    setLoadingMore(false);
+  };
+
   const handleStatusUpdate = async (newStatus: ComplaintStatus) => {
     if (!selectedComplaint) return;
     
@@ -42,7 +54,7 @@ const OfficerDashboard: React.FC<Props> = ({ user }) => {
       <div className={`w-full md:w-1/3 lg:w-1/4 border-r border-gray-200 bg-white flex flex-col ${selectedComplaint ? 'hidden md:flex' : 'flex'}`}>
         <div className="p-4 border-b border-gray-200 bg-gray-50">
           <h2 className="font-semibold text-gray-900">{user.department} Queue</h2>
-          <p className="text-xs text-gray-500 mt-1">{complaints.length} active items</p>
+          <p className="text-xs text-gray-500 mt-1">{complaints.length}{nextCursor ? '+' : ''} active items</p>
         </div>
         
         <div className="flex-1 overflow-y-auto p-2 space-y-2">
@@ -66,6 +78,16 @@ const OfficerDashboard: React.FC<Props> = ({ user }) => {
               </div>
             ))
           )}
+          {!loading && nextCursor && (
+            <button
+              onClick={loadMoreComplaints}
+              disabled={loadingMore}
+              className="w-full p-2 rounded-lg text-sm font-medium text-primary hover:bg-gray-50 flex items-center justify-center gap-2 disabled:opacity-70"
+            >
+              {loadingMore && <Loader2 className="animate-spin" size={16} />}
+              Load more
+            </button>
+          )}
         </div>
       </div>
 
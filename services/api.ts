@@ -1,4 +1,4 @@
-import { Complaint, ComplaintStatus, Department, User, UserRole, DashboardStats } from '../types';
+import { Complaint, ComplaintPage, ComplaintStatus, Department, User, UserRole, DashboardStats } from '../types';
 
 // Detect environment and set appropriate API URL
 function getApiUrl(): string {
@@ -228,10 +228,18 @@ export const api = {
     };
   },
 
-  getComplaints: async (role: UserRole, department?: Department): Promise<Complaint[]> => {
+  getComplaints: async (
+    role: UserRole,
+    department?: Department,
+    cursor?: string | null
+  ): Promise<ComplaintPage> => {
     const headers = getAuthHeaders();
 
-    const response = await fetchWithRetry(`${API_URL}/complaints`, {
+    // One page (the backend's COMPLAINTS_PAGE_SIZE, 100 by default); callers load more with nextCursor
+    const url = cursor
+      ? `${API_URL}/complaints?${new URLSearchParams({ cursor })}`
+      : `${API_URL}/complaints`;
+    const response = await fetchWithRetry(url, {
       method: 'GET',
       headers: headers as any
     });
@@ -247,7 +255,7 @@ export const api = {
     const data = await response.json();
     const complaintsArray = data.data || data;
 
-    return complaintsArray.map((item: any) => ({
+    const complaints: Complaint[] = complaintsArray.map((item: any) => ({
       id: item.id,
       userId: item.user_id,
       userName: item.userName || 'Unknown User',
@@ -269,6 +277,8 @@ export const api = {
         suggestedSteps: item.nlp_analysis.suggestedSteps
       } : undefined
     }));
+
+    return { complaints, nextCursor: response.headers.get('X-Next-Cursor') };
   },
 
   updateStatus: async (
@@ -1,4 +1,4 @@
-import { Complaint, ComplaintStatus, Department, NLPAnalysis, User, UserRole, DashboardStats } from '../types';
+import { Complaint, ComplaintPage, ComplaintStatus, Department, NLPAnalysis, User, UserRole, DashboardStats } from '../types';
 
 // Mock Data Store
 let complaints: Complaint[] = [
@@ -173,16 +173,21 @@ export const api = {
     });
   },
 
-  getComplaints: async (role: UserRole, department?: Department): Promise<Complaint[]> => {
+  getComplaints: async (
+    role: UserRole,
+    department?: Department,
+    cursor?: string | null
+  ): Promise<ComplaintPage> => {
+    // The mock data fits in one page, so there is never a next cursor
     return new Promise((resolve) => {
       setTimeout(() => {
         if (role === UserRole.OFFICER && department) {
-          resolve(complaints.filter(c => c.department === department));
+          resolve({ complaints: complaints.filter(c => c.department === department), nextCursor: null });
         } else if (role === UserRole.CITIZEN) {
           // In a real app, filter by user ID. Here we return all for demo
-          resolve(complaints); 
+          resolve({ complaints, nextCursor: null }); 
         } else {
-          resolve(complaints);
+          resolve({ complaints, nextCursor: null });
         }
       }, 600);
     });
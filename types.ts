@@ -61,6 +61,12 @@ export interface Complaint {
   attachments: string[];
 }
 
+// One page of GET /complaints; pass nextCursor back to load the following page
+export interface ComplaintPage {
+  complaints: Complaint[];
+  nextCursor: string | null;
+}
+
 export interface DashboardStats {
   total: number;
   pending: number;